@@ -3,15 +3,22 @@
 キャッシュアダプター（ファイル / Redis 切替可能）
 
 設定: config.cache_type = "file" or "redis"
+      Redis の場合、config.cache_local_enabled でプロセス内 LRU を前段に置く（TieredCache）
 """
 
 import json
 import os
 import logging
 import hashlib
+import sqlite3
+import threading
+import time
+import uuid
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterable, Iterator
 from config import settings
+from cache_codec import CacheCodec, get_codec
 
 logger = logging.getLogger(__name__)
 
@@ -47,77 +54,320 @@ class CacheAdapter(ABC):
     def stats(self) -> Dict[str, Any]:
         """統計情報を取得"""
         pass
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数のキーの値をまとめて取得
+        
+        Returns:
+            {key: value}（値がないキーは含まない）
+        """
+        results = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                results[key] = value
+        return results
+    
+    def set_many(self, items: Dict[str, Dict[str, Any]], ttl: Optional[int] = None) -> bool:
+        """複数のキーに値をまとめて設定"""
+        ok = True
+        for key, value in items.items():
+            ok = self.set(key, value, ttl=ttl) and ok
+        return ok
+    
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        複数のキーをまとめて削除
+        
+        Returns:
+            削除した件数
+        """
+        return sum(1 for key in keys if self.delete(key))
 
 class FileCache(CacheAdapter):
-    """ファイルベースのキャッシュ（既存実装）"""
+    """
+    ファイルベースのキャッシュ（SQLite / WAL）
     
-    def __init__(self, cache_file: str = None):
-        self.cache_file = cache_file or settings.cache_file_path
-        self._cache: Dict[str, Any] = self._load()
+    🚀 パフォーマンス改善: 以前は set() / delete() のたびにキャッシュ全体を JSON で
+    書き直していたため、N件の書き込みで O(N²) バイトを書き、書き込み中に落ちると
+    ファイル全体が壊れていた。SQLite（WAL）に1件ずつ書き込むことで、書き込みは1件分、
+    起動時の全件読み込みも不要になる。
     
-    def _load(self) -> Dict[str, Any]:
-        """キャッシュファイルをロード"""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load cache: {e}")
-                return {}
-        return {}
+    エントリごとの期限（ttl、省略時は settings.cache_default_ttl_seconds）を持ち、
+    期限切れのエントリは読み込み時に削除する。件数（settings.cache_max_entries）・
+    サイズ（settings.cache_max_bytes）の上限を超えた場合は、最後に読み書きした時刻が
+    古いものから削除する（LRU）。上限の確認は書き込み _EVICT_INTERVAL 回ごとに行うため、
+    一時的にその件数分だけ上限を超えることがある。
+    
+    値は cache_codec でエンコード（圧縮）したバイト列で保存する。以前の JSON 文字列の
+    エントリもそのまま読める。
+    
+    以前の JSON ファイル（settings.cache_file_path）があれば初回起動時に取り込む。
+    """
+    
+    # 上限の確認（COUNT / SUM）を行う書き込み回数の間隔
+    _EVICT_INTERVAL = 64
+    # 読み込み時の最終アクセス時刻の更新間隔（秒）。読み込みのたびに書き込まないための粒度
+    _ACCESS_RESOLUTION = 60.0
+    
+    def __init__(self, db_path: str = None, legacy_json_path: str = None,
+                 max_entries: int = None, max_bytes: int = None, default_ttl: int = None):
+        self.db_path = db_path or settings.cache_db_path
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.max_entries = settings.cache_max_entries if max_entries is None else max_entries
+        self.max_bytes = settings.cache_max_bytes if max_bytes is None else max_bytes
+        self.default_ttl = settings.cache_default_ttl_seconds if default_ttl is None else default_ttl
+        
+        self.codec = get_codec()
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL DEFAULT 0,
+                size INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._migrate_schema()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_last_access ON cache_entries (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries (expires_at)")
+        self._conn.commit()
+        
+        self.import_json(legacy_json_path or settings.cache_file_path)
+        with self._lock:
+            self._evict()
+    
+    def _migrate_schema(self):
+        """期限・LRU 用の列がない（以前の）テーブルに列を追加"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache_entries)")}
+        if 'expires_at' in columns:
+            return
+        self._conn.execute("ALTER TABLE cache_entries ADD COLUMN expires_at REAL")
+        self._conn.execute("ALTER TABLE cache_entries ADD COLUMN last_access REAL NOT NULL DEFAULT 0")
+        self._conn.execute("ALTER TABLE cache_entries ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+        # 既存のエントリは今から既定の期限で扱う
+        now = time.time()
+        self._conn.execute(
+            "UPDATE cache_entries SET expires_at = ?, last_access = ?, size = length(CAST(value AS BLOB))",
+            (now + self.default_ttl if self.default_ttl else None, now),
+        )
+        logger.info(f"Migrated cache schema (ttl / LRU columns): {self.db_path}")
+    
+    def _expires_at(self, ttl: Optional[int], now: float) -> Optional[float]:
+        ttl = ttl or self.default_ttl
+        return now + ttl if ttl else None
+    
+    def _evict(self):
+        """期限切れのエントリを削除し、件数・サイズの上限を超えた分を古いものから削除（要 _lock）"""
+        self._writes_since_evict = 0
+        now = time.time()
+        expired = self._conn.execute(
+            "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        
+        evicted = 0
+        entries, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+        if self.max_entries and entries > self.max_entries:
+            evicted += self._conn.execute(
+                "DELETE FROM cache_entries WHERE key IN "
+                "(SELECT key FROM cache_entries ORDER BY last_access LIMIT ?)",
+                (entries - self.max_entries,),
+            ).rowcount
+            total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if self.max_bytes and total_bytes > self.max_bytes:
+            over = total_bytes - self.max_bytes
+            victims = []
+            for key, size in self._conn.execute("SELECT key, size FROM cache_entries ORDER BY last_access"):
+                victims.append((key,))
+                over -= size
+                if over <= 0:
+                    break
+            self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+            evicted += len(victims)
+        self._conn.commit()
+        
+        if expired or evicted:
+            logger.info(f"File cache eviction: expired={expired}, evicted={evicted}")
     
-    def _save(self) -> bool:
-        """キャッシュをファイルに保存"""
+    def import_json(self, json_path: str) -> int:
+        """
+        以前の JSON キャッシュファイルを取り込む（取り込んだファイルは .migrated に改名）
+        
+        Returns:
+            取り込んだ件数
+        """
+        if not json_path or not os.path.exists(json_path):
+            return 0
         try:
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self._cache, f, ensure_ascii=False, indent=2)
-            return True
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            expires_at = self._expires_at(None, now)
+            rows = []
+            for key, value in data.items():
+                encoded = self.codec.encode(value)
+                rows.append((key, sqlite3.Binary(encoded), expires_at, now, len(encoded)))
+            with self._lock:
+                # 既にある（新しい）値は上書きしない
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO cache_entries (key, value, expires_at, last_access, size) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+            os.replace(json_path, json_path + '.migrated')
+            logger.info(f"Migrated {len(data)} cache entries from {json_path}")
+            return len(data)
         except Exception as e:
-            logger.error(f"Failed to save cache: {e}")
-            return False
+            logger.error(f"Failed to migrate cache file {json_path}: {e}")
+            return 0
     
     def get(self, key: str) -> Optional[Dict[str, Any]]:
-        return self._cache.get(key)
+        try:
+            now = time.time()
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at, last_access FROM cache_entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                value, expires_at, last_access = row
+                if expires_at is not None and expires_at <= now:
+                    # 期限切れは読み込み時に削除
+                    self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                    self._conn.commit()
+                    return None
+                if now - last_access >= self._ACCESS_RESOLUTION:
+                    self._conn.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+            return self.codec.decode(value)
+        except Exception as e:
+            logger.error(f"File cache get error: {e}")
+            return None
     
     def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None) -> bool:
-        self._cache[key] = value
-        return self._save()
+        try:
+            encoded = self.codec.encode(value)
+            now = time.time()
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, last_access, size) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, sqlite3.Binary(encoded), self._expires_at(ttl, now), now, len(encoded)),
+                )
+                self._conn.commit()
+                self._writes_since_evict += 1
+                if self._writes_since_evict >= self._EVICT_INTERVAL:
+                    self._evict()
+            return True
+        except Exception as e:
+            logger.error(f"File cache set error: {e}")
+            return False
     
     def delete(self, key: str) -> bool:
-        if key in self._cache:
-            del self._cache[key]
-            return self._save()
-        return False
+        try:
+            with self._lock:
+                deleted = self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,)).rowcount
+                self._conn.commit()
+            return deleted > 0
+        except Exception as e:
+            logger.error(f"File cache delete error: {e}")
+            return False
     
     def clear(self) -> bool:
-        self._cache = {}
-        return self._save()
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cache_entries")
+                self._conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"File cache clear error: {e}")
+            return False
     
     def keys(self) -> list[str]:
-        return list(self._cache.keys())
+        try:
+            with self._lock:
+                return [
+                    row[0] for row in self._conn.execute(
+                        "SELECT key FROM cache_entries WHERE expires_at IS NULL OR expires_at > ?", (time.time(),)
+                    )
+                ]
+        except Exception as e:
+            logger.error(f"File cache keys error: {e}")
+            return []
+    
+    def backup(self, backup_path: str) -> bool:
+        """キャッシュのバックアップを作成（SQLite のオンラインバックアップ）"""
+        try:
+            with self._lock:
+                target = sqlite3.connect(backup_path)
+                try:
+                    self._conn.backup(target)
+                finally:
+                    target.close()
+            return True
+        except Exception as e:
+            logger.error(f"File cache backup error: {e}")
+            return False
     
     def stats(self) -> Dict[str, Any]:
-        size_mb = 0
-        if os.path.exists(self.cache_file):
-            size_mb = os.path.getsize(self.cache_file) / 1024 / 1024
+        with self._lock:
+            entries, value_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries "
+                "WHERE expires_at IS NULL OR expires_at > ?",
+                (time.time(),),
+            ).fetchone()
+        size_bytes = sum(
+            os.path.getsize(path)
+            for path in (self.db_path, self.db_path + '-wal')
+            if os.path.exists(path)
+        )
         
         return {
             'type': 'file',
-            'entries': len(self._cache),
-            'size_mb': round(size_mb, 2),
-            'path': self.cache_file
+            'entries': entries,
+            'size_mb': round(size_bytes / 1024 / 1024, 2),
+            'value_mb': round(value_bytes / 1024 / 1024, 2),
+            'max_entries': self.max_entries,
+            'max_mb': round(self.max_bytes / 1024 / 1024, 2),
+            'path': self.db_path
         }
 
 class RedisCache(CacheAdapter):
-    """Redis ベースのキャッシュ（Upstash 対応）"""
+    """
+    Redis ベースのキャッシュ（Upstash 対応）
+    
+    🚀 パフォーマンス改善: キーの列挙（clear / keys / stats）は KEYS ではなく SCAN で
+    少しずつ行う（KEYS は全キーを走査する間 Redis 全体をブロックする）。
+    get_many / set_many / delete_many は MGET・パイプラインで1往復にまとめる。
+    値は cache_codec でエンコード（圧縮）したバイト列で保存する（以前の JSON 文字列も読める）。
+    """
+    
+    # SCAN 1回あたりの目安件数、MGET・パイプライン・DELETE 1回あたりの件数
+    _SCAN_COUNT = 500
+    _BATCH_SIZE = 500
     
     def __init__(self, redis_url: str = None):
         try:
             import redis
             self.redis_url = redis_url or settings.redis_url
-            self.client = redis.from_url(self.redis_url, decode_responses=True)
+            # 値はバイト列（cache_codec）のため、応答はデコードしない
+            self.client = redis.from_url(self.redis_url, decode_responses=False)
             self.prefix = "jba_cache:"
+            self.codec = get_codec()
             
             # 接続テスト
             self.client.ping()
@@ -129,28 +379,68 @@ class RedisCache(CacheAdapter):
             logger.error(f"Failed to connect to Redis: {e}")
             raise
     
+    def _scan_keys(self) -> Iterator[str]:
+        """prefix に一致するキー（prefix 付き）を SCAN で列挙"""
+        for key in self.client.scan_iter(match=f"{self.prefix}*", count=self._SCAN_COUNT):
+            yield key.decode('utf-8') if isinstance(key, bytes) else key
+    
+    @staticmethod
+    def _chunks(items: list, size: int):
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
+    
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         try:
             value = self.client.get(f"{self.prefix}{key}")
             if value:
-                return json.loads(value)
+                return self.codec.decode(value)
             return None
         except Exception as e:
             logger.error(f"Redis get error: {e}")
             return None
     
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            keys = list(dict.fromkeys(keys))
+            results = {}
+            for chunk in self._chunks(keys, self._BATCH_SIZE):
+                values = self.client.mget([f"{self.prefix}{key}" for key in chunk])
+                for key, value in zip(chunk, values):
+                    if value:
+                        results[key] = self.codec.decode(value)
+            return results
+        except Exception as e:
+            logger.error(f"Redis get_many error: {e}")
+            return {}
+    
     def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None) -> bool:
         try:
-            json_value = json.dumps(value, ensure_ascii=False)
+            encoded = self.codec.encode(value)
             if ttl:
-                self.client.setex(f"{self.prefix}{key}", ttl, json_value)
+                self.client.setex(f"{self.prefix}{key}", ttl, encoded)
             else:
-                self.client.set(f"{self.prefix}{key}", json_value)
+                self.client.set(f"{self.prefix}{key}", encoded)
             return True
         except Exception as e:
             logger.error(f"Redis set error: {e}")
             return False
     
+    def set_many(self, items: Dict[str, Dict[str, Any]], ttl: Optional[int] = None) -> bool:
+        try:
+            for chunk in self._chunks(list(items.items()), self._BATCH_SIZE):
+                pipe = self.client.pipeline(transaction=False)
+                for key, value in chunk:
+                    encoded = self.codec.encode(value)
+                    if ttl:
+                        pipe.setex(f"{self.prefix}{key}", ttl, encoded)
+                    else:
+                        pipe.set(f"{self.prefix}{key}", encoded)
+                pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Redis set_many error: {e}")
+            return False
+    
     def delete(self, key: str) -> bool:
         try:
             self.client.delete(f"{self.prefix}{key}")
@@ -159,12 +449,27 @@ class RedisCache(CacheAdapter):
             logger.error(f"Redis delete error: {e}")
             return False
     
+    def delete_many(self, keys: Iterable[str]) -> int:
+        try:
+            deleted = 0
+            for chunk in self._chunks(list(keys), self._BATCH_SIZE):
+                deleted += self.client.delete(*[f"{self.prefix}{key}" for key in chunk])
+            return deleted
+        except Exception as e:
+            logger.error(f"Redis delete_many error: {e}")
+            return 0
+    
     def clear(self) -> bool:
         try:
-            # prefix に一致するキーを全削除
-            keys = self.client.keys(f"{self.prefix}*")
-            if keys:
-                self.client.delete(*keys)
+            # prefix に一致するキーを SCAN しながら少しずつ削除
+            batch = []
+            for key in self._scan_keys():
+                batch.append(key)
+                if len(batch) >= self._BATCH_SIZE:
+                    self.client.delete(*batch)
+                    batch = []
+            if batch:
+                self.client.delete(*batch)
             return True
         except Exception as e:
             logger.error(f"Redis clear error: {e}")
@@ -172,9 +477,8 @@ class RedisCache(CacheAdapter):
     
     def keys(self) -> list[str]:
         try:
-            keys = self.client.keys(f"{self.prefix}*")
             # prefix を除去して返す
-            return [key.replace(self.prefix, '') for key in keys]
+            return [key[len(self.prefix):] for key in self._scan_keys()]
         except Exception as e:
             logger.error(f"Redis keys error: {e}")
             return []
@@ -182,7 +486,7 @@ class RedisCache(CacheAdapter):
     def stats(self) -> Dict[str, Any]:
         try:
             info = self.client.info('memory')
-            keys_count = len(self.client.keys(f"{self.prefix}*"))
+            keys_count = sum(1 for _ in self._scan_keys())
             
             return {
                 'type': 'redis',
@@ -198,8 +502,226 @@ class RedisCache(CacheAdapter):
                 'error': str(e)
             }
 
+class TieredCache(CacheAdapter):
+    """
+    プロセス内 LRU + Redis の2段キャッシュ
+    
+    🚀 パフォーマンス改善: Redis（Upstash）は get のたびにネットワーク往復と課金が
+    発生するため、同じプロセスで読んだばかりのキー（名簿・選手詳細など）は
+    プロセス内の LRU（件数上限・TTL付き）から返す。
+    
+    他のプロセス（API・ワーカー）の書き込み・削除は Redis の pub/sub で通知し、
+    受け取ったプロセスは該当キーをプロセス内から削除する。購読が切れている間は
+    通知を取りこぼすため、プロセス内のキャッシュを使わずに Redis から読む。
+    
+    値はプロセス内でも（圧縮しない）エンコード済みのバイト列で保持し、呼び出し側が
+    返り値を変更してもキャッシュに影響しないようにする。
+    """
+    
+    def __init__(self, backend: 'RedisCache', max_entries: int = None, ttl_seconds: int = None):
+        self.backend = backend
+        self.max_entries = settings.cache_local_max_entries if max_entries is None else max_entries
+        self.ttl_seconds = settings.cache_local_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.channel = f"{backend.prefix}invalidate"
+        self._origin = uuid.uuid4().hex
+        # プロセス内は速度優先で圧縮しない
+        self._local_codec = CacheCodec('json')
+        
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (encoded, expires_at)
+        # 無効化のたびに増やす。Redis から読んでいる間に無効化された値はプロセス内に入れない
+        self._generation = 0
+        self._subscribed = threading.Event()
+        self._stopped = threading.Event()
+        self._hits = 0
+        self._misses = 0
+        
+        self._listener = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+        self._listener.start()
+        # 起動直後の書き込みの通知を取りこぼさないよう、購読の開始を少しだけ待つ
+        self._subscribed.wait(timeout=2.0)
+    
+    # ---- プロセス内 LRU ----
+    
+    def _local_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self._subscribed.is_set():
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            encoded, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return self._local_codec.decode(encoded)
+    
+    def _local_put(self, key: str, value: Dict[str, Any], ttl: Optional[int], generation: int):
+        if not self._subscribed.is_set() or self.max_entries <= 0:
+            return
+        local_ttl = min(ttl, self.ttl_seconds) if ttl else self.ttl_seconds
+        encoded = self._local_codec.encode(value)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (encoded, time.monotonic() + local_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def _local_invalidate(self, keys: Optional[Iterable[str]]):
+        """プロセス内のキーを削除（keys が None の場合は全て）"""
+        with self._lock:
+            self._generation += 1
+            if keys is None:
+                self._entries.clear()
+            else:
+                for key in keys:
+                    self._entries.pop(key, None)
+    
+    # ---- pub/sub による無効化 ----
+    
+    def _publish(self, keys: Optional[list]):
+        """他のプロセスにキーの無効化を通知（keys が None の場合は全て）"""
+        try:
+            message = json.dumps({'origin': self._origin, 'keys': keys}, ensure_ascii=False)
+            self.backend.client.publish(self.channel, message)
+        except Exception as e:
+            logger.warning(f"Cache invalidation publish error: {e}")
+    
+    def _listen(self):
+        """無効化の通知を購読（切断された場合は再接続し、その間の通知に備えて全て削除）"""
+        backoff = 1.0
+        while not self._stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = self.backend.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self._local_invalidate(None)
+                self._subscribed.set()
+                backoff = 1.0
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get('type') == 'message':
+                        self._on_invalidation(message.get('data'))
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscriber error (retry in {backoff:.0f}s): {e}")
+            finally:
+                self._subscribed.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            self._stopped.wait(backoff)
+            backoff = min(backoff * 2, 60.0)
+    
+    def _on_invalidation(self, data):
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if message.get('origin') == self._origin:
+            return
+        self._local_invalidate(message.get('keys'))
+    
+    def close(self):
+        """購読を終了"""
+        self._stopped.set()
+        self._listener.join(timeout=5.0)
+    
+    # ---- CacheAdapter ----
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._local_get(key)
+        if value is not None:
+            return value
+        generation = self._generation
+        value = self.backend.get(key)
+        if value is not None:
+            self._local_put(key, value, None, generation)
+        return value
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        missing = []
+        for key in keys:
+            value = self._local_get(key)
+            if value is not None:
+                results[key] = value
+            else:
+                missing.append(key)
+        if missing:
+            generation = self._generation
+            fetched = self.backend.get_many(missing)
+            for key, value in fetched.items():
+                self._local_put(key, value, None, generation)
+            results.update(fetched)
+        return results
+    
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        self._local_invalidate([key])
+        generation = self._generation
+        ok = self.backend.set(key, value, ttl=ttl)
+        if ok:
+            self._local_put(key, value, ttl, generation)
+        self._publish([key])
+        return ok
+    
+    def set_many(self, items: Dict[str, Dict[str, Any]], ttl: Optional[int] = None) -> bool:
+        self._local_invalidate(items.keys())
+        generation = self._generation
+        ok = self.backend.set_many(items, ttl=ttl)
+        if ok:
+            for key, value in items.items():
+                self._local_put(key, value, ttl, generation)
+        self._publish(list(items))
+        return ok
+    
+    def delete(self, key: str) -> bool:
+        self._local_invalidate([key])
+        ok = self.backend.delete(key)
+        self._publish([key])
+        return ok
+    
+    def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        self._local_invalidate(keys)
+        deleted = self.backend.delete_many(keys)
+        self._publish(keys)
+        return deleted
+    
+    def clear(self) -> bool:
+        self._local_invalidate(None)
+        ok = self.backend.clear()
+        self._publish(None)
+        return ok
+    
+    def keys(self) -> list[str]:
+        return self.backend.keys()
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = self.backend.stats()
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats.update({
+                'type': 'tiered',
+                'local_entries': len(self._entries),
+                'local_max_entries': self.max_entries,
+                'local_hits': self._hits,
+                'local_misses': self._misses,
+                'local_hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'invalidation_subscribed': self._subscribed.is_set(),
+            })
+        return stats
+
 # ファクトリー関数
 _cache_instance = None
+_cache_lock = threading.Lock()
 
 def get_cache() -> CacheAdapter:
     """
@@ -210,19 +732,24 @@ def get_cache() -> CacheAdapter:
     """
     global _cache_instance
     
-    if _cache_instance is None:
-        cache_type = settings.cache_type.lower()
-        
-        if cache_type == 'redis':
-            try:
-                _cache_instance = RedisCache()
-                logger.info("Using Redis cache")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Redis, falling back to file cache: {e}")
+    with _cache_lock:
+        if _cache_instance is None:
+            cache_type = settings.cache_type.lower()
+            
+            if cache_type == 'redis':
+                try:
+                    _cache_instance = RedisCache()
+                    if settings.cache_local_enabled:
+                        _cache_instance = TieredCache(_cache_instance)
+                        logger.info(f"Using Redis cache with in-process LRU (max_entries={_cache_instance.max_entries})")
+                    else:
+                        logger.info("Using Redis cache")
+                except Exception as e:
+                    logger.warning(f"Failed to initialize Redis, falling back to file cache: {e}")
+                    _cache_instance = FileCache()
+            else:
                 _cache_instance = FileCache()
-        else:
-            _cache_instance = FileCache()
-            logger.info("Using file cache")
+                logger.info("Using file cache")
     
     return _cache_instance
 
@@ -0,0 +1,102 @@
+# backend/cache_codec.py
+"""
+キャッシュの値のエンコード（cache_adapter から使用）
+
+🚀 パフォーマンス改善: キャッシュの値（照合結果の jba_data など）は同じ日本語の
+キー・値が繰り返されるため、圧縮すると数分の1になる。Redis のメモリ・Upstash の
+転送量・ファイルキャッシュのサイズを減らすため、値を圧縮したバイト列で保存する。
+
+形式: 先頭1バイトがスキーマ（エンコード方式）、残りがペイロード
+    0x01: JSON（UTF-8、圧縮なし）— 小さい値は圧縮すると逆に大きくなるため
+    0x02: zlib 圧縮した JSON
+    0x03: zlib 圧縮した msgpack（msgpack がインストールされている場合）
+
+先頭1バイトが上記以外の値は、以前の形式（そのままの JSON 文字列）として読み込む。
+JSON は "{" "[" などの ASCII 文字で始まるため、既存のエントリは書き直さずに読める。
+
+設定: config.cache_codec = "zlib-json"（デフォルト） / "msgpack" / "json"
+"""
+
+import json
+import logging
+import zlib
+from typing import Any, Union
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_JSON = 0x01
+FORMAT_ZLIB_JSON = 0x02
+FORMAT_ZLIB_MSGPACK = 0x03
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class CacheCodec:
+    """値 ⇔ バイト列の変換"""
+
+    def __init__(self, name: str = None, compress_min_bytes: int = None, level: int = None):
+        self.name = (name or settings.cache_codec).lower()
+        self.compress_min_bytes = settings.cache_compress_min_bytes if compress_min_bytes is None else compress_min_bytes
+        self.level = settings.cache_compress_level if level is None else level
+
+        if self.name == 'msgpack' and msgpack is None:
+            logger.warning("msgpack package not installed, falling back to zlib-json. Run: pip install msgpack")
+            self.name = 'zlib-json'
+        if self.name not in ('json', 'zlib-json', 'msgpack'):
+            logger.warning(f"Unknown cache codec '{self.name}', falling back to zlib-json")
+            self.name = 'zlib-json'
+
+    def encode(self, value: Any) -> bytes:
+        """値をバイト列に変換"""
+        if self.name == 'msgpack':
+            packed = msgpack.packb(value, use_bin_type=True)
+            if len(packed) >= self.compress_min_bytes:
+                return bytes([FORMAT_ZLIB_MSGPACK]) + zlib.compress(packed, self.level)
+        raw = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if self.name != 'json' and len(raw) >= self.compress_min_bytes:
+            return bytes([FORMAT_ZLIB_JSON]) + zlib.compress(raw, self.level)
+        return bytes([FORMAT_JSON]) + raw
+
+    @staticmethod
+    def decode(data: Union[bytes, str]) -> Any:
+        """バイト列（以前の形式の JSON 文字列を含む）を値に戻す"""
+        if isinstance(data, str):
+            return json.loads(data)
+        data = bytes(data)
+        if not data:
+            return None
+        fmt = data[0]
+        if fmt == FORMAT_JSON:
+            return json.loads(data[1:])
+        if fmt == FORMAT_ZLIB_JSON:
+            return json.loads(zlib.decompress(data[1:]))
+        if fmt == FORMAT_ZLIB_MSGPACK:
+            if msgpack is None:
+                raise ValueError("cache entry is msgpack-encoded but msgpack is not installed")
+            return msgpack.unpackb(zlib.decompress(data[1:]), raw=False, strict_map_key=False)
+        # 以前の形式（JSON 文字列）
+        return json.loads(data)
+
+
+# ファクトリー関数
+_codec_instance = None
+
+
+def get_codec() -> CacheCodec:
+    """
+    設定に基づいてキャッシュの値のエンコード方式を取得（シングルトン）
+
+    Returns:
+        CacheCodec インスタンス
+    """
+    global _codec_instance
+
+    if _codec_instance is None:
+        _codec_instance = CacheCodec()
+        logger.info(f"Cache codec: {_codec_instance.name}")
+    return _codec_instance
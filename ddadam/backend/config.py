@@ -11,7 +11,37 @@ class Settings(BaseSettings):
     # キャッシュ設定
     cache_type: str = "file"  # "file" or "redis"
     redis_url: Optional[str] = None  # Upstash Redis URL
-    cache_file_path: str = "./worker/jba_player_cache.json"
+    cache_local_enabled: bool = True  # Redis の前段にプロセス内 LRU を置く（他プロセスの更新は pub/sub で無効化）
+    cache_local_max_entries: int = 5000
+    cache_local_ttl_seconds: int = 300  # 通知の取りこぼしに備えたプロセス内の保持期間の上限
+    cache_db_path: str = "./worker/jba_player_cache.sqlite3"  # file キャッシュ（SQLite）
+    cache_file_path: str = "./worker/jba_player_cache.json"  # 以前の JSON キャッシュ（あれば初回起動時に取り込む）
+    cache_default_ttl_seconds: int = 30 * 24 * 60 * 60  # file キャッシュで ttl 省略時の期限（0 = 無期限）
+    cache_max_entries: int = 100_000  # file キャッシュの件数上限（超えたら LRU で削除、0 = 無制限）
+    cache_max_bytes: int = 256 * 1024 * 1024  # file キャッシュの値の合計サイズ上限（0 = 無制限）
+    cache_codec: str = "zlib-json"  # 値の保存形式 "zlib-json" / "msgpack"（要 msgpack） / "json"（圧縮なし）
+    cache_compress_min_bytes: int = 256  # これより小さい値は圧縮しない
+    cache_compress_level: int = 6  # zlib の圧縮レベル（1-9）
+    
+    # JBA名簿ストア設定（ジョブをまたいでチームメンバー一覧を再利用）
+    roster_store_type: str = "sqlite"  # "sqlite" or "redis"（cache_adapter 経由）
+    roster_store_path: str = "./worker/jba_rosters.sqlite3"
+    roster_ttl_seconds: int = 6 * 60 * 60  # この期間内はそのまま使う
+    roster_max_stale_seconds: int = 7 * 24 * 60 * 60  # TTL切れ後もこの期間内は使いつつ裏で再取得
+    
+    # 選手詳細キャッシュ設定（身長・体重・学年・カナ名を年度・メンバーID単位で再利用、cache_adapter 経由）
+    player_detail_cache_enabled: bool = True
+    player_detail_ttl_seconds: int = 7 * 24 * 60 * 60
+    
+    # ログインセッション設定（JBA・管理画面のログイン済みクッキーをジョブをまたいで再利用、暗号化して保存）
+    session_store_enabled: bool = True
+    session_store_path: str = "~/.local/state/ddadam/login_sessions.sqlite3"  # ソースツリーの外に置く（鍵ファイルも同じ場所）
+    session_store_key: Optional[str] = None  # Fernet 鍵（未設定の場合は session_store_path + ".key" を作成して使う）
+    session_ttl_seconds: int = 12 * 60 * 60
+    
+    # 大会の再実行設定（CSVが変わっていない大学は前回の照合結果を再利用）
+    incremental_reruns: bool = True
+    run_store_path: str = "./worker/tournament_runs.sqlite3"
     
     # 出力設定
     output_dir: str = "./outputs"
@@ -26,11 +56,20 @@ class Settings(BaseSettings):
     # ワーカー設定
     max_workers: int = 5
     enable_parallel: bool = True
+    tournament_streaming: bool = True  # CSVを取得できた大学から順に照合を始める
+    scheduler_max_workers: int = 32  # 照合処理（大学・名簿・選手）で同時に実行するタスク数（プロセス全体）
     
     # JBA設定
     jba_base_url: str = "https://team-jba.jp"
     jba_timeout: int = 30
     jba_rate_limit: int = 10  # requests per second
+    jba_rate_burst: int = 20  # 一度に送れる最大リクエスト数（トークンバケット容量）
+    jba_slow_response_sec: float = 5.0  # これを超える応答で減速
+    jba_max_concurrency: int = 100  # 同時リクエスト数の上限（プロセス全体）
+    jba_initial_concurrency: int = 8  # AIMD制御の初期値
+    jba_min_concurrency: int = 2  # AIMD制御の下限
+    kcbbf_max_concurrency: int = 8  # 管理画面（CSV取得）の同時リクエスト数上限
+    kcbbf_initial_concurrency: int = 4
     
     # 管理画面ログイン情報（CSV取得用 - コード内に固定）
     admin_username: str = "kcbf"
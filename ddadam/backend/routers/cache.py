@@ -5,14 +5,21 @@ JBA選手データのキャッシュを管理
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import os
-import json
 import logging
 
+from cache_adapter import get_cache, FileCache
+
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-CACHE_PATH = "worker/jba_player_cache.json"
+# 同じキャッシュに保存している他のデータ（DELETE / では削除しない）
+# - roster:      名簿スナップショット（worker/roster_store.py、roster_store_type="redis" の場合）
+# - jba_detail:  選手詳細（worker/player_detail_cache.py）
+RETAINED_KEY_PREFIXES = ("roster:", "jba_detail:")
+
+def _player_cache_keys(cache) -> list[str]:
+    """選手照合結果のキャッシュのキー（名簿・選手詳細を除く）"""
+    return [key for key in cache.keys() if not key.startswith(RETAINED_KEY_PREFIXES)]
 
 class CacheStats(BaseModel):
     """キャッシュ統計情報"""
@@ -33,26 +40,15 @@ async def get_cache_stats():
     """
     キャッシュの統計情報を取得
     """
-    if not os.path.exists(CACHE_PATH):
-        return CacheStats(
-            entries=0,
-            size_mb=0.0,
-            exists=False,
-            path=CACHE_PATH
-        )
-    
     try:
-        size_bytes = os.path.getsize(CACHE_PATH)
-        size_mb = size_bytes / 1024 / 1024
-        
-        with open(CACHE_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        stats = get_cache().stats()
+        entries = stats.get('entries', 0)
         
         return CacheStats(
-            entries=len(data),
-            size_mb=round(size_mb, 2),
-            exists=True,
-            path=CACHE_PATH
+            entries=entries,
+            size_mb=stats.get('size_mb', stats.get('used_memory_mb', 0.0)),
+            exists=entries > 0,
+            path=stats.get('path', stats.get('type', ''))
         )
     
     except Exception as e:
@@ -63,21 +59,26 @@ async def get_cache_stats():
 async def clear_cache():
     """
     キャッシュをクリア
+
+    削除するのは選手照合結果のキャッシュだけで、同じキャッシュに保存している
+    名簿スナップショット・選手詳細（RETAINED_KEY_PREFIXES）は残す。
     """
-    if not os.path.exists(CACHE_PATH):
-        return {"status": "no_cache", "message": "キャッシュファイルが存在しません"}
+    cache = get_cache()
+    keys = _player_cache_keys(cache)
+    if not keys:
+        return {"status": "no_cache", "message": "キャッシュが存在しません"}
     
     try:
-        # バックアップを作成
-        backup_path = CACHE_PATH + ".backup"
-        if os.path.exists(CACHE_PATH):
-            import shutil
-            shutil.copy2(CACHE_PATH, backup_path)
+        # バックアップを作成（ファイルキャッシュのみ）
+        backup_path = None
+        if isinstance(cache, FileCache):
+            backup_path = cache.db_path + ".backup"
+            cache.backup(backup_path)
         
         # キャッシュを削除
-        os.remove(CACHE_PATH)
+        deleted = cache.delete_many(keys)
         
-        logger.info("Cache cleared successfully")
+        logger.info(f"Cache cleared successfully ({deleted} entries)")
         return {
             "status": "cleared",
             "message": "キャッシュをクリアしました",
@@ -93,24 +94,21 @@ async def get_cache_entries(limit: int = 100, offset: int = 0):
     """
     キャッシュエントリの一覧を取得
     """
-    if not os.path.exists(CACHE_PATH):
-        return {"entries": [], "total": 0, "limit": limit, "offset": offset}
-    
     try:
-        with open(CACHE_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        cache = get_cache()
+        keys = cache.keys()
         
         # エントリをリスト化
         entries = []
-        for key, value in list(data.items())[offset:offset+limit]:
+        for key in keys[offset:offset+limit]:
             entries.append({
                 "key": key,
-                "data": value
+                "data": cache.get(key)
             })
         
         return {
             "entries": entries,
-            "total": len(data),
+            "total": len(keys),
             "limit": limit,
             "offset": offset
         }
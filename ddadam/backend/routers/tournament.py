@@ -68,7 +68,7 @@ def run_tournament_job(
             jba_system=jba_system,
             validator=validator,
             use_parallel=True,
-            max_workers=5
+            max_workers=settings.max_workers
         )
         
         # 管理画面ログインしてCSV取得（環境変数から認証情報を取得）
@@ -77,26 +77,6 @@ def run_tournament_job(
         
         logger.info(f"管理画面ログイン: {settings.admin_username}")
         
-        combined_df = system.login_and_get_tournament_csvs(
-            username=settings.admin_username,  # 管理画面用（環境変数）
-            password=settings.admin_password,  # 管理画面用（環境変数）
-            game_id=game_id
-        )
-        
-        if combined_df is None or combined_df.empty:
-            raise Exception("大会データの取得に失敗しました（CSVリンクが見つからない/アクセス不可）")
-        
-        # 取得した大学数を記録
-        current_step = "csv_parsed"
-        universities = combined_df['大学名'].unique().tolist()
-        supabase.update_job(job_id, metadata={"universities": universities, "total_universities": len(universities), "total_rows": len(combined_df), "step": current_step})
-        
-        logger.info(f"✅ 大会データ取得完了: {len(universities)}大学, {len(combined_df)}行")
-        
-        # JBA照合処理
-        current_step = "verification"
-        supabase.update_job(job_id, message=f"JBA照合処理中...（{len(universities)}大学）", progress=0.3, metadata={"step": current_step})
-        
         # 進捗更新用のコールバック関数を渡す
         def update_progress_callback(progress, message):
             """進捗更新用のコールバック関数"""
@@ -104,7 +84,56 @@ def run_tournament_job(
             overall_progress = 0.3 + (progress * 0.6)
             supabase.update_job(job_id, message=message, progress=overall_progress, metadata={"step": current_step})
         
-        result_df = system.process_tournament_data(combined_df, job_id=job_id, progress_callback=update_progress_callback)
+        if settings.tournament_streaming:
+            # 🚀 パフォーマンス改善: CSVを取得できた大学から順に照合を開始
+            # （CSV取得スレッドがキューに流し、照合側は届いた大学から処理する）
+            import queue
+            current_step = "verification"
+            supabase.update_job(job_id, message="CSV取得とJBA照合を並行して処理中...", progress=0.3, metadata={"step": current_step})
+            
+            df_queue = queue.Queue()
+            producer = threading.Thread(
+                target=system.stream_tournament_csvs,
+                kwargs={
+                    "username": settings.admin_username,  # 管理画面用（環境変数）
+                    "password": settings.admin_password,  # 管理画面用（環境変数）
+                    "game_id": game_id,
+                    "df_queue": df_queue,
+                },
+                name=f"tournament-csv-{job_id[:8]}",
+                daemon=True,
+            )
+            producer.start()
+            result_df, universities = system.process_tournament_stream(df_queue, job_id=job_id, progress_callback=update_progress_callback)
+            producer.join()
+            
+            if not universities:
+                raise Exception("大会データの取得に失敗しました（CSVリンクが見つからない/アクセス不可）")
+            
+            supabase.update_job(job_id, metadata={"universities": universities, "total_universities": len(universities), "total_rows": len(result_df), "step": current_step})
+            logger.info(f"✅ 大会データ取得・照合完了: {len(universities)}大学, {len(result_df)}行")
+        else:
+            combined_df = system.login_and_get_tournament_csvs(
+                username=settings.admin_username,  # 管理画面用（環境変数）
+                password=settings.admin_password,  # 管理画面用（環境変数）
+                game_id=game_id
+            )
+            
+            if combined_df is None or combined_df.empty:
+                raise Exception("大会データの取得に失敗しました（CSVリンクが見つからない/アクセス不可）")
+            
+            # 取得した大学数を記録
+            current_step = "csv_parsed"
+            universities = combined_df['大学名'].unique().tolist()
+            supabase.update_job(job_id, metadata={"universities": universities, "total_universities": len(universities), "total_rows": len(combined_df), "step": current_step})
+            
+            logger.info(f"✅ 大会データ取得完了: {len(universities)}大学, {len(combined_df)}行")
+            
+            # JBA照合処理
+            current_step = "verification"
+            supabase.update_job(job_id, message=f"JBA照合処理中...（{len(universities)}大学）", progress=0.3, metadata={"step": current_step})
+            
+            result_df = system.process_tournament_data(combined_df, job_id=job_id, progress_callback=update_progress_callback)
         
         if result_df is None:
             raise Exception("JBA照合処理に失敗しました（内部処理エラー）")
@@ -0,0 +1,72 @@
+"""
+テスト共通設定
+
+backend の各モジュールは backend/ をカレントにして `from config import settings`、
+`from worker.xxx import ...` の形で読み込まれるため、backend/ を import パスに追加する。
+時刻に依存するテストは `clock` フィクスチャ（FakeClock）で時刻を進める。
+"""
+
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+class FakeClock:
+    """time / monotonic / sleep を手動で進める偽の時計（モジュールの `time` と差し替える）"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(request, monkeypatch):
+    """
+    偽の時計を差し込む
+
+    差し込むモジュールはテストモジュールの CLOCK_MODULES で指定する
+    （`@pytest.mark.parametrize("clock", [[module, ...]], indirect=True)` で上書き可）。
+    """
+    modules = getattr(request, "param", None) or getattr(request.module, "CLOCK_MODULES")
+    fake = FakeClock()
+    for module in modules:
+        monkeypatch.setattr(module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def jba_system(monkeypatch):
+    """永続ストア・キャッシュを使わない JBAVerificationSystem（ネットワークには接続しない）"""
+    from config import settings
+    from worker import jba_verification_lib
+
+    monkeypatch.setattr(jba_verification_lib, "get_roster_store", lambda: None)
+    monkeypatch.setattr(settings, "player_detail_cache_enabled", False)
+    system = jba_verification_lib.JBAVerificationSystem()
+    yield system
+    if system.http is not None:
+        system.http.close()
+
+
+@pytest.fixture
+def tournament_system(jba_system, tmp_path, monkeypatch):
+    """照合結果ストアを使わない IntegratedTournamentSystem（一時ファイルは tmp_path に作成）"""
+    from config import settings
+    from worker.integrated_system import IntegratedTournamentSystem
+
+    monkeypatch.setattr(settings, "incremental_reruns", False)
+    monkeypatch.chdir(tmp_path)
+    return IntegratedTournamentSystem(jba_system, validator=None)
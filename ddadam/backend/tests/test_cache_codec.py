@@ -0,0 +1,94 @@
+"""cache_codec のテスト"""
+
+import json
+import math
+
+import pytest
+
+import cache_codec
+from cache_codec import FORMAT_JSON, FORMAT_ZLIB_JSON, FORMAT_ZLIB_MSGPACK, CacheCodec
+
+RESULT = {
+    'status': 'match',
+    'corrections': {'身長': '180.5cm'},
+    'jba_data': {
+        'name': '山田 太郎',
+        'kana_name': 'ヤマダ タロウ',
+        'team_name': 'テスト大学',
+        'height': '180.5cm',
+        'grade': '大学2年',
+    },
+    'validation_warnings': [],
+    'has_correction': True,
+    'player_no': None,
+    'scores': [1, 2.5, -3],
+}
+LARGE = {f'p{i}': RESULT for i in range(30)}
+
+
+@pytest.mark.parametrize("name", ["json", "zlib-json"])
+@pytest.mark.parametrize("value", [RESULT, LARGE, {}, [], "文字列", 0, None])
+def test_round_trip(name, value):
+    codec = CacheCodec(name, compress_min_bytes=256, level=6)
+    assert codec.decode(codec.encode(value)) == value
+
+
+def test_small_values_are_not_compressed():
+    codec = CacheCodec("zlib-json", compress_min_bytes=256, level=6)
+    assert codec.encode({'a': 1})[0] == FORMAT_JSON
+
+
+def test_large_values_are_compressed():
+    codec = CacheCodec("zlib-json", compress_min_bytes=256, level=6)
+    encoded = codec.encode(LARGE)
+    assert encoded[0] == FORMAT_ZLIB_JSON
+    assert len(encoded) * 5 < len(json.dumps(LARGE, ensure_ascii=False).encode('utf-8'))
+
+
+def test_json_codec_never_compresses():
+    codec = CacheCodec("json", compress_min_bytes=0, level=6)
+    assert codec.encode(LARGE)[0] == FORMAT_JSON
+
+
+def test_nan_survives_round_trip():
+    codec = CacheCodec("zlib-json", compress_min_bytes=0, level=6)
+    assert math.isnan(codec.decode(codec.encode({'x': float('nan')}))['x'])
+
+
+@pytest.mark.parametrize("legacy", [
+    json.dumps(RESULT, ensure_ascii=False),
+    json.dumps(RESULT, ensure_ascii=False, indent=2),
+    json.dumps(RESULT),
+])
+def test_reads_legacy_json(legacy):
+    # 以前の形式: Redis（decode_responses=False）ではバイト列、FileCache では文字列で届く
+    assert CacheCodec.decode(legacy) == RESULT
+    assert CacheCodec.decode(legacy.encode('utf-8')) == RESULT
+    assert CacheCodec.decode(memoryview(legacy.encode('utf-8'))) == RESULT
+
+
+def test_empty_bytes_decode_to_none():
+    assert CacheCodec.decode(b"") is None
+
+
+def test_unknown_codec_falls_back_to_zlib_json():
+    assert CacheCodec("brotli").name == "zlib-json"
+
+
+def test_msgpack_falls_back_when_not_installed(monkeypatch):
+    monkeypatch.setattr(cache_codec, "msgpack", None)
+    assert CacheCodec("msgpack").name == "zlib-json"
+
+
+def test_msgpack_entry_without_msgpack_raises(monkeypatch):
+    monkeypatch.setattr(cache_codec, "msgpack", None)
+    with pytest.raises(ValueError):
+        CacheCodec.decode(bytes([FORMAT_ZLIB_MSGPACK]) + b"x")
+
+
+def test_msgpack_round_trip():
+    pytest.importorskip("msgpack")
+    codec = CacheCodec("msgpack", compress_min_bytes=0, level=6)
+    encoded = codec.encode(LARGE)
+    assert encoded[0] == FORMAT_ZLIB_MSGPACK
+    assert codec.decode(encoded) == LARGE
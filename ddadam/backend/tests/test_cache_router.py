@@ -0,0 +1,25 @@
+"""routers/cache.py（DELETE /cache）のテスト"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from cache_adapter import FileCache  # noqa: E402
+from routers import cache as cache_router  # noqa: E402
+
+
+def test_clear_keeps_rosters_and_player_details(tmp_path, monkeypatch):
+    cache = FileCache(str(tmp_path / "cache.sqlite3"), legacy_json_path=str(tmp_path / "missing.json"))
+    monkeypatch.setattr(cache_router, "get_cache", lambda: cache)
+    cache.set("0123456789abcdef", {"status": "match"})
+    cache.set("roster:2025:101", {"team_data": {}, "fetched_at": 0.0})
+    cache.set("jba_detail:2025:1", {"details": {}, "fetched_at": {}})
+
+    result = asyncio.run(cache_router.clear_cache())
+
+    assert result["status"] == "cleared"
+    assert sorted(cache.keys()) == ["jba_detail:2025:1", "roster:2025:101"]
+    # 照合結果のキャッシュがなければ何もしない
+    assert asyncio.run(cache_router.clear_cache())["status"] == "no_cache"
@@ -0,0 +1,83 @@
+"""worker.charset の判定順のテスト"""
+
+import codecs
+
+import pytest
+
+from worker.charset import decode_bytes, detect_encoding, filename_from_content_disposition
+
+UNIVERSITIES = ["東京大学", "白鴎大学", "早稲田大学", "筑波大学", "日本体育大学"]
+
+
+def _header_value(raw: bytes) -> str:
+    """http.client と同じく、ヘッダー値のバイト列を latin-1 で文字列にする"""
+    return raw.decode("latin-1")
+
+
+@pytest.mark.parametrize("name", UNIVERSITIES)
+def test_utf8_bytes_win_over_cp932_hint(name):
+    raw = f"{name}.csv".encode("utf-8")
+    assert detect_encoding(raw, hint="cp932") == "utf-8"
+
+
+@pytest.mark.parametrize("name", UNIVERSITIES)
+def test_utf8_filename_with_cp932_hint(name):
+    header = _header_value(f'attachment; filename="{name}.csv"'.encode("utf-8"))
+    assert filename_from_content_disposition(header, hint="cp932") == f"{name}.csv"
+
+
+@pytest.mark.parametrize("name", UNIVERSITIES)
+def test_cp932_filename(name):
+    header = _header_value(f'attachment; filename="{name}.csv"'.encode("cp932"))
+    assert filename_from_content_disposition(header) == f"{name}.csv"
+
+
+def test_rfc5987_filename():
+    header = "attachment; filename*=UTF-8''%E7%AD%91%E6%B3%A2%E5%A4%A7%E5%AD%A6.csv"
+    assert filename_from_content_disposition(header) == "筑波大学.csv"
+
+
+def test_missing_filename():
+    assert filename_from_content_disposition(None) is None
+    assert filename_from_content_disposition("attachment") is None
+
+
+def test_utf8_csv_after_cp932_csv():
+    # 同じ大会で前のCSVが CP932 でも、UTF-8 のCSVは UTF-8 として読む
+    body = "選手名,大学名\n山田 太郎,東京大学\n".encode("utf-8")
+    text, encoding = decode_bytes(body, hint="cp932")
+    assert encoding == "utf-8"
+    assert "山田 太郎" in text
+
+
+def test_cp932_csv_with_hint():
+    body = "選手名,大学名\n髙橋 次郎,白鴎大学\n".encode("cp932")
+    text, encoding = decode_bytes(body, hint="cp932")
+    assert encoding == "cp932"
+    assert "髙橋 次郎" in text
+
+
+def test_euc_jp_fallback():
+    # CP932 としては不正なバイト列になる EUC-JP（半角カナの2バイト表現を含む）
+    body = "ｶﾅ 選手".encode("euc-jp")
+    assert detect_encoding(body) == "euc-jp"
+
+
+def test_bom_wins():
+    body = codecs.BOM_UTF8 + "選手名".encode("utf-8")
+    assert detect_encoding(body, content_type="text/csv; charset=Shift_JIS") == "utf-8-sig"
+
+
+def test_iso2022jp_detected_before_utf8():
+    body = "選手名".encode("iso2022_jp")
+    assert detect_encoding(body) == "iso2022_jp"
+
+
+def test_declared_charset_used_when_not_utf8():
+    body = "選手名".encode("cp932")
+    assert detect_encoding(body, content_type="text/csv; charset=Shift_JIS") == "cp932"
+
+
+def test_unreliable_declared_charset_ignored():
+    body = "選手名".encode("cp932")
+    assert detect_encoding(body, content_type="text/csv; charset=ISO-8859-1") == "cp932"
@@ -0,0 +1,151 @@
+"""worker.concurrency（AIMD）のテスト"""
+
+import asyncio
+import threading
+
+import pytest
+
+from worker import concurrency
+from worker.concurrency import AIMDConcurrencyController
+
+CLOCK_MODULES = [concurrency]
+
+
+def _controller(initial=4, min_limit=1, max_limit=16):
+    return AIMDConcurrencyController("test", initial_limit=initial, min_limit=min_limit, max_limit=max_limit)
+
+
+def _saturate_and_release(controller, latency=0.1, success=True):
+    """枠を使い切ってから全て返却する（1ウィンドウ分）"""
+    count = controller.limit
+    for _ in range(count):
+        controller.acquire()
+    for _ in range(count):
+        controller.release(latency, success)
+
+
+def test_initial_limit_is_clamped():
+    assert _controller(initial=0, min_limit=2).limit == 2
+    assert _controller(initial=100, max_limit=8).limit == 8
+
+
+def test_additive_increase_when_saturated(clock):
+    controller = _controller(initial=2)
+    controller.acquire()
+    controller.acquire()
+    controller.release(0.1)
+    # 2 + 1/2
+    assert controller._limit == pytest.approx(2.5)
+
+
+def test_no_increase_when_not_saturated(clock):
+    controller = _controller(initial=4)
+    controller.acquire()
+    controller.release(0.1)
+    assert controller._limit == 4.0
+
+
+def test_about_one_per_window(clock):
+    controller = _controller(initial=4)
+    for _ in range(controller.limit):
+        controller.acquire()
+    # 枠を使い切ったまま 1ウィンドウ（limit 件）分の応答を返すと約 +1
+    for _ in range(4):
+        controller.release(0.1)
+        controller.acquire()
+    assert controller.limit == 4
+    controller.release(0.1)
+    assert controller.limit == 5
+
+
+def test_increase_stops_at_max(clock):
+    controller = _controller(initial=4, max_limit=6)
+    for _ in range(20):
+        _saturate_and_release(controller)
+    assert controller.limit == 6
+
+
+def test_multiplicative_decrease_on_error(clock):
+    controller = _controller(initial=8)
+    controller.acquire()
+    controller.release(0.1, success=False)
+    assert controller.limit == 4
+
+
+def test_one_decrease_per_cooldown(clock):
+    controller = _controller(initial=8)
+    for _ in range(3):
+        controller.acquire()
+    for _ in range(3):
+        controller.release(0.1, success=False)
+    assert controller.limit == 4
+    # 応答時間（最低0.5秒）が経過すれば再び減らす
+    clock.now += 0.5
+    controller.acquire()
+    controller.release(0.1, success=False)
+    assert controller.limit == 2
+
+
+def test_decrease_stops_at_min(clock):
+    controller = _controller(initial=8, min_limit=3)
+    for _ in range(5):
+        controller.acquire()
+        controller.release(0.1, success=False)
+        clock.now += 1.0
+    assert controller.limit == 3
+
+
+def test_latency_spike_decreases(clock):
+    controller = _controller(initial=8)
+    controller.acquire()
+    controller.release(0.1)
+    for _ in range(10):
+        controller.acquire()
+        controller.release(5.0)
+    assert controller.limit < 8
+
+
+def test_slot_records_exception_as_failure(clock):
+    controller = _controller(initial=8)
+    with pytest.raises(RuntimeError):
+        with controller.slot():
+            raise RuntimeError("boom")
+    assert controller.limit == 4
+    assert controller.stats()['in_flight'] == 0
+
+
+def test_thread_waiter_gets_released_slot():
+    controller = _controller(initial=1, max_limit=1)
+    controller.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        controller.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.05)
+    assert controller.stats()['waiting'] == 1
+    controller.release(0.1)
+    assert acquired.wait(1.0)
+    thread.join()
+    assert controller.stats()['in_flight'] == 1
+
+
+def test_cancelled_async_waiter_returns_its_slot():
+    controller = _controller(initial=1, max_limit=1)
+
+    async def scenario():
+        controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        controller.release(0.1)
+        await asyncio.wait_for(controller.acquire_async(), 1.0)
+
+    asyncio.run(scenario())
+    assert controller.stats()['in_flight'] == 1
+    assert controller.stats()['waiting'] == 0
@@ -0,0 +1,183 @@
+"""worker.correction_engine（身長・体重・学年の補正と変更フラグ）のテスト"""
+
+import pytest
+
+from worker.correction_engine import compute_corrections, correct_player
+
+UNIVERSITY = "東京大学"
+
+
+def _correct(original, jba_data, player_no="4", university=UNIVERSITY, edited_player_names=None):
+    return correct_player(original, jba_data, player_no, university, edited_player_names or {})
+
+
+@pytest.mark.parametrize("csv_height, jba_height, expected", [
+    ("180", "185cm", "185.0cm"),      # ちょうど 5cm の差は変更
+    ("180", "184.9cm", None),         # 5cm 未満は変更しない
+    ("185", "180", "180.0cm"),        # 単位なし・差は絶対値
+    ("180cm", "175cm", "175.0cm"),    # CSV 側の単位も外して比較
+    ("180.5", "176cm", None),
+    (180, "185", "185.0cm"),          # CSV が数値型
+    ("１８２", "185cm", None),          # 全角数字も数値として比較
+])
+def test_height_tolerance(csv_height, jba_height, expected):
+    corrected, changed = _correct({"身長": csv_height}, {"height": jba_height})
+    if expected is None:
+        assert corrected["身長"] == csv_height
+        assert "身長" not in changed
+    else:
+        assert corrected["身長"] == expected
+        assert "身長" in changed
+
+
+@pytest.mark.parametrize("csv_weight, jba_weight, expected", [
+    ("70", "75kg", "75.0kg"),
+    ("70.1", "75kg", None),
+    ("80", "75", "75.0kg"),
+    ("70kg", "74.9kg", None),
+])
+def test_weight_tolerance(csv_weight, jba_weight, expected):
+    corrected, changed = _correct({"体重": csv_weight}, {"weight": jba_weight})
+    if expected is None:
+        assert corrected["体重"] == csv_weight
+        assert "体重" not in changed
+    else:
+        assert corrected["体重"] == expected
+        assert "体重" in changed
+
+
+@pytest.mark.parametrize("jba_value", ["", 0, 0.0, "0", "0.0", "0cm", "nan", "NaN", float("nan"), "None", None])
+def test_missing_jba_measurement_is_ignored(jba_value):
+    original = {"身長": "", "体重": "70"}
+    corrected, changed = _correct(original, {"height": jba_value, "weight": jba_value})
+    assert corrected == original
+    assert changed == set()
+
+
+def test_unparsable_jba_measurement_is_ignored():
+    original = {"身長": "180"}
+    corrected, changed = _correct(original, {"height": "不明"})
+    assert corrected == original
+    assert changed == set()
+
+
+@pytest.mark.parametrize("csv_height", ["", "不明", "-", None])
+def test_non_numeric_csv_measurement_takes_jba_value(csv_height):
+    corrected, changed = _correct({"身長": csv_height}, {"height": "182cm"})
+    assert corrected["身長"] == "182.0cm"
+    assert changed == {"身長"}
+
+
+def test_missing_csv_column_takes_jba_value():
+    corrected, changed = _correct({}, {"height": "182", "weight": "75"})
+    assert corrected == {"身長": "182.0cm", "体重": "75.0kg"}
+    assert changed == {"身長", "体重"}
+
+
+def test_csv_digits_with_several_dots_are_left_unchanged():
+    # 数字と「.」だけだが数値として読めない場合は（以前と同じく）何もしない
+    corrected, changed = _correct({"身長": "1.8.0"}, {"height": "182"})
+    assert corrected["身長"] == "1.8.0"
+    assert changed == set()
+
+
+@pytest.mark.parametrize("csv_grade, jba_grade, expected", [
+    ("2", "2", None),
+    ("2", "大学2年", None),           # 数字同士で比較
+    ("3", "大学2年", "大学2年"),
+    ("M1", "修士1年", None),
+    ("2.0", "2", None),
+    ("", "2", "2"),                   # CSV に数字がない場合は文字列比較
+    ("院生", "院生", None),
+    ("院生", "研究生", "研究生"),
+    (" 3 ", " 4 ", "4"),              # 前後の空白は除いて反映
+])
+def test_grade(csv_grade, jba_grade, expected):
+    corrected, changed = _correct({"学年": csv_grade}, {"grade": jba_grade})
+    if expected is None:
+        assert corrected["学年"] == csv_grade
+        assert "学年" not in changed
+    else:
+        assert corrected["学年"] == expected
+        assert "学年" in changed
+
+
+def test_empty_jba_grade_is_ignored():
+    corrected, changed = _correct({"学年": "2"}, {"grade": ""})
+    assert corrected == {"学年": "2"}
+    assert changed == set()
+
+
+@pytest.mark.parametrize("player_no", [None, ""])
+def test_no_jersey_number_skips_measurements_and_grade(player_no):
+    original = {"選手名": "山田 太郎", "身長": "170", "体重": "60", "学年": "1"}
+    jba_data = {"name": "鈴木 一郎", "height": "190cm", "weight": "90kg", "grade": "4"}
+    corrected, changed = _correct(original, jba_data, player_no=player_no)
+    assert corrected == original
+    # 選手名のフラグは背番号に関係なく立てる
+    assert changed == {"選手名"}
+
+
+@pytest.mark.parametrize("csv_name, jba_name, flagged", [
+    ("山田 太郎", "山田　太郎", False),   # JBA 側は NFKC（全角スペース → 半角）
+    ("山田　太郎", "山田　太郎", True),   # CSV 側は正規化しない
+    ("ＡＢＣ", "ABC", True),
+    ("ABC", "ＡＢＣ", False),
+    (" 山田 太郎 ", "山田 太郎 ", False),
+    ("山田 太郎", "山田 次郎", True),
+])
+def test_name_flag(csv_name, jba_name, flagged):
+    original = {"選手名": csv_name}
+    corrected, changed = _correct(original, {"name": jba_name})
+    # 値は CSV のまま
+    assert corrected == original
+    assert ("選手名" in changed) is flagged
+
+
+def test_name_falls_back_to_shimei_column():
+    _, changed = _correct({"氏名": "山田 太郎"}, {"name": "山田 太郎"})
+    assert changed == set()
+    _, changed = _correct({"氏名": "山田 太郎"}, {"name": "山田 次郎"})
+    assert changed == {"選手名"}
+
+
+@pytest.mark.parametrize("csv_kana, jba_kana, flagged", [
+    ("ヤマダ タロウ", "ﾔﾏﾀﾞ ﾀﾛｳ", False),   # 半角カナは NFKC で全角に
+    ("ヤマダ タロウ", "ヤマダ　タロウ", False),
+    ("ﾔﾏﾀﾞ ﾀﾛｳ", "ヤマダ タロウ", True),
+    ("", "ヤマダ タロウ", True),
+])
+def test_kana_flag(csv_kana, jba_kana, flagged):
+    original = {"カナ名": csv_kana}
+    corrected, changed = _correct(original, {"kana_name": jba_kana})
+    assert corrected == original
+    assert ("カナ名" in changed) is flagged
+
+
+def test_edited_name_is_not_flagged():
+    edited = {(UNIVERSITY, "山田 太郎"): True}
+    original = {"選手名": "山田 太郎"}
+    jba_data = {"name": "山田 太朗"}
+    assert _correct(original, jba_data, edited_player_names=edited)[1] == set()
+    # 別の大学・大学名なしの場合は対象外
+    assert _correct(original, jba_data, university="京都大学", edited_player_names=edited)[1] == {"選手名"}
+    assert _correct(original, jba_data, university="", edited_player_names=edited)[1] == {"選手名"}
+
+
+def test_compute_corrections_keeps_order_and_inputs():
+    originals = [
+        {"選手名": "山田 太郎", "身長": "170"},
+        {"選手名": "鈴木 一郎", "身長": "180"},
+    ]
+    jba_records = [
+        {"name": "山田 太郎", "height": "180cm"},
+        {"name": "鈴木 一郎", "height": "181cm"},
+    ]
+    corrected, changed = compute_corrections(originals, jba_records, ["4", "5"], [UNIVERSITY, UNIVERSITY])
+    assert corrected == [
+        {"選手名": "山田 太郎", "身長": "180.0cm"},
+        {"選手名": "鈴木 一郎", "身長": "180"},
+    ]
+    assert changed == [{"身長"}, set()]
+    # 元の行は書き換えない
+    assert originals[0]["身長"] == "170"
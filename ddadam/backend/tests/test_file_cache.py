@@ -0,0 +1,122 @@
+"""cache_adapter.FileCache（期限・LRU）のテスト"""
+
+import json
+import sqlite3
+
+import cache_adapter
+from cache_adapter import FileCache
+
+CLOCK_MODULES = [cache_adapter]
+
+
+def _cache(tmp_path, **kwargs):
+    kwargs.setdefault("max_entries", 0)
+    kwargs.setdefault("max_bytes", 0)
+    kwargs.setdefault("default_ttl", 0)
+    cache = FileCache(str(tmp_path / "cache.sqlite3"), legacy_json_path=str(tmp_path / "missing.json"), **kwargs)
+    # 上限の確認を書き込みごとに行う
+    cache._EVICT_INTERVAL = 1
+    return cache
+
+
+def _row_count(cache):
+    return cache._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+def test_round_trip(tmp_path, clock):
+    cache = _cache(tmp_path)
+    value = {"name": "山田 太郎", "height": 180.5, "tags": ["a", None]}
+    assert cache.set("k", value)
+    assert cache.get("k") == value
+    assert cache.get("missing") is None
+
+
+def test_ttl_expires_lazily_on_read(tmp_path, clock):
+    cache = _cache(tmp_path)
+    cache.set("short", {"v": 1}, ttl=10)
+    cache.set("forever", {"v": 2})
+    clock.now += 9
+    assert cache.get("short") == {"v": 1}
+    clock.now += 2
+    assert cache.keys() == ["forever"]
+    assert cache.stats()["entries"] == 1
+    # 読み込み時に削除される
+    assert _row_count(cache) == 2
+    assert cache.get("short") is None
+    assert _row_count(cache) == 1
+
+
+def test_default_ttl_applies_without_ttl(tmp_path, clock):
+    cache = _cache(tmp_path, default_ttl=60)
+    cache.set("k", {"v": 1})
+    clock.now += 61
+    assert cache.get("k") is None
+
+
+def test_eviction_removes_expired_first(tmp_path, clock):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.set("expiring", {"v": 0}, ttl=5)
+    cache.set("a", {"v": 1})
+    clock.now += 10
+    cache.set("b", {"v": 2})
+    assert sorted(cache.keys()) == ["a", "b"]
+    assert _row_count(cache) == 2
+
+
+def test_lru_eviction_by_entry_count(tmp_path, clock):
+    cache = _cache(tmp_path, max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"key": key})
+        clock.now += 1
+    # 最終アクセス時刻の更新は一定間隔ごと
+    clock.now += FileCache._ACCESS_RESOLUTION
+    assert cache.get("a") is not None
+    cache.set("d", {"key": "d"})
+    assert sorted(cache.keys()) == ["a", "c", "d"]
+    cache.set("e", {"key": "e"})
+    assert sorted(cache.keys()) == ["a", "d", "e"]
+
+
+def test_lru_eviction_by_bytes(tmp_path, clock):
+    cache = _cache(tmp_path)
+    for i in range(10):
+        cache.set(f"k{i}", {"v": "x" * 500})
+        clock.now += 1
+    size = cache._conn.execute("SELECT size FROM cache_entries WHERE key = 'k0'").fetchone()[0]
+    cache.max_bytes = size * 4
+    cache.set("k10", {"v": "x" * 500})
+    assert sorted(cache.keys()) == ["k10", "k7", "k8", "k9"]
+
+
+def test_delete_clear_and_batch_operations(tmp_path, clock):
+    cache = _cache(tmp_path)
+    assert cache.set_many({"a": {"v": 1}, "b": {"v": 2}, "c": {"v": 3}})
+    assert cache.get_many(["a", "b", "missing"]) == {"a": {"v": 1}, "b": {"v": 2}}
+    assert cache.delete("a")
+    assert not cache.delete("a")
+    assert cache.delete_many(["b", "missing"]) == 1
+    assert cache.clear()
+    assert cache.keys() == []
+
+
+def test_migrates_legacy_schema_and_values(tmp_path, clock):
+    db_path = tmp_path / "cache.sqlite3"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE cache_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.execute("INSERT INTO cache_entries VALUES (?, ?)", ("old", json.dumps({"名前": "山田"}, ensure_ascii=False)))
+    conn.commit()
+    conn.close()
+
+    cache = FileCache(str(db_path), legacy_json_path=str(tmp_path / "missing.json"), default_ttl=60)
+    assert cache.get("old") == {"名前": "山田"}
+    clock.now += 61
+    assert cache.get("old") is None
+
+
+def test_imports_legacy_json_file(tmp_path, clock):
+    legacy = tmp_path / "jba_player_cache.json"
+    legacy.write_text(json.dumps({"k": {"v": "あ"}}, ensure_ascii=False), encoding="utf-8")
+    cache = FileCache(str(tmp_path / "cache.sqlite3"), legacy_json_path=str(legacy), default_ttl=0)
+    assert cache.get("k") == {"v": "あ"}
+    assert not legacy.exists()
+    assert (tmp_path / "jba_player_cache.json.migrated").exists()
@@ -0,0 +1,135 @@
+"""worker.html_parsers のテスト（tests/fixtures の保存済みページ）
+
+期待値は lxml に置き換える前の BeautifulSoup（html.parser）版の出力と同じ。
+"""
+
+import os
+
+import pytest
+
+from worker.html_parsers import (
+    extract_csrf_token,
+    parse_edit_page_selected_names,
+    parse_player_details_page,
+    parse_team_members_page,
+    parse_tournament_csv_links,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def test_team_members_page():
+    assert parse_team_members_page(_fixture("jba_team_page.html")) == {
+        "team_name": "東京大学 男子 | JBA",
+        "members": [
+            {
+                "name": "山田　太郎",
+                "position": "PG",
+                "grade": "3",
+                "height": "180cm",
+                "weight": "75kg",
+                "detail_url": "https://team-jba.jp/member/to-team/1001/detail",
+                "registration_status": "登録完了",
+                "member_category": "競技者",
+            },
+            {
+                # 文字列はノードごとに strip して連結（get_text(strip=True) と同じ）
+                "name": "鈴木一郎",
+                "position": "",
+                "grade": "大学2年",
+                "height": "",
+                "weight": "68.5kg",
+                "detail_url": "https://team-jba.jp/member/to-team/1002/detail",
+                "registration_status": "無所属",
+                "member_category": "スタッフ",
+            },
+            {
+                # セル内の script は文字列に含めない
+                "name": "佐藤 次郎",
+                "position": "C",
+                "grade": "1",
+                "height": "195.5 cm",
+                "weight": "90 kg",
+                "detail_url": "https://team-jba.jp/member/to-team/1003/detail",
+                "registration_status": "実績なし",
+                "member_category": None,
+            },
+            {
+                "name": "田中 四郎",
+                "position": "SG",
+                "grade": "4",
+                "height": "",
+                "weight": "",
+                "detail_url": "https://team-jba.jp/member/to-team/1005/detail",
+                "registration_status": None,
+                "member_category": None,
+            },
+        ],
+    }
+
+
+def test_team_members_page_accepts_str():
+    content = _fixture("jba_team_page.html")
+    assert parse_team_members_page(content.decode("utf-8")) == parse_team_members_page(content)
+
+
+@pytest.mark.parametrize("content", [b"", b"   "])
+def test_empty_team_members_page(content):
+    assert parse_team_members_page(content) == {"team_name": "Unknown Team", "members": []}
+
+
+def test_player_details_page_cp932():
+    # meta は Shift_JIS だが CP932 の文字（髙・①）を含む。script / style 内の「身長: …」は使わない
+    assert parse_player_details_page(_fixture("jba_player_detail_cp932.html")) == {
+        "kana_name": "ヤマダ　タロウ",
+        "grade": "3年",
+        "position": "PG",
+        "school": "髙田高等学校①",
+        "uniform_number": "4",
+        "registration_status": "登録完了",
+        "weight": "78.5",
+    }
+
+
+def test_player_details_page_only_requested_fields():
+    content = _fixture("jba_player_detail_cp932.html")
+    assert parse_player_details_page(content, ["height", "weight", "grade", "kana_name"]) == {
+        "grade": "3年",
+        "kana_name": "ヤマダ　タロウ",
+        "weight": "78.5",
+    }
+    assert parse_player_details_page(content, ["kana_name"]) == {"kana_name": "ヤマダ　タロウ"}
+
+
+def test_player_details_page_reads_table_measurements():
+    content = (
+        "<html><body><table>"
+        "<tr><th>身長</th><td>185.5 cm</td></tr>"
+        "<tr><th>体重</th><td>80kg</td></tr>"
+        "</table><p>体重：70kg</p></body></html>"
+    )
+    assert parse_player_details_page(content, ["height", "weight"]) == {"height": "185.5", "weight": "80"}
+
+
+def test_edit_page_selected_names():
+    # 6行以上のテーブルで、user_id のセレクトボックスで選択された選手名だけ
+    # （「選択してください」「?」を含む名前・未選択は除き、最初に selected の付いた option を使う）
+    assert parse_edit_page_selected_names(_fixture("kcbbf_edit_page.html")) == ["山田 太郎", "佐藤次郎"]
+
+
+def test_tournament_csv_links():
+    assert parse_tournament_csv_links(_fixture("kcbbf_tournament_page.html"), "https://www.kcbbf.jp") == [
+        "https://www.kcbbf.jp/master-admin-game_category_teams/csv/id/101",
+        "https://www.kcbbf.jp/master-admin-game_category_teams/csv/id/102",
+        "https://www.kcbbf.jp/master-admin-game_category_teams/csv/id/104?download=1",
+    ]
+
+
+def test_csrf_token():
+    assert extract_csrf_token('<form><input type="hidden" name="_token" value="abc123"></form>') == "abc123"
+    assert extract_csrf_token("<form></form>") == ""
@@ -0,0 +1,185 @@
+"""worker.jba_async_client（httpx.MockTransport で応答を差し替え）と、JBAVerificationSystem からの利用のテスト"""
+
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+import pytest
+
+from worker import jba_async_client, jba_verification_lib
+from worker.jba_async_client import AsyncJBAClient
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+TEAM_URL = "https://team-jba.jp/organization/15250600/team/101/detail"
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+class FakeRateLimiter:
+    """待たずに通すレートリミッター"""
+
+    def acquire(self):
+        pass
+
+    async def acquire_async(self):
+        pass
+
+    def on_response(self, status_code, elapsed, retry_after=None):
+        pass
+
+
+@pytest.fixture
+def mock_jba(monkeypatch):
+    """handler(request) -> httpx.Response で応答する AsyncJBAClient を作る"""
+    monkeypatch.setattr(jba_async_client, "get_rate_limiter", lambda host=None: FakeRateLimiter())
+    clients = []
+
+    def make(handler, **kwargs):
+        client = AsyncJBAClient(**kwargs)
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_get_team_members_many(mock_jba):
+    def handler(request):
+        if request.url.path.endswith("/101/detail"):
+            return httpx.Response(200, content=_fixture("jba_team_page.html"))
+        return httpx.Response(404)
+
+    client = mock_jba(handler)
+    missing_url = "https://team-jba.jp/organization/15250600/team/999/detail"
+    rosters = client.run(client.get_team_members_many([TEAM_URL, missing_url]))
+
+    assert list(rosters) == [TEAM_URL, missing_url]
+    assert rosters[TEAM_URL]["team_name"] == "東京大学 男子 | JBA"
+    assert [member["name"] for member in rosters[TEAM_URL]["members"]] == ["山田　太郎", "鈴木一郎", "佐藤 次郎", "田中 四郎"]
+    assert rosters[missing_url] == {"team_name": "Error", "members": []}
+
+
+def test_get_player_details_transport_error(mock_jba):
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = mock_jba(handler)
+    assert client.run(client.get_player_details("https://team-jba.jp/member/to-team/1/detail", ["height"])) == {}
+
+
+def test_http_client_is_created_once_across_threads(jba_system, monkeypatch):
+    created = []
+
+    class SlowClient:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)
+            created.append(self)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(jba_verification_lib, "AsyncJBAClient", SlowClient)
+    barrier = threading.Barrier(8)
+    clients = []
+
+    def worker():
+        barrier.wait()
+        clients.append(jba_system._get_http_client())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(2.0)
+
+    assert len(created) == 1
+    assert len(clients) == 8
+    assert all(client is created[0] for client in clients)
+
+
+SEARCH_RECORDS = {"status": "success", "records": [{"id": "101", "team_name": "東京大学", "team_gender_id": "男子"}]}
+
+
+class FakeJBASearch:
+    """チーム検索ページ（CSRFトークン）と検索APIの応答を再現する"""
+
+    def __init__(self, reject=None):
+        self.token_fetches = 0
+        self.valid_token = None
+        self.posted_tokens = []
+        # 最初の検索を拒否する応答（None の場合は拒否しない）
+        self.reject = reject
+
+    def __call__(self, request):
+        if request.url.path == "/login":
+            return httpx.Response(200, text='<html><form action="/login/done"></form></html>')
+        if request.method == "GET":
+            self.token_fetches += 1
+            self.valid_token = f"token-{self.token_fetches}"
+            return httpx.Response(200, text=f'<html><input name="_token" value="{self.valid_token}"></html>')
+
+        token = request.headers.get("X-CSRF-Token")
+        self.posted_tokens.append(token)
+        if token != self.valid_token:
+            if self.reject == "login":
+                return httpx.Response(302, headers={"location": "https://team-jba.jp/login"})
+            return httpx.Response(self.reject or 419)
+        return httpx.Response(200, json=SEARCH_RECORDS)
+
+
+EXPECTED_TEAMS = [{"id": "101", "name": "東京大学", "url": TEAM_URL}]
+
+
+def test_csrf_token_is_reused_across_searches(mock_jba):
+    jba = FakeJBASearch()
+    client = mock_jba(jba)
+    for name in ["東京", "京都", "大阪"]:
+        assert client.run(client.search_teams(name, "2025")) == EXPECTED_TEAMS
+    assert jba.token_fetches == 1
+    assert jba.posted_tokens == ["token-1"] * 3
+
+
+def test_token_from_login_page_skips_the_search_page(mock_jba):
+    jba = FakeJBASearch()
+    jba.valid_token = "from-login"
+    client = mock_jba(jba, csrf_token="from-login")
+    assert client.run(client.search_teams("東京", "2025")) == EXPECTED_TEAMS
+    assert jba.token_fetches == 0
+
+
+@pytest.mark.parametrize("reject", [419, 403, "login"])
+def test_rejected_token_is_fetched_again_once(mock_jba, reject):
+    jba = FakeJBASearch(reject=reject)
+    client = mock_jba(jba, csrf_token="expired")
+    assert client.run(client.search_teams("東京", "2025")) == EXPECTED_TEAMS
+    assert jba.token_fetches == 1
+    assert jba.posted_tokens == ["expired", "token-1"]
+
+
+def test_concurrent_rejections_fetch_the_token_once(mock_jba):
+    jba = FakeJBASearch()
+    client = mock_jba(jba, csrf_token="expired")
+
+    async def search_all():
+        return await asyncio.gather(*(client.search_teams(name, "2025") for name in ["東京", "京都", "大阪", "神戸"]))
+
+    assert client.run(search_all()) == [EXPECTED_TEAMS] * 4
+    assert jba.token_fetches == 1
+
+
+def test_search_gives_up_after_one_retry(mock_jba):
+    def handler(request):
+        if request.method == "GET":
+            return httpx.Response(200, text='<html><input name="_token" value="token"></html>')
+        return httpx.Response(419)
+
+    client = mock_jba(handler)
+    assert client.run(client.search_teams("東京", "2025")) == []
@@ -0,0 +1,84 @@
+"""worker.name_matching のテスト"""
+
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+from worker.name_matching import _bounded_lcs_length, similarity_with_cutoff
+
+THRESHOLDS = [0.0, 0.3, 0.5, 0.6, 0.75, 0.8, 0.9, 1.0]
+
+
+def _lcs_length(a, b):
+    """最長共通部分列の長さ（動的計画法）"""
+    previous = [0] * (len(b) + 1)
+    for ch in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if ch == other else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def _random_pairs(count, alphabet="やまだたろうさとけんヤマダタロウ", max_length=8, seed=20240401):
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+        # 半分は a を少し変えた名前にして、閾値付近の組み合わせを増やす
+        if rng.random() < 0.5 and a:
+            chars = list(a)
+            for _ in range(rng.randint(1, 3)):
+                position = rng.randrange(len(chars) + 1)
+                if chars and rng.random() < 0.5:
+                    del chars[min(position, len(chars) - 1)]
+                else:
+                    chars.insert(position, rng.choice(alphabet))
+            b = "".join(chars)
+        else:
+            b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+        pairs.append((a, b))
+    return pairs
+
+
+@pytest.mark.parametrize("threshold", THRESHOLDS)
+def test_cutoff_matches_sequence_matcher(threshold):
+    for a, b in _random_pairs(3000):
+        ratio = SequenceMatcher(None, a, b).ratio()
+        similarity = similarity_with_cutoff(a, b, threshold)
+        assert (similarity >= threshold) == (ratio >= threshold), (a, b)
+        if ratio >= threshold:
+            assert similarity == ratio, (a, b)
+        else:
+            assert similarity == 0.0 or threshold <= 0, (a, b)
+
+
+def test_without_threshold_returns_ratio():
+    for a, b in _random_pairs(500, seed=7):
+        assert similarity_with_cutoff(a, b) == SequenceMatcher(None, a, b).ratio()
+
+
+def test_identical_names():
+    assert similarity_with_cutoff("やまだたろう", "やまだたろう", 1.0) == 1.0
+    assert similarity_with_cutoff("", "", 0.8) == 1.0
+
+
+def test_threshold_one_requires_exact_match():
+    assert similarity_with_cutoff("やまだたろう", "やまだたろ", 1.0) == 0.0
+
+
+def test_bounded_lcs_without_cutoff_equals_dp():
+    for a, b in _random_pairs(2000, seed=11, max_length=12):
+        assert _bounded_lcs_length(a, b, 0) == _lcs_length(a, b), (a, b)
+
+
+def test_bounded_lcs_stops_below_required():
+    for a, b in _random_pairs(2000, seed=13, max_length=12):
+        lcs = _lcs_length(a, b)
+        for required in range(0, max(len(a), len(b)) + 2):
+            result = _bounded_lcs_length(a, b, required)
+            if lcs >= required:
+                assert result == lcs, (a, b, required)
+            else:
+                assert result < required, (a, b, required)
@@ -0,0 +1,42 @@
+"""worker.name_normalizer のテスト"""
+
+import pytest
+
+from worker.name_normalizer import (
+    normalize_match_key,
+    normalize_name_text,
+    normalize_university_name,
+    university_match_key,
+)
+
+
+@pytest.mark.parametrize("name", ["國學院大學", "早稲田大学", "日本體育大學", "廣島大学", "櫻美林大学"])
+def test_university_search_name_keeps_official_spelling(name):
+    # JBAの検索に使うため異体字は畳み込まない
+    assert normalize_university_name(name) == name
+
+
+def test_university_search_name_replacements():
+    assert normalize_university_name(" 白鷗大学 ") == "白鴎大学"
+    assert normalize_university_name("白鴎大学") == "白鴎大学"
+    assert normalize_university_name("東京短大") == "東京短期大学"
+    assert normalize_university_name("東京短期大学") == "東京短期大学"
+
+
+def test_university_match_key_folds_variants():
+    assert university_match_key("國學院大學") == "国學院大學"
+    assert university_match_key("白鷗大学") == university_match_key("白鴎大学")
+    assert university_match_key("櫻美林短大") == "桜美林短期大学"
+
+
+def test_match_key_folds_variants_dashes_and_spaces():
+    assert normalize_match_key("髙橋　太郎") == normalize_match_key("高橋 太郎") == "高橋太郎"
+    assert normalize_match_key("ｻﾄｳ・ｹﾝ") == normalize_match_key("サトウ ケン")
+    assert normalize_match_key("ジョン-スミス") == normalize_match_key("ジョン スミス")
+    assert normalize_match_key("JOHN Smith") == "johnsmith"
+
+
+def test_name_text_keeps_spacing_but_drops_parentheses():
+    assert normalize_name_text("山﨑　太郎（主将）") == "山崎 太郎"
+    assert normalize_name_text("ﾔﾏｻﾞｷ  ﾀﾛｳ") == "ヤマザキ タロウ"
+    assert normalize_name_text("マイケル・ジョ-ダン") == "マイケルジョーダン"
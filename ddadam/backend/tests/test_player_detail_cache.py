@@ -0,0 +1,75 @@
+"""worker.player_detail_cache（フィールドごとの取得時刻）のテスト"""
+
+import pytest
+
+import cache_adapter
+from cache_adapter import FileCache
+from worker import player_detail_cache
+from worker.player_detail_cache import PlayerDetailCache
+
+CLOCK_MODULES = [cache_adapter, player_detail_cache]
+
+TTL = 100
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    file_cache = FileCache(str(tmp_path / "cache.sqlite3"), legacy_json_path=str(tmp_path / "missing.json"),
+                           max_entries=0, max_bytes=0, default_ttl=0)
+    return PlayerDetailCache(cache=file_cache, ttl_seconds=TTL)
+
+
+def test_get_requires_all_fields(cache):
+    cache.put("2025", "1", {"height": "180cm"}, ["height", "weight"])
+    assert cache.get("2025", "1", ["height"]) == {"height": "180cm"}
+    # ページに項目がなかったフィールドも取得済み
+    assert cache.get("2025", "1", ["height", "weight"]) == {"height": "180cm"}
+    assert cache.get("2025", "1", ["grade"]) is None
+
+
+def test_merge_does_not_extend_older_fields(cache, clock):
+    cache.put("2025", "1", {"height": "180cm"}, ["height"])
+    clock.now += TTL - 10
+    cache.put("2025", "1", {"grade": "3"}, ["grade"])
+
+    clock.now += 20
+    # 先に取得した height は期限切れ、後から追記した grade は有効
+    assert cache.get("2025", "1", ["height"]) is None
+    assert cache.get("2025", "1", ["grade"]) == {"grade": "3"}
+    assert cache.get("2025", "1", ["height", "grade"]) is None
+
+
+def test_refetch_replaces_value_and_time(cache, clock):
+    cache.put("2025", "1", {"height": "180cm", "grade": "2"}, ["height", "grade"])
+    clock.now += TTL - 10
+    cache.put("2025", "1", {}, ["grade"])
+
+    clock.now += 20
+    assert cache.get("2025", "1", ["grade"]) == {}
+    assert cache.get("2025", "1", ["height"]) is None
+
+
+def test_expired_fields_are_dropped_on_merge(cache, clock):
+    cache.put("2025", "1", {"height": "180cm"}, ["height"])
+    clock.now += TTL + 1
+    cache.put("2025", "1", {"grade": "3"}, ["grade"])
+    assert cache.cache.get("jba_detail:2025:1")["details"] == {"grade": "3"}
+
+
+def test_get_many(cache, clock):
+    cache.put("2025", "1", {"height": "180cm"}, ["height"])
+    clock.now += TTL - 10
+    cache.put("2025", "2", {"height": "170cm"}, ["height"])
+    clock.now += 20
+    assert cache.get_many("2025", {"1": ["height"], "2": ["height"], "3": ["height"]}) == {"2": {"height": "170cm"}}
+
+
+def test_reads_legacy_entries(cache, clock):
+    cache.cache.set("jba_detail:2025:1", {
+        "details": {"height": "180cm"},
+        "fields": ["height", "weight"],
+        "fetched_at": clock.now,
+    })
+    assert cache.get("2025", "1", ["height", "weight"]) == {"height": "180cm"}
+    clock.now += TTL + 1
+    assert cache.get("2025", "1", ["height"]) is None
@@ -0,0 +1,111 @@
+"""選手詳細の一括取得（apply_deferred_details / get_player_details_batch）のテスト"""
+
+import pytest
+
+from cache_adapter import FileCache
+from worker.player_detail_cache import PlayerDetailCache
+from worker.roster_index import RosterIndex
+
+URL_1 = "https://team-jba.jp/member/to-team/1001/detail"
+URL_2 = "https://team-jba.jp/member/to-team/1002/detail"
+
+PAGES = {
+    URL_1: {"height": "180", "weight": "75", "grade": "3", "kana_name": "ヤマダ タロウ"},
+    URL_2: {"height": "170", "weight": "60", "grade": "1", "kana_name": "スズキ イチロウ"},
+}
+
+
+class FakeHTTP:
+    """AsyncJBAClient の代わり（取得要求を記録し、要求されたフィールドだけ返す）"""
+
+    def __init__(self):
+        self.batches = []
+
+    def run(self, result):
+        return result
+
+    def get_player_details_batch(self, detail_fields):
+        self.batches.append({url: sorted(fields) for url, fields in detail_fields.items()})
+        return {url: {k: v for k, v in PAGES[url].items() if k in fields} for url, fields in detail_fields.items()}
+
+
+@pytest.fixture
+def http(jba_system):
+    fake = FakeHTTP()
+    jba_system._get_http_client = lambda: fake
+    return fake
+
+
+def _results(jba_system, requests):
+    """[(member, fields, registration_status)] から照合結果（detail_request 付き）を作る"""
+    members = [member for member, _, _ in requests]
+    index = RosterIndex(members, jba_system.normalize_name)
+    return [
+        {
+            "status": "match",
+            "jba_data": member,
+            "detail_request": {"url": member["detail_url"], "fields": fields, "index": index,
+                               "registration_status": status},
+        }
+        for member, fields, status in requests
+    ]
+
+
+def test_same_page_is_fetched_once_with_union_of_fields(jba_system, http):
+    # 同じ選手が背番号あり・なしの2行で照合された場合（同じ名簿のメンバー dict は別オブジェクトの想定）
+    with_number = {"name": "山田 太郎", "detail_url": URL_1}
+    without_number = {"name": "山田 太郎", "detail_url": URL_1}
+    other = {"name": "鈴木 一郎", "detail_url": URL_2}
+    results = _results(jba_system, [
+        (with_number, ["height", "weight", "grade", "kana_name"], "登録完了"),
+        (without_number, ["kana_name"], None),
+        (other, ["kana_name"], None),
+    ])
+
+    assert jba_system.apply_deferred_details(results) == 2
+
+    assert http.batches == [{
+        URL_1: ["grade", "height", "kana_name", "weight"],
+        URL_2: ["kana_name"],
+    }]
+    # 各結果には要求したフィールドだけを反映し、チームページの登録状態を優先
+    assert with_number == {"name": "山田 太郎", "detail_url": URL_1, "height": "180", "weight": "75",
+                           "grade": "3", "kana_name": "ヤマダ タロウ", "registration_status": "登録完了"}
+    assert without_number == {"name": "山田 太郎", "detail_url": URL_1, "kana_name": "ヤマダ タロウ"}
+    assert other["kana_name"] == "スズキ イチロウ"
+    assert all("detail_request" not in result for result in results)
+
+
+def test_kana_is_indexed_after_details(jba_system, http):
+    member = {"name": "山田 太郎", "detail_url": URL_1}
+    results = _results(jba_system, [(member, ["kana_name"], None)])
+    index = results[0]["detail_request"]["index"]
+    jba_system.apply_deferred_details(results)
+    assert [entry.member for entry in index.by_kana(jba_system.normalize_name("ヤマダ タロウ"))] == [member]
+
+
+def test_results_without_detail_request_are_skipped(jba_system, http):
+    assert jba_system.apply_deferred_details([{"status": "not_found"}]) == 0
+    assert http.batches == []
+
+
+def test_cached_details_are_not_fetched(jba_system, http, tmp_path):
+    file_cache = FileCache(str(tmp_path / "cache.sqlite3"), legacy_json_path=str(tmp_path / "missing.json"))
+    jba_system.detail_cache = PlayerDetailCache(cache=file_cache)
+    jba_system.detail_cache.put(jba_system.get_current_fiscal_year(), "1001", {"kana_name": "ヤマダ タロウ"}, ["kana_name"])
+
+    details = jba_system.get_player_details_batch({URL_1: ["kana_name"], URL_2: ["kana_name", "grade"]})
+
+    assert http.batches == [{URL_2: ["grade", "kana_name"]}]
+    assert details == {URL_1: {"kana_name": "ヤマダ タロウ"}, URL_2: {"kana_name": "スズキ イチロウ", "grade": "1"}}
+    # 取得した詳細はキャッシュに保存され、次は取得しない
+    jba_system.get_player_details_batch({URL_2: ["grade"]})
+    assert len(http.batches) == 1
+
+
+def test_fetch_error_returns_no_details(jba_system, http):
+    def fail(detail_fields):
+        raise RuntimeError("event loop stopped")
+
+    http.get_player_details_batch = fail
+    assert jba_system.get_player_details_batch({URL_1: ["kana_name"]}) == {}
@@ -0,0 +1,75 @@
+"""worker.rate_limiter のテスト（時刻は偽の時計で進める）"""
+
+import pytest
+
+from worker import rate_limiter
+from worker.rate_limiter import TokenBucketRateLimiter, parse_retry_after
+
+CLOCK_MODULES = [rate_limiter]
+
+
+def test_burst_then_paced_reservations(clock):
+    limiter = TokenBucketRateLimiter(rate=2.0, burst=3)
+    # バケット容量までは待たずに送れる
+    assert [limiter._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # 以降は前借りのため、予約順に 1/rate 秒ずつ待ち時間が伸びる
+    assert [limiter._reserve() for _ in range(3)] == pytest.approx([0.5, 1.0, 1.5])
+
+
+def test_tokens_refill_over_time(clock):
+    limiter = TokenBucketRateLimiter(rate=2.0, burst=2)
+    limiter._reserve()
+    limiter._reserve()
+    clock.now += 0.5
+    assert limiter._reserve() == 0.0
+    # 容量を超えては貯まらない
+    clock.now += 100
+    assert [limiter._reserve() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.5])
+
+
+def test_acquire_sleeps_for_the_reserved_wait(clock):
+    limiter = TokenBucketRateLimiter(rate=4.0, burst=1)
+    start = clock.now
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.now - start == pytest.approx(0.25)
+
+
+def test_throttle_halves_rate_and_pauses(clock):
+    limiter = TokenBucketRateLimiter(rate=4.0, burst=5, min_rate=0.5)
+    limiter.on_response(429, 0.1, retry_after=3.0)
+    assert limiter.rate == 2.0
+    # 一時停止中はトークンがあっても Retry-After まで待つ
+    assert limiter._reserve() == pytest.approx(3.0)
+
+
+def test_throttle_never_drops_below_min_rate(clock):
+    limiter = TokenBucketRateLimiter(rate=4.0, burst=5, min_rate=0.5)
+    for _ in range(10):
+        limiter.on_response(503, 0.1)
+    assert limiter.rate == 0.5
+    limiter.on_response(None, 0.1)
+    assert limiter.rate == 0.5
+
+
+def test_slow_response_backs_off_gently(clock):
+    limiter = TokenBucketRateLimiter(rate=10.0, burst=5, slow_response_sec=2.0)
+    limiter.on_response(200, 3.0)
+    assert limiter.rate == pytest.approx(8.0)
+    limiter.on_response(200, 1.0)
+    assert limiter.rate == pytest.approx(8.5)
+
+
+def test_recovers_to_base_rate(clock):
+    limiter = TokenBucketRateLimiter(rate=10.0, burst=5)
+    limiter.on_response(429, 0.1)
+    for _ in range(100):
+        limiter.on_response(200, 0.1)
+    assert limiter.rate == 10.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
@@ -0,0 +1,116 @@
+"""cache_adapter.RedisCache（SCAN・MGET・パイプライン）のテスト"""
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+redis = pytest.importorskip("redis")
+
+from cache_adapter import RedisCache
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def cache(server, monkeypatch):
+    monkeypatch.setattr(redis, "from_url", lambda url, **kwargs: fakeredis.FakeRedis(server=server))
+    return RedisCache("redis://test")
+
+
+def _spy(monkeypatch, obj, name):
+    """obj.name の呼び出し引数を記録する"""
+    calls = []
+    original = getattr(obj, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(obj, name, wrapper)
+    return calls
+
+
+def test_round_trip_uses_prefix(cache):
+    value = {"name": "山田 太郎", "height": 180.5}
+    assert cache.set("k", value)
+    assert cache.get("k") == value
+    assert cache.get("missing") is None
+    assert cache.client.exists("jba_cache:k")
+
+
+def test_get_many_uses_one_mget_and_omits_missing(cache, monkeypatch):
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    calls = _spy(monkeypatch, cache.client, "mget")
+
+    assert cache.get_many(["a", "missing", "b", "a"]) == {"a": {"v": 1}, "b": {"v": 2}}
+    # 重複を除いて1往復
+    assert calls == [(["jba_cache:a", "jba_cache:missing", "jba_cache:b"],)]
+
+
+def test_get_many_chunks_by_batch_size(cache, monkeypatch):
+    monkeypatch.setattr(RedisCache, "_BATCH_SIZE", 2)
+    cache.set_many({f"k{i}": {"v": i} for i in range(5)})
+    calls = _spy(monkeypatch, cache.client, "mget")
+
+    assert cache.get_many([f"k{i}" for i in range(5)]) == {f"k{i}": {"v": i} for i in range(5)}
+    assert [len(args[0]) for args in calls] == [2, 2, 1]
+
+
+def test_set_many_uses_pipeline_with_ttl(cache, monkeypatch):
+    monkeypatch.setattr(RedisCache, "_BATCH_SIZE", 2)
+    calls = _spy(monkeypatch, cache.client, "pipeline")
+
+    assert cache.set_many({"a": {"v": 1}, "b": {"v": 2}, "c": {"v": 3}}, ttl=60)
+    assert len(calls) == 2
+    assert cache.get_many(["a", "b", "c"]) == {"a": {"v": 1}, "b": {"v": 2}, "c": {"v": 3}}
+    for key in ("a", "b", "c"):
+        assert 0 < cache.client.ttl(f"jba_cache:{key}") <= 60
+
+
+def test_set_many_without_ttl_does_not_expire(cache):
+    cache.set_many({"a": {"v": 1}})
+    assert cache.client.ttl("jba_cache:a") == -1
+
+
+def test_delete_many_returns_deleted_count(cache, monkeypatch):
+    monkeypatch.setattr(RedisCache, "_BATCH_SIZE", 2)
+    cache.set_many({"a": {"v": 1}, "b": {"v": 2}, "c": {"v": 3}})
+
+    assert cache.delete_many(["a", "b", "c", "missing"]) == 3
+    assert cache.keys() == []
+
+
+def test_keys_and_clear_are_limited_to_prefix(cache, monkeypatch):
+    monkeypatch.setattr(RedisCache, "_BATCH_SIZE", 2)
+    cache.set_many({f"k{i}": {"v": i} for i in range(5)})
+    cache.client.set("other:k", b"x")
+    # fakeredis は INFO に対応していない
+    monkeypatch.setattr(cache.client, "info", lambda section=None: {"used_memory": 0})
+    keys_calls = _spy(monkeypatch, cache.client, "keys")
+
+    assert sorted(cache.keys()) == [f"k{i}" for i in range(5)]
+    assert cache.stats()["entries"] == 5
+
+    assert cache.clear()
+    assert cache.keys() == []
+    assert cache.client.get("other:k") == b"x"
+    # KEYS は使わない
+    assert keys_calls == []
+
+
+def test_errors_are_swallowed(cache, monkeypatch):
+    def broken(*args, **kwargs):
+        raise redis.ConnectionError("down")
+
+    for name in ("get", "mget", "pipeline", "delete", "scan_iter"):
+        monkeypatch.setattr(cache.client, name, broken)
+
+    assert cache.get("k") is None
+    assert cache.get_many(["k"]) == {}
+    assert cache.set_many({"k": {"v": 1}}) is False
+    assert cache.delete_many(["k"]) == 0
+    assert cache.clear() is False
+    assert cache.keys() == []
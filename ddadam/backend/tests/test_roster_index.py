@@ -0,0 +1,47 @@
+"""worker.roster_index のテスト"""
+
+from worker.name_normalizer import normalize_match_key
+from worker.roster_index import RosterIndex
+
+
+def _members():
+    return [
+        {"name": "山田 太郎", "kana_name": "ヤマダ タロウ", "member_category": "競技者", "registration_status": "登録完了"},
+        {"name": "髙橋 次郎", "kana_name": None, "member_category": "スタッフ"},
+        {"name": "山田 太郎", "kana_name": None},
+    ]
+
+
+def test_exact_lookup_by_normalized_name():
+    index = RosterIndex(_members(), normalize_match_key)
+    assert [e.position for e in index.by_name(normalize_match_key("山田太郎"))] == [0, 2]
+    assert [e.position for e in index.by_name(normalize_match_key("高橋 次郎"))] == [1]
+    assert index.by_name("missing") == []
+    entry = index.entry_for(index.members[0])
+    assert entry.is_athlete and entry.is_registered
+
+
+def test_refresh_member_reindexes_kana_in_position_order():
+    members = _members()
+    index = RosterIndex(members, normalize_match_key)
+    key = normalize_match_key("ヤマダ タロウ")
+    before = index.by_kana(key)
+
+    members[2]["kana_name"] = "ヤマダ タロウ"
+    index.refresh_member(members[2])
+    assert [e.position for e in index.by_kana(key)] == [0, 2]
+    # 読み込み中のリストは書き換えずに差し替える
+    assert [e.position for e in before] == [0]
+
+    members[0]["kana_name"] = "ヤマダ タロ"
+    index.refresh_member(members[0])
+    assert [e.position for e in index.by_kana(key)] == [2]
+    assert [e.position for e in index.by_kana(normalize_match_key("ヤマダ タロ"))] == [0]
+
+
+def test_refresh_member_ignores_unknown_and_unchanged():
+    members = _members()
+    index = RosterIndex(members, normalize_match_key)
+    index.refresh_member({"name": "他チーム"})
+    index.refresh_member(members[0])
+    assert [e.position for e in index.by_kana(normalize_match_key("ヤマダタロウ"))] == [0]
@@ -0,0 +1,78 @@
+"""worker.roster_store（名簿の永続ストアと鮮度判定）のテスト"""
+
+import pytest
+
+import cache_adapter
+from cache_adapter import FileCache
+from config import settings
+from worker import roster_store
+from worker.roster_store import CacheRosterStore, SQLiteRosterStore
+
+CLOCK_MODULES = [roster_store, cache_adapter]
+
+TTL = 100
+MAX_STALE = 1000
+
+TEAM_DATA = {"team_name": "東京大学", "members": [{"member_id": "1", "name": "山田　太郎"}]}
+
+
+@pytest.fixture(autouse=True)
+def _ttl(monkeypatch):
+    monkeypatch.setattr(settings, "roster_ttl_seconds", TTL)
+    monkeypatch.setattr(settings, "roster_max_stale_seconds", MAX_STALE)
+
+
+@pytest.fixture(params=["sqlite", "cache"])
+def store(request, tmp_path, clock):
+    if request.param == "sqlite":
+        return SQLiteRosterStore(str(tmp_path / "rosters.sqlite3"))
+    file_cache = FileCache(str(tmp_path / "cache.sqlite3"), legacy_json_path=str(tmp_path / "missing.json"),
+                           max_entries=0, max_bytes=0, default_ttl=0)
+    return CacheRosterStore(cache=file_cache)
+
+
+def test_round_trip(store, clock):
+    assert store.put("2025", "101", TEAM_DATA)
+    assert store.get("2025", "101") == (TEAM_DATA, clock.now)
+    # 年度・チームIDが違えば別の名簿
+    assert store.get("2024", "101") is None
+    assert store.get("2025", "102") is None
+
+
+def test_put_replaces_snapshot(store, clock):
+    store.put("2025", "101", TEAM_DATA)
+    clock.now += 10
+    updated = {"team_name": "東京大学", "members": []}
+    store.put("2025", "101", updated)
+    assert store.get("2025", "101") == (updated, clock.now)
+
+
+def test_put_keeps_given_fetched_at(store, clock):
+    store.put("2025", "101", TEAM_DATA, fetched_at=clock.now - TTL - 1)
+    assert store.lookup("2025", "101") == (TEAM_DATA, "stale")
+
+
+def test_lookup_miss(store):
+    assert store.lookup("2025", "101") == (None, "miss")
+
+
+def test_lookup_ttl_boundary(store, clock):
+    store.put("2025", "101", TEAM_DATA)
+    clock.now += TTL
+    assert store.lookup("2025", "101") == (TEAM_DATA, "fresh")
+    clock.now += 1
+    assert store.lookup("2025", "101") == (TEAM_DATA, "stale")
+
+
+def test_lookup_max_stale_boundary(store, clock):
+    store.put("2025", "101", TEAM_DATA)
+    clock.now += MAX_STALE - 1
+    assert store.lookup("2025", "101") == (TEAM_DATA, "stale")
+    clock.now += 1
+    assert store.lookup("2025", "101") == (None, "miss")
+
+
+def test_sqlite_store_persists_across_instances(tmp_path, clock):
+    path = str(tmp_path / "rosters.sqlite3")
+    SQLiteRosterStore(path).put("2025", "101", TEAM_DATA)
+    assert SQLiteRosterStore(path).lookup("2025", "101") == (TEAM_DATA, "fresh")
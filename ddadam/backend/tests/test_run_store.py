@@ -0,0 +1,62 @@
+"""worker.run_store のテスト"""
+
+import pandas as pd
+
+from worker.run_store import TournamentRunStore, combined_csv_hash, csv_content_hash
+
+
+def _results(index):
+    return [{'index': label, 'status': 'match', 'original_data': {'選手名': f"選手{i}"}} for i, label in enumerate(index)]
+
+
+def test_reused_results_take_the_current_index(tmp_path):
+    store = TournamentRunStore(str(tmp_path / "runs.sqlite3"))
+    first_run = pd.RangeIndex(0, 3)
+    store.put("g1", "東京大学", "h1", _results(first_run), first_run)
+
+    # 再実行では同じCSVが別の順番で届き、行番号がずれる
+    second_run = pd.RangeIndex(10, 13)
+    reused = store.get("g1", "h1", second_run)
+    assert [r['index'] for r in reused] == [10, 11, 12]
+    assert [r['original_data']['選手名'] for r in reused] == ["選手0", "選手1", "選手2"]
+
+
+def test_put_does_not_modify_results(tmp_path):
+    store = TournamentRunStore(str(tmp_path / "runs.sqlite3"))
+    index = pd.RangeIndex(5, 7)
+    results = _results(index)
+    store.put("g1", "東京大学", "h1", results, index)
+    assert [r['index'] for r in results] == [5, 6]
+
+
+def test_each_csv_of_a_university_is_keyed_by_its_own_hash(tmp_path):
+    store = TournamentRunStore(str(tmp_path / "runs.sqlite3"))
+    store.put("g1", "東京大学", "h1", _results(pd.RangeIndex(0, 2)), pd.RangeIndex(0, 2))
+    store.put("g1", "東京大学", "h2", _results(pd.RangeIndex(2, 5)), pd.RangeIndex(2, 5))
+
+    assert len(store.get("g1", "h1", pd.RangeIndex(0, 2))) == 2
+    assert len(store.get("g1", "h2", pd.RangeIndex(0, 3))) == 3
+    assert store.get("g1", "h3", pd.RangeIndex(0, 3)) is None
+    assert store.get("g2", "h1", pd.RangeIndex(0, 2)) is None
+
+
+def test_row_count_mismatch_is_not_reused(tmp_path):
+    store = TournamentRunStore(str(tmp_path / "runs.sqlite3"))
+    store.put("g1", "東京大学", "h1", _results(pd.RangeIndex(0, 3)), pd.RangeIndex(0, 3))
+    assert store.get("g1", "h1", pd.RangeIndex(0, 2)) is None
+
+
+def test_expired_results_are_not_reused(tmp_path, monkeypatch):
+    from config import settings
+    store = TournamentRunStore(str(tmp_path / "runs.sqlite3"))
+    store.put("g1", "東京大学", "h1", _results(pd.RangeIndex(0, 1)), pd.RangeIndex(0, 1))
+    monkeypatch.setattr(settings, "roster_ttl_seconds", -1)
+    assert store.get("g1", "h1", pd.RangeIndex(0, 1)) is None
+
+
+def test_combined_csv_hash():
+    a, b = csv_content_hash(b"a"), csv_content_hash(b"b")
+    assert combined_csv_hash([]) is None
+    assert combined_csv_hash([a]) == a
+    assert combined_csv_hash([a, b]) not in (a, b)
+    assert combined_csv_hash([a, b]) != combined_csv_hash([b, a])
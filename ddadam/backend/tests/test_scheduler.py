@@ -0,0 +1,70 @@
+"""worker.scheduler のテスト"""
+
+import threading
+
+from worker.scheduler import WorkScheduler, when_all
+
+
+def _blocked_scheduler():
+    """ワーカー1つのスケジューラーと、そのワーカーを止めておくイベント"""
+    scheduler = WorkScheduler(max_workers=1, name="test-scheduler")
+    gate = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        gate.wait(2.0)
+
+    scheduler.submit(block)
+    assert started.wait(2.0)
+    return scheduler, gate
+
+
+def test_priority_within_a_job_then_submission_order():
+    scheduler, gate = _blocked_scheduler()
+    job = scheduler.new_priority_group()
+    first, second = job.next_priority(), job.next_priority()
+    order = []
+    futures = [
+        scheduler.submit(order.append, "second-a", priority=second),
+        scheduler.submit(order.append, "first-a", priority=first),
+        scheduler.submit(order.append, "first-b", priority=first),
+    ]
+    gate.set()
+    when_all(futures).result(2.0)
+    scheduler.shutdown()
+    assert order == ["first-a", "first-b", "second-a"]
+
+
+def test_later_job_is_not_starved():
+    scheduler, gate = _blocked_scheduler()
+    job_a = scheduler.new_priority_group()
+    job_b = scheduler.new_priority_group()
+    order = []
+    futures = [scheduler.submit(order.append, f"A{i}", priority=job_a.next_priority()) for i in range(3)]
+    # 後から始めたジョブの大学も、先のジョブの残りの大学と交互に実行される
+    futures += [scheduler.submit(order.append, f"B{i}", priority=job_b.next_priority()) for i in range(2)]
+    gate.set()
+    when_all(futures).result(2.0)
+    scheduler.shutdown()
+    assert order == ["A0", "B0", "A1", "B1", "A2"]
+
+
+def test_exceptions_are_set_on_the_future():
+    scheduler = WorkScheduler(max_workers=2)
+
+    def fail():
+        raise ValueError("boom")
+
+    future = scheduler.submit(fail)
+    assert isinstance(future.exception(2.0), ValueError)
+    scheduler.shutdown()
+
+
+def test_when_all():
+    scheduler = WorkScheduler(max_workers=4)
+    futures = [scheduler.submit(lambda i=i: i * i) for i in range(10)]
+    combined = when_all(futures)
+    assert [f.result() for f in combined.result(2.0)] == [i * i for i in range(10)]
+    assert when_all([]).result(0) == []
+    scheduler.shutdown()
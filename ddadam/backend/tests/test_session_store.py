@@ -0,0 +1,147 @@
+"""worker.session_store（暗号化したログインセッションの保存）と保存済みセッションの復元のテスト"""
+
+import os
+import stat
+
+import pytest
+import requests
+from cryptography.fernet import Fernet
+
+from config import settings
+from worker import jba_verification_lib, session_store
+from worker.session_store import SessionStore, export_cookies, import_cookies
+
+CLOCK_MODULES = [session_store]
+
+COOKIES = [{"name": "laravel_session", "value": "abc", "domain": "team-jba.jp", "path": "/",
+            "secure": True, "expires": None, "rest": {"HttpOnly": None}}]
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return SessionStore(str(tmp_path / "sessions.sqlite3"))
+
+
+def test_round_trip_is_encrypted(store, tmp_path):
+    assert store.save("jba", "user@example.com", "secret", COOKIES)
+    assert store.load("jba", "user@example.com", "secret") == COOKIES
+
+    # クッキー・認証情報は平文で保存しない
+    with open(store.db_path, "rb") as f:
+        raw = f.read()
+    assert b"laravel_session" not in raw
+    assert b"user@example.com" not in raw
+
+
+def test_key_file_is_created_owner_only(store):
+    mode = stat.S_IMODE(os.stat(f"{store.db_path}.key").st_mode)
+    assert mode == 0o600
+    # 同じ鍵ファイルを使う別のインスタンスでも読める
+    store.save("jba", "user", "secret", COOKIES)
+    assert SessionStore(store.db_path).load("jba", "user", "secret") == COOKIES
+
+
+def test_account_and_password_are_part_of_the_key(store):
+    store.save("jba", "user", "secret", COOKIES)
+    assert store.load("jba", "user", "changed") is None
+    assert store.load("jba", "other", "secret") is None
+    assert store.load("kcbbf", "user", "secret") is None
+
+
+def test_expires_after_ttl(store, clock, monkeypatch):
+    monkeypatch.setattr(settings, "session_ttl_seconds", 100)
+    store.save("jba", "user", "secret", COOKIES)
+    clock.now += 100
+    assert store.load("jba", "user", "secret") == COOKIES
+    clock.now += 1
+    assert store.load("jba", "user", "secret") is None
+
+
+def test_wrong_key_returns_none(store):
+    store.save("jba", "user", "secret", COOKIES)
+    other = SessionStore(store.db_path, key=Fernet.generate_key())
+    assert other.load("jba", "user", "secret") is None
+
+
+def test_delete(store):
+    store.save("jba", "user", "secret", COOKIES)
+    assert store.delete("jba", "user", "secret")
+    assert store.load("jba", "user", "secret") is None
+
+
+def test_cookie_export_import_round_trip(clock):
+    jar = requests.cookies.RequestsCookieJar()
+    jar.set("laravel_session", "abc", domain="team-jba.jp", path="/", secure=True, rest={"HttpOnly": None})
+    jar.set("XSRF-TOKEN", "xyz", domain="team-jba.jp", path="/", expires=int(clock.now) + 60)
+    jar.set("old", "1", domain="team-jba.jp", path="/", expires=int(clock.now) - 1)
+
+    restored = requests.cookies.RequestsCookieJar()
+    import_cookies(restored, export_cookies(jar))
+
+    # 期限切れのクッキーは戻さない
+    assert {cookie.name: cookie.value for cookie in restored} == {"laravel_session": "abc", "XSRF-TOKEN": "xyz"}
+    session_cookie = next(cookie for cookie in restored if cookie.name == "laravel_session")
+    assert session_cookie.domain == "team-jba.jp"
+    assert session_cookie.secure
+    assert session_cookie.has_nonstandard_attr("HttpOnly")
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text=""):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+
+
+SEARCH_PAGE = '<html><a href="/logout">ログアウト</a><input name="_token" value="token-1"></html>'
+
+
+@pytest.fixture
+def restore(jba_system, store, monkeypatch):
+    """保存済みのセッションがある状態で、チーム検索ページの応答を差し替えて復元する"""
+    class FakeRateLimiter:
+        def acquire(self):
+            pass
+
+    monkeypatch.setattr(jba_verification_lib, "get_session_store", lambda: store)
+    monkeypatch.setattr(jba_verification_lib, "get_rate_limiter", FakeRateLimiter)
+    store.save("jba", "user", "secret", COOKIES)
+
+    def run(response):
+        def get(url, **kwargs):
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        jba_system.session.get = get
+        return jba_system._restore_session("user", "secret")
+
+    return run
+
+
+def test_restore_valid_session(restore, jba_system, store):
+    assert restore(FakeResponse(text=SEARCH_PAGE))
+    assert jba_system.logged_in
+    assert jba_system.http._csrf_token == "token-1"
+    assert store.load("jba", "user", "secret") == COOKIES
+
+
+@pytest.mark.parametrize("response", [
+    FakeResponse(status_code=302, text=SEARCH_PAGE),
+    FakeResponse(text='<html><input name="_token" value="token-1"></html>'),  # ログアウトのリンクなし
+    FakeResponse(text="<html>ログアウト</html>"),  # CSRFトークンなし
+])
+def test_invalid_session_is_deleted(restore, jba_system, store, response):
+    assert not restore(response)
+    assert not jba_system.logged_in
+    assert len(jba_system.session.cookies) == 0
+    assert store.load("jba", "user", "secret") is None
+
+
+@pytest.mark.parametrize("error", [requests.Timeout("timed out"), requests.ConnectionError("reset")])
+def test_network_error_keeps_saved_session(restore, jba_system, store, error):
+    assert not restore(error)
+    assert not jba_system.logged_in
+    # 通常のログインは保存済みのクッキーなしで行う
+    assert len(jba_system.session.cookies) == 0
+    assert store.load("jba", "user", "secret") == COOKIES
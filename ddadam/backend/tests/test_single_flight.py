@@ -0,0 +1,100 @@
+"""worker.single_flight のテスト"""
+
+import threading
+
+import pytest
+
+from worker.single_flight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+class CountingSingleFlight(SingleFlight):
+    """begin() を通過した呼び出し数を数える"""
+
+    def __init__(self):
+        super().__init__()
+        self.begun = threading.Semaphore(0)
+
+    def begin(self, key):
+        result = super().begin(key)
+        self.begun.release()
+        return result
+
+
+def test_concurrent_callers_share_one_call():
+    flight = CountingSingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(2.0)
+        return {"team": "東京大学"}
+
+    def caller():
+        results.append(flight.do("team", fetch))
+
+    threads = _run_concurrently(1, caller)
+    assert started.wait(2.0)
+    threads += _run_concurrently(4, caller)
+    # 全員が begin() を通過してからリーダーを終わらせる
+    for _ in range(5):
+        assert flight.begun.acquire(timeout=2.0)
+    release.set()
+    for thread in threads:
+        thread.join(2.0)
+
+    assert len(calls) == 1
+    assert len(results) == 5
+    # リーダー・待機側とも同じオブジェクト
+    assert all(result is results[0] for result in results)
+
+
+def test_key_is_forgotten_after_completion():
+    flight = SingleFlight()
+    calls = []
+    flight.do("k", lambda: calls.append(1))
+    flight.do("k", lambda: calls.append(1))
+    assert len(calls) == 2
+    assert flight._calls == {}
+
+
+def test_different_keys_run_independently():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+
+
+def test_waiters_receive_the_leaders_exception():
+    flight = SingleFlight()
+    call, is_leader = flight.begin("k")
+    assert is_leader
+    waiter_call, waiter_is_leader = flight.begin("k")
+    assert not waiter_is_leader and waiter_call is call
+
+    error = ValueError("search failed")
+    flight.finish("k", call, error=error)
+    with pytest.raises(ValueError):
+        waiter_call.wait()
+    # 失敗したキーも忘れるため、次の呼び出しは再実行する
+    assert flight.begin("k")[1]
+
+
+def test_leader_exception_propagates_from_do():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert flight._calls == {}
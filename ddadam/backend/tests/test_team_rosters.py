@@ -0,0 +1,122 @@
+"""JBAVerificationSystem.get_team_rosters（名簿の一括取得と single-flight）のテスト"""
+
+import threading
+
+import pytest
+
+from worker.single_flight import SingleFlight
+
+TEAMS = [
+    {"url": "https://team-jba.jp/organization/1/team/101", "id": "101", "name": "東京大学"},
+    {"url": "https://team-jba.jp/organization/1/team/102", "id": "102", "name": "京都大学"},
+]
+
+
+class CountingSingleFlight(SingleFlight):
+    """begin() を通過した呼び出し数を数える"""
+
+    def __init__(self):
+        super().__init__()
+        self.begun = threading.Semaphore(0)
+
+    def begin(self, key):
+        result = super().begin(key)
+        self.begun.release()
+        return result
+
+
+def test_snapshot_error_releases_waiters_of_earlier_teams(jba_system):
+    flights = CountingSingleFlight()
+    jba_system._flights = flights
+    waiter_results = []
+
+    def waiter():
+        try:
+            waiter_results.append(jba_system.get_team_roster(TEAMS[0]))
+        except Exception as e:
+            waiter_results.append(e)
+
+    waiter_thread = threading.Thread(target=waiter, daemon=True)
+
+    def load_roster_snapshot(team):
+        if team["id"] == "101":
+            return None  # 1チーム目はJBAから取得する予定のまま
+        # 1チーム目の取得を別スレッドが待っている状態で、2チーム目の読み込みが失敗する
+        waiter_thread.start()
+        for _ in range(3):
+            assert flights.begun.acquire(timeout=2.0)
+        raise RuntimeError("roster store unavailable")
+
+    jba_system._load_roster_snapshot = load_roster_snapshot
+
+    with pytest.raises(RuntimeError, match="roster store unavailable"):
+        jba_system.get_team_rosters(TEAMS)
+
+    waiter_thread.join(2.0)
+    assert not waiter_thread.is_alive()
+    assert len(waiter_results) == 1
+    assert isinstance(waiter_results[0], RuntimeError)
+    # 終了したキーは残らない（次の呼び出しは新しく取得を始める）
+    assert flights._calls == {}
+
+
+def test_save_error_releases_waiters(jba_system):
+    flights = CountingSingleFlight()
+    jba_system._flights = flights
+    jba_system._load_roster_snapshot = lambda team: None
+    waiter_results = []
+
+    def waiter():
+        try:
+            waiter_results.append(jba_system.get_team_roster(TEAMS[1]))
+        except Exception as e:
+            waiter_results.append(e)
+
+    waiter_thread = threading.Thread(target=waiter, daemon=True)
+
+    class FakeHTTP:
+        def run(self, result):
+            return result
+
+        def get_team_members_many(self, urls):
+            waiter_thread.start()
+            for _ in range(3):
+                assert flights.begun.acquire(timeout=2.0)
+            return {team["url"]: {"team_name": team["name"], "members": [{"name": "山田太郎"}]} for team in TEAMS}
+
+    def save_roster_snapshot(team, team_data):
+        raise OSError("disk full")
+
+    jba_system._get_http_client = FakeHTTP
+    jba_system._save_roster_snapshot = save_roster_snapshot
+
+    with pytest.raises(OSError):
+        jba_system.get_team_rosters(TEAMS)
+
+    waiter_thread.join(2.0)
+    assert not waiter_thread.is_alive()
+    assert isinstance(waiter_results[0], OSError)
+    assert flights._calls == {}
+
+
+def test_fetches_missing_teams_once_and_shares_results(jba_system):
+    snapshot = {"team_name": "東京大学", "members": [{"name": "山田太郎"}]}
+    jba_system._load_roster_snapshot = lambda team: snapshot if team["id"] == "101" else None
+    requested = []
+
+    class FakeHTTP:
+        def run(self, result):
+            return result
+
+        def get_team_members_many(self, urls):
+            requested.append(list(urls))
+            return {TEAMS[1]["url"]: {"team_name": "京都大学", "members": [{"name": "鈴木一郎"}]}}
+
+    jba_system._get_http_client = FakeHTTP
+    rosters = jba_system.get_team_rosters(TEAMS + TEAMS)
+
+    assert requested == [[TEAMS[1]["url"]]]
+    assert rosters[TEAMS[0]["url"]] is snapshot
+    assert rosters[TEAMS[1]["url"]]["team_name"] == "京都大学"
+    # 取得した名簿はメモリに残り、次の呼び出しでは取得しない
+    assert jba_system.get_team_roster(TEAMS[1])["team_name"] == "京都大学"
@@ -0,0 +1,169 @@
+"""cache_adapter.TieredCache（プロセス内 LRU・pub/sub による無効化）のテスト"""
+
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+redis = pytest.importorskip("redis")
+
+import cache_adapter
+from cache_adapter import RedisCache, TieredCache
+
+CLOCK_MODULES = [cache_adapter]
+
+
+@pytest.fixture
+def make_cache(monkeypatch):
+    """同じ Redis サーバーを共有する TieredCache（別プロセス相当）を作る"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis, "from_url", lambda url, **kwargs: fakeredis.FakeRedis(server=server))
+    caches = []
+
+    def make(**kwargs):
+        kwargs.setdefault("max_entries", 100)
+        kwargs.setdefault("ttl_seconds", 300)
+        cache = TieredCache(RedisCache("redis://test"), **kwargs)
+        caches.append(cache)
+        assert cache._subscribed.is_set()
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def _count_calls(monkeypatch, obj, name):
+    calls = []
+    original = getattr(obj, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(obj, name, wrapper)
+    return calls
+
+
+def _write_and_wait(writer, reader, write):
+    """writer で書き込み、reader が無効化の通知を受け取るまで待つ"""
+    generation = reader._generation
+    write(writer)
+    assert _wait_until(lambda: reader._generation > generation)
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_reads_are_served_locally_after_first_fetch(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.backend.set("k", {"v": 1})
+    backend_gets = _count_calls(monkeypatch, cache.backend, "get")
+
+    assert cache.get("k") == {"v": 1}
+    assert cache.get("k") == {"v": 1}
+    assert len(backend_gets) == 1
+    assert cache._hits == 1
+
+
+def test_returned_values_are_copies(make_cache):
+    cache = make_cache()
+    cache.set("k", {"tags": ["a"]})
+    cache.get("k")["tags"].append("b")
+    assert cache.get("k") == {"tags": ["a"]}
+
+
+def test_get_many_fetches_only_local_misses(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.backend.set_many({"a": {"v": 1}, "b": {"v": 2}})
+    cache.get("a")
+    backend_get_many = _count_calls(monkeypatch, cache.backend, "get_many")
+
+    assert cache.get_many(["a", "b", "missing"]) == {"a": {"v": 1}, "b": {"v": 2}}
+    assert backend_get_many == [(["b", "missing"],)]
+
+
+def test_local_entries_expire_and_are_bounded(make_cache, clock, monkeypatch):
+    cache = make_cache(max_entries=2, ttl_seconds=10)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.set("c", {"v": 3})
+    assert list(cache._entries) == ["b", "c"]
+
+    backend_gets = _count_calls(monkeypatch, cache.backend, "get")
+    clock.now += 11
+    assert cache.get("b") == {"v": 2}
+    assert len(backend_gets) == 1
+
+
+def test_writes_invalidate_other_instances(make_cache):
+    writer = make_cache()
+    reader = make_cache()
+    _write_and_wait(writer, reader, lambda c: c.set("k", {"v": 1}))
+    assert reader.get("k") == {"v": 1}
+    assert "k" in reader._entries
+
+    _write_and_wait(writer, reader, lambda c: c.set("k", {"v": 2}))
+    assert "k" not in reader._entries
+    assert reader.get("k") == {"v": 2}
+
+    _write_and_wait(writer, reader, lambda c: c.delete("k"))
+    assert "k" not in reader._entries
+    assert reader.get("k") is None
+
+
+def test_clear_invalidates_all_keys_on_other_instances(make_cache):
+    writer = make_cache()
+    reader = make_cache()
+    _write_and_wait(writer, reader, lambda c: c.set_many({"a": {"v": 1}, "b": {"v": 2}}))
+    reader.get_many(["a", "b"])
+    assert len(reader._entries) == 2
+
+    _write_and_wait(writer, reader, lambda c: c.clear())
+    assert not reader._entries
+    assert reader.get_many(["a", "b"]) == {}
+
+
+def test_own_invalidation_messages_are_ignored(make_cache):
+    cache = make_cache()
+    cache.set("k", {"v": 1})
+    generation = cache._generation
+    cache._on_invalidation(f'{{"origin": "{cache._origin}", "keys": ["k"]}}')
+    assert cache._generation == generation
+    assert "k" in cache._entries
+
+
+def test_fill_invalidated_during_fetch_is_not_stored(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.backend.set("k", {"v": "old"})
+    original_get = cache.backend.get
+
+    def get_then_invalidated(key):
+        value = original_get(key)
+        # Redis から読んだ直後に他のプロセスが書き換えた
+        cache._on_invalidation('{"origin": "other", "keys": ["k"]}')
+        return value
+
+    monkeypatch.setattr(cache.backend, "get", get_then_invalidated)
+    assert cache.get("k") == {"v": "old"}
+    assert "k" not in cache._entries
+
+
+def test_local_cache_is_bypassed_while_unsubscribed(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.set("k", {"v": 1})
+    cache.close()
+    assert not cache._subscribed.is_set()
+
+    backend_gets = _count_calls(monkeypatch, cache.backend, "get")
+    assert cache.get("k") == {"v": 1}
+    assert cache.get("k") == {"v": 1}
+    assert len(backend_gets) == 2
+    assert cache._hits == 0
+    assert cache.stats()["invalidation_subscribed"] is False
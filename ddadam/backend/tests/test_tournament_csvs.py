@@ -0,0 +1,127 @@
+"""大会CSVの取得（login_and_get_tournament_csvs・編集ページからの選手名修正）のテスト"""
+
+import os
+import threading
+import time
+import urllib.parse
+
+import requests
+
+BASE_URL = "https://www.kcbbf.jp"
+
+
+def _csv_url(csv_id):
+    return f"{BASE_URL}/master-admin-game_category_teams/csv/id/{csv_id}"
+
+
+def _csv_page(university, rows, encoding="cp932"):
+    """(status, content, headers) の CSV 応答"""
+    text = "選手名,背番号\n" + "".join(f"{name},{number}\n" for name, number in rows)
+    filename = urllib.parse.quote(f"{university}.csv", encoding="utf-8")
+    return 200, text.encode(encoding), {
+        "content-type": "text/csv",
+        "content-disposition": f"attachment; filename*=UTF-8''{filename}",
+    }
+
+
+class FakeKcbbfSession:
+    """URL ごとに決まった応答を返す requests.Session の代わり（遅延を指定可能）"""
+
+    def __init__(self, pages, delays=None):
+        self.pages = pages
+        self.delays = delays or {}
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.requested.append(url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delays.get(url, 0))
+        with self._lock:
+            self.in_flight -= 1
+        status, content, headers = self.pages.get(url, (404, b"", {}))
+        response = requests.Response()
+        response.status_code = status
+        response._content = content
+        response.url = url
+        response.headers.update(headers)
+        return response
+
+
+def _download(system, session, csv_urls):
+    system._login_and_get_csv_links = lambda username, password, game_id: (session, csv_urls)
+    return system.login_and_get_tournament_csvs("user", "secret", "1")
+
+
+def test_parallel_download_keeps_link_order_and_isolates_failures(tournament_system):
+    urls = [_csv_url(i) for i in range(1, 5)]
+    session = FakeKcbbfSession(
+        {
+            urls[0]: _csv_page("東京大学", [("山田 太郎", 4), ("佐藤 次郎", 5)]),
+            urls[1]: (500, b"", {}),
+            urls[2]: _csv_page("京都大学", [("鈴木 一郎", 7)], encoding="utf-8"),
+            urls[3]: (200, b"", {"content-type": "text/csv"}),
+        },
+        # 1件目が最後に届いても結果はリンクの順
+        delays={urls[0]: 0.2, urls[1]: 0.05, urls[2]: 0.05, urls[3]: 0.05},
+    )
+
+    combined = _download(tournament_system, session, urls)
+
+    assert sorted(session.requested) == sorted(urls)
+    assert session.max_in_flight > 1
+    assert combined["大学名"].tolist() == ["東京大学", "東京大学", "京都大学"]
+    assert combined["選手名"].tolist() == ["山田 太郎", "佐藤 次郎", "鈴木 一郎"]
+    assert list(combined.index) == [0, 1, 2]
+    assert sorted(tournament_system.csv_hashes) == ["京都大学", "東京大学"]
+
+
+def test_all_downloads_failing_returns_none(tournament_system):
+    urls = [_csv_url(i) for i in range(1, 3)]
+    session = FakeKcbbfSession({url: (500, b"", {}) for url in urls})
+    assert _download(tournament_system, session, urls) is None
+
+
+def _edit_url(csv_id):
+    return f"{BASE_URL}/master-admin-game_category_teams/edit/id/{csv_id}"
+
+
+def _edit_page():
+    with open(os.path.join(os.path.dirname(__file__), "fixtures", "kcbbf_edit_page.html"), "rb") as f:
+        return 200, f.read(), {"content-type": "text/html; charset=utf-8"}
+
+
+def test_edit_page_is_fetched_once_per_team(tournament_system):
+    urls = [_csv_url(55), _csv_url(56)]
+    session = FakeKcbbfSession({
+        # 「?」を含む選手が複数いても編集ページは1回だけ取得
+        urls[0]: _csv_page("東京大学", [("山? 太郎", 4), ("佐藤 ?郎", 5), ("鈴木 一郎", 6)]),
+        _edit_url(55): _edit_page(),
+        # 「?」を含む選手がいなければ取得しない
+        urls[1]: _csv_page("京都大学", [("田中 四郎", 7)]),
+        _edit_url(56): _edit_page(),
+    })
+
+    combined = _download(tournament_system, session, urls)
+
+    assert session.requested.count(_edit_url(55)) == 1
+    assert _edit_url(56) not in session.requested
+    assert combined["選手名"].tolist() == ["山田 太郎", "佐藤 ?郎", "鈴木 一郎", "田中 四郎"]
+    assert tournament_system.edited_player_names == {("東京大学", "山田 太郎"): True}
+
+    # 同じジョブの中では解析済みの一覧を使う
+    view_url = f"{BASE_URL}/master-admin-game_category_teams/view/id/55"
+    assert tournament_system._get_edit_page_names(session, view_url) == ["山田 太郎", "佐藤次郎"]
+    assert session.requested.count(_edit_url(55)) == 1
+
+
+def test_failed_edit_page_is_not_retried_per_player(tournament_system):
+    view_url = f"{BASE_URL}/master-admin-game_category_teams/view/id/57"
+    session = FakeKcbbfSession({_edit_url(57): (500, b"", {})})
+    for _ in range(3):
+        assert tournament_system._get_player_name_from_edit_page(session, view_url, "山? 太郎") is None
+    assert session.requested == [_edit_url(57)]
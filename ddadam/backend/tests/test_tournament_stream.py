@@ -0,0 +1,112 @@
+"""大会CSVのストリーミング（stream_tournament_csvs → process_tournament_stream）のテスト"""
+
+import concurrent.futures
+import queue
+
+import pandas as pd
+
+
+def _df(university, players):
+    return pd.DataFrame({"大学名": [university] * len(players), "選手名": players})
+
+
+class ScriptedQueue(queue.Queue):
+    """キューが空になったら、プロデューサーの代わりに次のメッセージを流す"""
+
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+
+    def get(self, *args, **kwargs):
+        if self.empty() and self.script:
+            return self.script.pop(0)
+        return super().get(*args, **kwargs)
+
+
+def _run_consumer(system, messages):
+    """
+    メッセージを順に照合側に渡し、(結果, 大学名, 進捗) を返す
+
+    大学の照合はすぐに完了し、その完了通知は次のメッセージより先に届く。
+    """
+    def schedule_university(df, univ, csv_hash=None):
+        future = concurrent.futures.Future()
+        future.set_result([{"status": "match", "大学名": univ, "row": index} for index in df.index])
+        return future
+
+    system._schedule_university = schedule_university
+    df_queue = ScriptedQueue(messages)
+    progress = []
+    results, universities = system.process_tournament_stream(
+        df_queue, progress_callback=lambda value, text: progress.append((value, text)))
+    return results, universities, progress
+
+
+def test_failed_csvs_are_excluded_from_progress(tournament_system):
+    results, universities, progress = _run_consumer(tournament_system, [
+        ("total", 4),
+        ("failed", 2),
+        ("csv", 1, _df("京都大学", ["鈴木 一郎"])),
+        ("csv", 3, _df("空の大学", [])),
+        ("csv", 0, _df("東京大学", ["山田 太郎", "佐藤 次郎"])),
+        ("done",),
+    ])
+
+    # 大学名はCSVの順、行番号は大学をまたいで一意
+    assert universities == ["東京大学", "京都大学"]
+    assert sorted(result["row"] for result in results) == [0, 1, 2]
+    # 京都大学の完了時点では CSV 2 の失敗だけが分かっている
+    assert progress == [
+        (1 / 3, "京都大学 を処理完了 (1/3)"),
+        (1.0, "東京大学 を処理完了 (2/2)"),
+    ]
+
+
+def test_failure_after_last_result_completes_progress(tournament_system):
+    _, universities, progress = _run_consumer(tournament_system, [
+        ("total", 3),
+        ("csv", 0, _df("東京大学", ["山田 太郎"])),
+        ("csv", 1, _df("京都大学", ["鈴木 一郎"])),
+        ("failed", 2),
+        ("done",),
+    ])
+
+    assert universities == ["東京大学", "京都大学"]
+    assert progress == [
+        (1 / 3, "東京大学 を処理完了 (1/3)"),
+        (2 / 3, "京都大学 を処理完了 (2/3)"),
+        (1.0, "全 2 大学の処理完了 (2/2)"),
+    ]
+
+
+def test_producer_reports_each_csv(tournament_system):
+    links = [f"https://www.kcbbf.jp/csv/id/{i}" for i in range(4)]
+    tournament_system._login_and_get_csv_links = lambda username, password, game_id: (object(), links)
+
+    def fetch(session, i, csv_url, total):
+        if i == 1:
+            return None
+        if i == 2:
+            raise RuntimeError("connection reset")
+        return _df(f"大学{i}", ["山田 太郎"])
+
+    tournament_system._fetch_tournament_csv = fetch
+    df_queue = queue.Queue()
+    assert tournament_system.stream_tournament_csvs("user", "secret", "1", df_queue) == 2
+
+    messages = []
+    while not df_queue.empty():
+        messages.append(df_queue.get())
+    assert messages[0] == ("total", 4)
+    assert messages[-1] == ("done",)
+    assert sorted((message[0], message[1]) for message in messages[1:-1]) == [
+        ("csv", 0), ("csv", 3), ("failed", 1), ("failed", 2),
+    ]
+
+
+def test_login_failure_only_sends_done(tournament_system):
+    tournament_system._login_and_get_csv_links = lambda username, password, game_id: None
+    df_queue = queue.Queue()
+    assert tournament_system.stream_tournament_csvs("user", "secret", "1", df_queue) == 0
+    assert df_queue.get_nowait() == ("done",)
+    assert df_queue.empty()
@@ -0,0 +1,162 @@
+"""
+管理画面（kcbbf）CSV の文字コード判定
+
+複数のエンコーディングで decode + read_csv を繰り返す代わりに、
+BOM → ISO-2022-JP のエスケープシーケンス → 厳密な UTF-8 → Content-Type の charset →
+大会ごとに覚えておいたエンコーディング → CP932 → EUC-JP の順で1回だけ判定する。
+判定はバイト列の厳密デコード（C実装）だけで行い、CSVの解析は判定後に1回だけ行う。
+
+厳密な UTF-8 としてデコードできる日本語のバイト列は、実際にはほぼ必ず UTF-8 のため
+宣言・ヒントより先に試す（CP932 はたいていの UTF-8 のバイト列もデコードできてしまい、
+先に試すと文字化けする）。
+
+Content-Disposition のファイル名（大学名）も同じ判定でデコードする。
+"""
+
+import codecs
+import re
+import urllib.parse
+from typing import Optional, Tuple
+
+# BOM → エンコーディング（長いものから判定）
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# ヘッダーのエンコーディング名 → Python のコーデック名
+# （Shift_JIS と宣言されていても実際は Windows の拡張文字を含む CP932 のことが多い）
+_ENCODING_ALIASES = {
+    "shift_jis": "cp932",
+    "shift-jis": "cp932",
+    "sjis": "cp932",
+    "x-sjis": "cp932",
+    "windows-31j": "cp932",
+    "ms932": "cp932",
+}
+
+# どんなバイト列でもデコードできてしまうため、ヘッダーで宣言されていても信用しないもの
+_UNRELIABLE_DECLARED_ENCODINGS = {"iso8859-1", "cp1252"}
+
+# 宣言・ヒントのどれでもデコードできない場合の判定順
+_FALLBACK_ENCODINGS = ("cp932", "euc-jp")
+
+_CHARSET_PATTERN = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+_FILENAME_EXT_PATTERN = re.compile(r"filename\*\s*=\s*([\w.:-]+)'[^']*'([^;]+)", re.IGNORECASE)
+_FILENAME_PATTERN = re.compile(r'filename="(.+)"', re.IGNORECASE)
+
+
+def canonical_encoding(encoding: Optional[str]) -> Optional[str]:
+    """エンコーディング名を Python のコーデック名に揃える（不明な名前は None）"""
+    if not encoding:
+        return None
+    encoding = encoding.strip().lower()
+    encoding = _ENCODING_ALIASES.get(encoding, encoding)
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Content-Type ヘッダーで明示された charset を取得（ない場合は None）"""
+    if not content_type:
+        return None
+    match = _CHARSET_PATTERN.search(content_type)
+    if not match:
+        return None
+    encoding = canonical_encoding(match.group(1))
+    return None if encoding in _UNRELIABLE_DECLARED_ENCODINGS else encoding
+
+
+def _decodes(content: bytes, encoding: str) -> bool:
+    try:
+        content.decode(encoding)
+        return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+def detect_encoding(content: bytes, content_type: Optional[str] = None, hint: Optional[str] = None) -> str:
+    """
+    バイト列のエンコーディングを判定
+
+    Args:
+        content: 判定するバイト列
+        content_type: Content-Type ヘッダー（任意）
+        hint: 同じ大会の他のCSVで判定済みのエンコーディング（任意）
+
+    Returns:
+        コーデック名（どれにも当てはまらない場合は cp932）
+    """
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+
+    candidates = []
+    # ISO-2022-JP は7ビットのため UTF-8 としてもデコードできてしまう。エスケープシーケンスで先に判別する
+    if b"\x1b$B" in content or b"\x1b$@" in content:
+        candidates.append("iso2022_jp")
+    candidates.append("utf-8")
+    candidates.extend([charset_from_content_type(content_type), canonical_encoding(hint)])
+    candidates.extend(_FALLBACK_ENCODINGS)
+
+    checked = set()
+    for encoding in candidates:
+        if not encoding or encoding in checked:
+            continue
+        checked.add(encoding)
+        if _decodes(content, encoding):
+            return encoding
+    return "cp932"
+
+
+def decode_bytes(content: bytes, content_type: Optional[str] = None, hint: Optional[str] = None) -> Tuple[str, str]:
+    """
+    バイト列を判定したエンコーディングで1回だけデコード
+
+    Returns:
+        (text, encoding)
+    """
+    encoding = detect_encoding(content, content_type, hint)
+    # 判定できなかった場合（cp932 でも不正なバイトがある場合）は置換文字で読み進める
+    return content.decode(encoding, errors="replace"), encoding
+
+
+def filename_from_content_disposition(content_disposition: Optional[str], hint: Optional[str] = None) -> Optional[str]:
+    """
+    Content-Disposition ヘッダーからファイル名を取得
+
+    filename*（RFC 5987）があればそれを使う。filename="..." の場合、http.client が
+    latin-1 で文字列にしたヘッダー値をバイト列に戻し、detect_encoding で1回だけデコードする。
+    hint には CSV 本文のエンコーディングを渡さない（ファイル名は本文と別に UTF-8 のことが多い）。
+
+    Returns:
+        ファイル名（ヘッダーにない場合は None）
+    """
+    if not content_disposition:
+        return None
+
+    ext_match = _FILENAME_EXT_PATTERN.search(content_disposition)
+    if ext_match:
+        encoding = canonical_encoding(ext_match.group(1)) or "utf-8"
+        return urllib.parse.unquote(ext_match.group(2).strip().strip('"'), encoding=encoding, errors="replace")
+
+    match = _FILENAME_PATTERN.search(content_disposition)
+    if not match:
+        return None
+
+    filename = match.group(1)
+    try:
+        raw = filename.encode("latin-1")
+    except UnicodeEncodeError:
+        # 既に正しくデコードされている
+        raw = None
+    if raw is not None:
+        filename = raw.decode(detect_encoding(raw, hint=hint), errors="replace")
+
+    # URLエンコードされている場合
+    if "%" in filename:
+        filename = urllib.parse.unquote(filename)
+    return filename
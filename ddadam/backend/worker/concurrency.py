@@ -0,0 +1,255 @@
+"""
+ホストごとの適応的な同時実行数制御（AIMD）
+
+応答時間とエラー率を計測し、正常なら同時実行数を少しずつ増やし（加算的増加）、
+エラーや応答遅延を検知したら一気に減らす（乗算的減少）。CPU数とは無関係に、
+相手サーバーが捌ける範囲で同時実行数を決める。
+
+スレッドからは slot()、asyncio タスクからは async_slot() で枠を確保する。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AIMDConcurrencyController:
+    """同時実行数を AIMD で調整するセマフォ（スレッド / asyncio 両対応）"""
+
+    def __init__(
+        self,
+        host: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        """
+        Args:
+            host: 対象ホスト名（ログ用）
+            initial_limit: 初期同時実行数
+            min_limit: 下限
+            max_limit: 上限
+            decrease_factor: エラー・遅延時に掛ける係数
+            latency_tolerance: 基準応答時間の何倍を超えたら遅延とみなすか
+        """
+        self.host = host
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+        # 計測値
+        self._latency_ewma = None
+        self._baseline_latency = None
+        self._error_rate_ewma = 0.0
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        """現在の同時実行数上限"""
+        return int(self._limit)
+
+    # ==================== 枠の確保・解放 ====================
+
+    def _try_acquire_locked(self) -> bool:
+        if not self._waiters and self._in_flight < int(self._limit):
+            self._in_flight += 1
+            return True
+        return False
+
+    def _wake_waiters_locked(self):
+        """空き枠があれば待機中のスレッド・タスクに枠を渡す"""
+        while self._waiters and self._in_flight < int(self._limit):
+            waiter = self._waiters.popleft()
+            self._in_flight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(_set_future_result, future)
+
+    def acquire(self):
+        """枠が空くまでブロック（スレッド用）"""
+        with self._lock:
+            if self._try_acquire_locked():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def acquire_async(self):
+        """枠が空くまで待機（asyncio 用）"""
+        with self._lock:
+            if self._try_acquire_locked():
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    # 既に枠を受け取っていた場合は返却する
+                    self._in_flight -= 1
+                    self._wake_waiters_locked()
+            raise
+
+    def release(self, latency: float, success: bool = True):
+        """
+        枠を返却し、結果を同時実行数に反映
+
+        Args:
+            latency: 応答までの秒数
+            success: 正常応答なら True（429/5xx・通信エラーは False）
+        """
+        with self._lock:
+            self._in_flight -= 1
+            self._record_locked(latency, success)
+            self._wake_waiters_locked()
+
+    @contextmanager
+    def slot(self):
+        """
+        with 文で枠を確保（スレッド用）
+
+        ブロック内で例外が出た場合は失敗として記録する。
+        yield した dict の 'success' を False にすると失敗として扱う。
+        """
+        self.acquire()
+        start = time.monotonic()
+        outcome = {'success': True}
+        try:
+            yield outcome
+        except Exception:
+            outcome['success'] = False
+            raise
+        finally:
+            self.release(time.monotonic() - start, outcome['success'])
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """async with 文で枠を確保（asyncio 用、挙動は slot() と同じ）"""
+        await self.acquire_async()
+        start = time.monotonic()
+        outcome = {'success': True}
+        try:
+            yield outcome
+        except Exception:
+            outcome['success'] = False
+            raise
+        finally:
+            self.release(time.monotonic() - start, outcome['success'])
+
+    # ==================== AIMD ====================
+
+    def _record_locked(self, latency: float, success: bool):
+        """計測値を更新して同時実行数を増減（ロック内で呼ぶ）"""
+        alpha = 0.2
+        self._error_rate_ewma = (1 - alpha) * self._error_rate_ewma + alpha * (0.0 if success else 1.0)
+
+        if success:
+            if self._latency_ewma is None:
+                self._latency_ewma = latency
+            else:
+                self._latency_ewma = (1 - alpha) * self._latency_ewma + alpha * latency
+
+            # 基準応答時間: 最小値を基本とし、上方向にはゆっくり追従
+            if self._baseline_latency is None or latency < self._baseline_latency:
+                self._baseline_latency = latency
+            else:
+                self._baseline_latency += (latency - self._baseline_latency) * 0.01
+
+        overloaded = not success or (
+            self._baseline_latency is not None
+            and self._latency_ewma > max(self._baseline_latency * self.latency_tolerance, 0.2)
+        )
+
+        if overloaded:
+            # 乗算的減少（1応答時間あたり最大1回）
+            now = time.monotonic()
+            cooldown = max(self._latency_ewma or 0.0, 0.5)
+            if now - self._last_decrease >= cooldown:
+                old_limit = self._limit
+                self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+                self._last_decrease = now
+                if int(old_limit) != int(self._limit):
+                    logger.info(f"📉 {self.host}: 同時実行数 {int(old_limit)} → {int(self._limit)}（{'エラー' if not success else '応答遅延'}）")
+        elif self._in_flight + 1 >= int(self._limit):
+            # 加算的増加（枠を使い切っている時のみ。1ウィンドウで約+1）
+            old_limit = self._limit
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            if int(old_limit) != int(self._limit):
+                logger.debug(f"📈 {self.host}: 同時実行数 {int(old_limit)} → {int(self._limit)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """現在の状態を取得"""
+        with self._lock:
+            return {
+                'host': self.host,
+                'limit': int(self._limit),
+                'in_flight': self._in_flight,
+                'waiting': len(self._waiters),
+                'latency_ewma': round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+                'baseline_latency': round(self._baseline_latency, 3) if self._baseline_latency is not None else None,
+                'error_rate': round(self._error_rate_ewma, 3),
+            }
+
+
+def _set_future_result(future):
+    if not future.done():
+        future.set_result(None)
+
+
+# ホストごとのシングルトン
+_controllers: Dict[str, AIMDConcurrencyController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_concurrency_controller(host: str = "team-jba.jp") -> AIMDConcurrencyController:
+    """
+    ホストごとの同時実行数コントローラーを取得（プロセス内で共有）
+
+    www.kcbbf.jp は kcbbf_* 、それ以外は jba_* の設定を使う。
+
+    Returns:
+        AIMDConcurrencyController インスタンス
+    """
+    with _controllers_lock:
+        controller = _controllers.get(host)
+        if controller is None:
+            if "kcbbf" in host:
+                controller = AIMDConcurrencyController(
+                    host,
+                    initial_limit=settings.kcbbf_initial_concurrency,
+                    min_limit=1,
+                    max_limit=settings.kcbbf_max_concurrency,
+                )
+            else:
+                controller = AIMDConcurrencyController(
+                    host,
+                    initial_limit=settings.jba_initial_concurrency,
+                    min_limit=settings.jba_min_concurrency,
+                    max_limit=settings.jba_max_concurrency,
+                )
+            _controllers[host] = controller
+            logger.info(f"Concurrency controller for {host}: initial={controller.limit}, max={controller.max_limit}")
+        return controller
@@ -0,0 +1,139 @@
+"""
+照合結果からの補正（身長・体重・学年）と変更フラグの計算
+
+選手ごとの照合タスクの中で補正を作る代わりに、選手詳細の取得後に大学単位で
+全選手の補正値と変更フラグ（changed_fields）をまとめて計算する。
+
+補正の規則:
+- 身長・体重（背番号がある場合のみ）: JBAの値が空・0・nan なら何もしない。CSVの値が
+  数値として読めない場合はJBAの値を使い、読める場合は 5cm / 5kg 以上の差で JBA の値に変更
+- 学年（背番号がある場合のみ）: 両方に数字があれば 0.1 以上の差で、数字がなければ
+  文字列が異なる場合に JBA の値に変更
+- 選手名・カナ名: 値は CSV のまま、JBA（NFKC）と異なる場合に変更フラグのみ立てる
+  （編集ページで修正した選手名はフラグを立てない）
+
+※ 値のほとんどが短い文字列で、1大学あたり数十人のため、pandas / NumPy の列演算
+   （.str・to_numeric）は要素ごとの Python 呼び出しに固定のオーバーヘッドが加わり、
+   計測では行ごとの処理より遅かった。ここでは正規表現・判定表を事前に用意した
+   行ごとの処理を大学単位でまとめて実行する。
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+_GRADE_RE = re.compile(r'(\d+(?:\.\d+)?)')
+_MISSING_MEASUREMENTS = frozenset(['', 'nan', 'none', '0', '0.0'])
+# 身長・体重: (CSVの列名, JBAのキー, 単位, 変更する差の下限)
+_MEASUREMENTS = (
+    ('身長', 'height', 'cm', 5.0),
+    ('体重', 'weight', 'kg', 5.0),
+)
+
+
+def _measurement_correction(csv_value, jba_value, unit: str, tolerance: float) -> Optional[str]:
+    """身長・体重の変更後の値（変更しない場合は None）"""
+    try:
+        jba_str = str(jba_value).replace(unit, '').strip()
+        # 値が空、0.0、nanの場合は空欄のまま
+        if jba_str.lower() in _MISSING_MEASUREMENTS:
+            return None
+        jba_number = float(jba_str)
+        csv_str = str(csv_value).replace(unit, '').strip()
+        if csv_str and csv_str.replace('.', '').isdigit():
+            if abs(float(csv_str) - jba_number) >= tolerance:
+                return f"{jba_number}{unit}"
+            return None
+        # CSVに値がない場合はJBAの値を使用
+        return f"{jba_number}{unit}"
+    except (ValueError, AttributeError):
+        # パースエラーの場合は空欄のまま（何もしない）
+        return None
+
+
+def _grade_correction(csv_value, jba_value) -> Optional[str]:
+    """学年の変更後の値（変更しない場合は None）"""
+    original_grade = str(csv_value).strip()
+    jba_grade = str(jba_value).strip()
+    # 数字部分だけを抽出して比較（「2」と「大学2年」などに対応）
+    original_match = _GRADE_RE.search(original_grade)
+    jba_match = _GRADE_RE.search(jba_grade)
+    if original_match and jba_match:
+        # 0.1以上の差がある場合のみ変更（数字が一致していれば正しい）
+        if abs(float(original_match.group(1)) - float(jba_match.group(1))) >= 0.1:
+            return jba_grade
+        return None
+    # 数字が見つからない場合は文字列比較
+    return jba_grade if original_grade != jba_grade else None
+
+
+def correct_player(original: dict, jba_data: dict, player_no, university, edited_player_names: Dict[tuple, bool]
+                   ) -> Tuple[dict, set]:
+    """
+    1選手の補正後データと変更フィールドを計算
+
+    Returns:
+        (corrected_data, changed_fields)
+    """
+    corrected_data = original.copy()
+    changed_fields = set()
+
+    # 背番号がある場合のみ身長・体重・学年を照合
+    if player_no:
+        for csv_column, jba_key, unit, tolerance in _MEASUREMENTS:
+            jba_value = jba_data.get(jba_key)
+            if jba_value:
+                new_value = _measurement_correction(corrected_data.get(csv_column, ''), jba_value, unit, tolerance)
+                if new_value is not None:
+                    corrected_data[csv_column] = new_value
+                    changed_fields.add(csv_column)
+
+        jba_grade = jba_data.get('grade')
+        if jba_grade:
+            new_grade = _grade_correction(corrected_data.get('学年', ''), jba_grade)
+            if new_grade is not None:
+                corrected_data['学年'] = new_grade
+                changed_fields.add('学年')
+
+    # 名前とカナ名は「CSVの値を優先」しつつ、JBAと違う場合は変更フラグだけ立てる
+    jba_name = jba_data.get('name')
+    if jba_name:
+        jba_name = unicodedata.normalize('NFKC', str(jba_name).strip())
+        csv_name = str(corrected_data.get('選手名', corrected_data.get('氏名', ''))).strip()
+        is_edited_from_html = bool(university and csv_name and edited_player_names.get((university, csv_name), False))
+        if jba_name != csv_name and not is_edited_from_html:
+            changed_fields.add('選手名')
+
+    jba_kana = jba_data.get('kana_name')
+    if jba_kana:
+        jba_kana = unicodedata.normalize('NFKC', str(jba_kana).strip())
+        if jba_kana != str(corrected_data.get('カナ名', '')).strip():
+            changed_fields.add('カナ名')
+
+    return corrected_data, changed_fields
+
+
+def compute_corrections(original_rows: List[dict], jba_records: List[dict], player_nos: List[Optional[str]],
+                        universities: List[str], edited_player_names: Optional[Dict[tuple, bool]] = None
+                        ) -> Tuple[List[dict], List[set]]:
+    """
+    照合済み選手の補正後データと変更フィールドをまとめて計算
+
+    Args:
+        original_rows: CSVの各行（row.to_dict()）
+        jba_records: 照合したJBAメンバー情報（詳細取得済み）
+        player_nos: 背番号（ない場合は None）
+        universities: 大学名
+        edited_player_names: {(大学名, 選手名): True} 編集ページから取得した選手名
+
+    Returns:
+        (corrected_rows, changed_fields) original_rows と同じ順番
+    """
+    edited_player_names = edited_player_names or {}
+    corrected_rows = []
+    changed_fields = []
+    for original, jba_data, player_no, university in zip(original_rows, jba_records, player_nos, universities):
+        corrected, fields = correct_player(original, jba_data, player_no, university, edited_player_names)
+        corrected_rows.append(corrected)
+        changed_fields.append(fields)
+    return corrected_rows, changed_fields
@@ -0,0 +1,361 @@
+"""
+JBA ページ・管理画面（kcbbf）ページの HTML / JSON 解析
+
+同期版（JBAVerificationSystem）と非同期版（AsyncJBAClient）の両方から
+同じ結果の dict を得るため、解析処理だけをここにまとめる。
+
+🚀 パフォーマンス改善: BeautifulSoup（html.parser）の代わりに lxml（C実装）で解析し、
+必要な要素（table / tr / a / input / select）だけを事前コンパイルした XPath で取り出す。
+文字列の取り出しは BeautifulSoup の get_text と同じ規則（script / style を除く）に揃えている。
+"""
+
+import re
+import logging
+import threading
+
+import lxml.html
+from lxml import etree
+
+from worker.charset import detect_encoding
+
+logger = logging.getLogger(__name__)
+
+JBA_BASE_URL = "https://team-jba.jp"
+
+_MEMBER_LINK_RE = re.compile(r'/member/to-team/\d+')
+_NUMBER_RE = re.compile(r'(\d+\.?\d*)')
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+_HEIGHT_PATTERNS = [
+    r'身長[：:]\s*(\d+\.?\d*)\s*cm',
+    r'身長[：:]\s*(\d+\.?\d*)\s*センチ',
+    r'Height[：:]\s*(\d+\.?\d*)\s*cm'
+]
+
+_WEIGHT_PATTERNS = [
+    r'体重[：:]\s*(\d+\.?\d*)\s*kg',
+    r'体重[：:]\s*(\d+\.?\d*)\s*キロ',
+    r'Weight[：:]\s*(\d+\.?\d*)\s*kg'
+]
+
+# 事前コンパイルした XPath
+_TEXT_NODES = etree.XPath('.//text()[not(ancestor::script) and not(ancestor::style)]')
+_FIRST_TITLE = etree.XPath('(//title)[1]')
+_CSRF_INPUT = etree.XPath('(//input[@name="_token"])[1]')
+_TABLES = etree.XPath('//table')
+_CLASS_TABLES = etree.XPath('//table[contains(concat(" ", normalize-space(@class), " "), " table ")]')
+_ROWS = etree.XPath('.//tr')
+_CELLS = etree.XPath('.//td | .//th')
+_LINKS = etree.XPath('.//a[@href]')
+_FIRST_FORM = etree.XPath('(//form)[1]')
+_SELECTS = etree.XPath('.//select')
+_FIRST_SELECTED_OPTION = etree.XPath('(.//option[@selected])[1]')
+
+# エンコーディングごとの lxml パーサー（lxml のパーサーはスレッド間で共有できないため、スレッドごとに持つ）
+_local = threading.local()
+
+
+def _parse_html(content):
+    """
+    HTML を lxml で解析してルート要素を返す（空のページは None）
+
+    バイト列は BOM → meta の charset → UTF-8 → CP932 の順で判定したエンコーディングで解析する
+    （lxml は charset の宣言がないと Latin-1 として読むため、BeautifulSoup と同様に判定してから渡す）。
+    """
+    if content is None:
+        return None
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+        encoding = 'utf-8'
+    else:
+        meta = _META_CHARSET_RE.search(content[:4096])
+        encoding = detect_encoding(content, hint=meta.group(1).decode('ascii', 'ignore') if meta else None)
+    if not content or content.isspace():
+        return None
+
+    parsers = getattr(_local, 'parsers', None)
+    if parsers is None:
+        parsers = _local.parsers = {}
+    parser = parsers.get(encoding)
+    if parser is None:
+        parser = parsers[encoding] = lxml.html.HTMLParser(encoding=encoding)
+    try:
+        return lxml.html.document_fromstring(content, parser=parser)
+    except (etree.ParserError, ValueError) as e:
+        logger.debug(f"HTML解析エラー: {e}")
+        return None
+
+
+def _get_text(element, strip=False):
+    """BeautifulSoup の get_text(strip=...) と同じ規則で要素の文字列を取得"""
+    if strip:
+        return "".join(text.strip() for text in _TEXT_NODES(element))
+    return "".join(_TEXT_NODES(element))
+
+
+def _first(xpath, element):
+    found = xpath(element)
+    return found[0] if found else None
+
+
+def extract_csrf_token(content):
+    """ページから CSRF トークン（input[name=_token]）を取得"""
+    root = _parse_html(content)
+    csrf_input = _first(_CSRF_INPUT, root) if root is not None else None
+    if csrf_input is not None:
+        return csrf_input.get('value', '')
+    return ""
+
+
+def parse_team_search_records(data):
+    """チーム検索APIのJSONレスポンスから男子チームの一覧を作成"""
+    teams = []
+    if data.get('status') == 'success' and 'records' in data:
+        for team_data in data['records']:
+            # 男子チームのみを対象
+            if team_data.get('team_gender_id') == '男子':
+                teams.append({
+                    'id': team_data.get('id', ''),
+                    'name': team_data.get('team_name', ''),
+                    'url': f"{JBA_BASE_URL}/organization/15250600/team/{team_data.get('id', '')}/detail"
+                })
+    return teams
+
+
+def parse_team_members_page(content):
+    """チーム詳細ページからチーム名とメンバー一覧を取得"""
+    root = _parse_html(content)
+    if root is None:
+        return {"team_name": "Unknown Team", "members": []}
+
+    # チーム名を取得
+    team_name = "Unknown Team"
+    title_element = _first(_FIRST_TITLE, root)
+    if title_element is not None:
+        team_name = _get_text(title_element, strip=True)
+
+    members = []
+
+    # 選手一覧のテーブルを探す
+    for table in _CLASS_TABLES(root):
+        rows = _ROWS(table)
+
+        for row in rows[1:]:  # ヘッダー行をスキップ
+            cells = _CELLS(row)
+            if len(cells) < 3:  # 最低限の情報がある行のみ処理
+                continue
+
+            # 選手名のリンクを探す（JBAの実際のURLパターン: /member/to-team/数字/detail）
+            name_link = next((a for a in _LINKS(row) if _MEMBER_LINK_RE.search(a.get('href'))), None)
+            if name_link is None:
+                continue
+
+            player_name = _get_text(name_link, strip=True)
+            detail_url = name_link.get('href')
+            if not detail_url.startswith('http'):
+                detail_url = f"{JBA_BASE_URL}{detail_url}"
+
+            members.append(_build_member(player_name, detail_url, [_get_text(cell, strip=True) for cell in cells]))
+
+    return {
+        "team_name": team_name,
+        "members": members
+    }
+
+
+def _build_member(player_name, detail_url, cell_texts):
+    """メンバー行のセル文字列からメンバー情報を組み立てる"""
+    position = ""
+    grade = ""
+    height = ""
+    weight = ""
+    registration_status = None
+    member_category = None  # 構成員区分
+
+    for i, cell_text in enumerate(cell_texts):
+        # ポジション（通常は2番目のカラム）
+        if i == 1 and cell_text and cell_text not in ['選手名', '氏名']:
+            position = cell_text
+
+        # 学年（通常は3番目のカラム）
+        elif i == 2 and cell_text and cell_text not in ['学年', '年']:
+            grade = cell_text
+
+        # 身長・体重の情報を探す
+        if 'cm' in cell_text:
+            height = cell_text
+        elif 'kg' in cell_text:
+            weight = cell_text
+
+        # 登録状態を探す（「無所属」「登録完了」など）
+        if cell_text and ('無所属' in cell_text or '登録' in cell_text or '実績' in cell_text):
+            registration_status = cell_text
+
+        # 構成員区分を探す（「競技者」「スタッフ」など）
+        if cell_text and ('競技者' in cell_text or 'スタッフ' in cell_text or '構成員' in cell_text):
+            member_category = cell_text
+
+    return {
+        "name": player_name,
+        "position": position,
+        "grade": grade,
+        "height": height,
+        "weight": weight,
+        "detail_url": detail_url,
+        "registration_status": registration_status,
+        "member_category": member_category
+    }
+
+
+def parse_player_details_page(content, fields=None):
+    """
+    選手詳細ページから必要なフィールドのみ取得
+
+    Args:
+        content: 選手詳細ページのHTML
+        fields: 取得するフィールドのリスト（Noneの場合は全て取得）
+    """
+    root = _parse_html(content)
+    if root is None:
+        return _extract_player_details((), lambda: "", fields)
+    return _extract_player_details(_iter_label_value_pairs(root), lambda: _get_text(root), fields)
+
+
+def _iter_label_value_pairs(root):
+    """テーブルの各行から（ラベル, 値）を順に返す"""
+    for table in _TABLES(root):
+        for row in _ROWS(table):
+            cells = _CELLS(row)
+            if len(cells) >= 2:
+                yield _get_text(cells[0], strip=True), _get_text(cells[1], strip=True)
+
+
+def _extract_player_details(pairs, get_page_text, fields=None):
+    """（ラベル, 値）の列から選手詳細の dict を作成"""
+    player_details = {}
+
+    need_height = fields is None or 'height' in fields
+    need_weight = fields is None or 'weight' in fields
+    need_grade = fields is None or 'grade' in fields
+    need_position = fields is None or 'position' in fields
+    need_school = fields is None or 'school' in fields
+    need_uniform = fields is None or 'uniform_number' in fields
+    need_kana_name = fields is None or 'kana_name' in fields
+    need_registration_status = fields is None or 'registration_status' in fields
+
+    for label, value in pairs:
+        # 身長情報（必要な場合のみ）
+        if need_height and ('身長' in label or 'Height' in label):
+            height_match = _NUMBER_RE.search(value)
+            if height_match and value.strip():
+                player_details['height'] = height_match.group(1)
+
+        # 体重情報（必要な場合のみ）
+        elif need_weight and ('体重' in label or 'Weight' in label):
+            weight_match = _NUMBER_RE.search(value)
+            if weight_match and value.strip():
+                player_details['weight'] = weight_match.group(1)
+
+        # ポジション情報（必要な場合のみ）
+        elif need_position and ('ポジション' in label or 'Position' in label):
+            player_details['position'] = value
+
+        # 出身校情報（必要な場合のみ）
+        elif need_school and ('出身校' in label or '出身' in label):
+            player_details['school'] = value
+
+        # 学年情報（必要な場合のみ）
+        elif need_grade and ('学年' in label or 'Grade' in label):
+            player_details['grade'] = value
+
+        # ユニフォーム番号（必要な場合のみ）
+        elif need_uniform and ('ユニフォーム番号' in label or '背番号' in label):
+            player_details['uniform_number'] = value
+
+        # 氏名カナ（必要な場合のみ）
+        elif need_kana_name and ('氏名カナ' in label or 'カナ名' in label or 'フリガナ' in label or 'ふりがな' in label):
+            player_details['kana_name'] = value
+
+        # 登録状態（必要な場合のみ）
+        elif need_registration_status and ('登録状態' in label or '登録ステータス' in label or 'Registration Status' in label or 'Status' in label):
+            player_details['registration_status'] = value
+
+    # テーブルで見つからない場合は、ページ全体から正規表現で検索（必要な場合のみ）
+    page_text = None
+    if need_height and 'height' not in player_details:
+        page_text = get_page_text()
+        for pattern in _HEIGHT_PATTERNS:
+            match = re.search(pattern, page_text)
+            if match:
+                player_details['height'] = match.group(1)
+                break
+
+    if need_weight and 'weight' not in player_details:
+        if page_text is None:
+            page_text = get_page_text()
+        for pattern in _WEIGHT_PATTERNS:
+            match = re.search(pattern, page_text)
+            if match:
+                player_details['weight'] = match.group(1)
+                break
+
+    return player_details
+
+
+# ==================== 管理画面（kcbbf） ====================
+
+def parse_edit_page_selected_names(content):
+    """
+    大会チーム編集ページから、選手欄で選択されている選手名を取得
+
+    選手リストの可能性があるテーブル（6行以上）の各行について、name に "user_id" を含む
+    セレクトボックスで選択されている選手名を、ページ内の順番で返す
+    （未選択・「選択してください」・「?」を含む名前は除く）。
+    """
+    root = _parse_html(content)
+    names = []
+    if root is None:
+        return names
+
+    for table in _TABLES(root):
+        rows = _ROWS(table)
+        if len(rows) <= 5:
+            continue
+        for row in rows:
+            player_name_from_edit = None
+            for select in _SELECTS(row):
+                name_attr = select.get("name", "")
+                selected_option = _first(_FIRST_SELECTED_OPTION, select)
+                if selected_option is not None:
+                    value = _get_text(selected_option, strip=True)
+                    if "user_id" in name_attr:
+                        if value and value != '選択してください' and '?' not in value:
+                            player_name_from_edit = value
+            if player_name_from_edit:
+                names.append(player_name_from_edit)
+
+    return names
+
+
+def has_login_form(content):
+    """管理画面のログインページにフォームがあるか"""
+    root = _parse_html(content)
+    return root is not None and _first(_FIRST_FORM, root) is not None
+
+
+def parse_tournament_csv_links(content, base_url):
+    """大会ページから各チームのCSVダウンロードリンク（絶対URL）をページ内の順番で取得"""
+    root = _parse_html(content)
+    if root is None:
+        return []
+
+    csv_links = []
+    for a in _LINKS(root):
+        href = a.get("href")
+        if href and "/master-admin-game_category_teams/csv/id/" in href:
+            if href.startswith("/"):
+                full_url = f"{base_url}{href}"
+            else:
+                full_url = href
+            csv_links.append(full_url)
+    return csv_links
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 import requests
 import logging
-from bs4 import BeautifulSoup
 import pandas as pd
 import os
 import re
@@ -29,6 +28,15 @@ sys.path.append('.')
 
 # JBA検証システムのインポート
 from worker.jba_verification_lib import JBAVerificationSystem, DataValidator
+from worker.concurrency import get_concurrency_controller
+from worker.name_normalizer import normalize_name_text
+from worker.charset import decode_bytes, filename_from_content_disposition
+from worker.html_parsers import has_login_form, parse_edit_page_selected_names, parse_tournament_csv_links
+from worker.run_store import get_run_store, csv_content_hash, combined_csv_hash
+from worker.session_store import get_session_store, export_cookies, import_cookies
+from worker.scheduler import get_scheduler, when_all
+from worker.correction_engine import compute_corrections
+from config import settings
 
 class IntegratedTournamentSystem:
     """大会IDからJBA照合まで一括処理する統合システム"""
@@ -62,9 +70,31 @@ class IntegratedTournamentSystem:
         # キー: (university_name, player_name) -> True
         self.edited_player_names = {}
         
-        # CPU最適化
+        # 同時実行数はCPU数ではなく、ホストごとのAIMDコントローラーが応答状況から決める
+        # （I/O待ちが中心のため、1vCPUでも十分な並列度を確保する）
         self.cpu_count = multiprocessing.cpu_count()
-        self.max_workers = min(self.max_workers, self.cpu_count * 2)
+        self.jba_concurrency = get_concurrency_controller("team-jba.jp")
+        self.kcbbf_concurrency = get_concurrency_controller("www.kcbbf.jp")
+        # 照合タスクの優先度（ジョブごと。同時に動く他のジョブとワーカーを分け合う）
+        self.priority_group = get_scheduler().new_priority_group()
+        
+        # 🚀 パフォーマンス改善: 大会CSVで判定済みのエンコーディング（次のCSVの判定で最初に試す）
+        self.csv_encoding_hint = None
+        
+        # 🚀 パフォーマンス改善: 編集ページの選手名一覧（view_url ごとに1回だけ取得・解析）
+        self.edit_page_names = {}
+        self._edit_page_lock = threading.Lock()
+        
+        # 🚀 パフォーマンス改善: 同じ大会の再実行では、CSVが変わっていない大学の照合結果を再利用
+        self.game_id = None
+        self.csv_hashes = {}  # {university_name: [csv_hash, ...]}（CSVの順）
+        self._csv_hashes_lock = threading.Lock()
+        self.run_store = None
+        if settings.incremental_reruns:
+            try:
+                self.run_store = get_run_store()
+            except Exception as e:
+                print(f"⚠️ 照合結果ストアを使用できません: {e}")
         
         # 一時保存用ディレクトリ
         self.temp_dir = "temp_results"
@@ -203,7 +233,7 @@ class IntegratedTournamentSystem:
     def _normalize_name_text(self, text: str) -> str:
         """
         氏名・カナ名用の正規化:
-        - 全角/半角を統一（NFKC）
+        - 全角/半角を統一（NFKC）、異体字を統一（髙→高、﨑→崎 など）
         - 全角スペースを半角スペースに
         - 伸ばし棒を「ー」に統一（-, ｰ, ―, − などを含む）
         - 丸括弧「()」「（）」とその中身を削除
@@ -212,23 +242,8 @@ class IntegratedTournamentSystem:
         """
         if text is None:
             return ""
-        s = str(text)
-        # 全角/半角正規化
-        s = unicodedata.normalize("NFKC", s)
-        # 全角スペースを半角スペースに
-        s = s.replace("\u3000", " ")
-        # 伸ばし棒を「ー」に統一（ハイフン/ダッシュ類も含めて）
-        for ch in ["-", "ｰ", "‐", "―", "—", "−"]:
-            s = s.replace(ch, "ー")
-        # 丸括弧とその中身を削除
-        s = re.sub(r"\([^)]*\)", "", s)        # 半角()
-        s = re.sub(r"（[^）]*）", "", s)        # 全角（）
-        # 記号削除（中黒など）
-        for ch in ["・", "･"]:
-            s = s.replace(ch, "")
-        # 余分なスペースを1つに
-        s = re.sub(r"\s+", " ", s).strip()
-        return s
+        # 🚀 パフォーマンス改善: 異体字の統一も含めて name_normalizer に集約（メモ化あり）
+        return normalize_name_text(str(text))
     
     def _get_cached_data(self, key):
         """キャッシュからデータを取得"""
@@ -261,93 +276,244 @@ class IntegratedTournamentSystem:
         except Exception as e:
             pass  # エラーメッセージも表示しない
     
-    def _get_player_name_from_edit_page(self, session, view_url, player_name_with_question):
-        """編集ページから正しい選手名を取得（「?」を含む選手名を修正）"""
+    def _kcbbf_request(self, session, method, url, **kwargs):
+        """管理画面へのリクエスト（同時実行数をAIMDで制御し、応答時間を記録）"""
+        kwargs.setdefault("timeout", 30)
+        with self.kcbbf_concurrency.slot() as outcome:
+            response = session.request(method, url, **kwargs)
+            outcome['success'] = response.status_code < 500 and response.status_code != 429
+            return response
+    
+    def _get_edit_page_names(self, session, view_url):
+        """
+        編集ページで選択されている選手名の一覧を取得
+        
+        🚀 パフォーマンス改善: 編集ページはチーム（view_url）ごとに1回だけ取得・解析し、
+        ジョブの間キャッシュする（「?」を含む選手が何人いても1回で済む）
+        
+        Returns:
+            選手名のリスト（取得できない場合は None）
+        """
+        with self._edit_page_lock:
+            if view_url in self.edit_page_names:
+                return self.edit_page_names[view_url]
+        
+        names = None
         try:
             # 詳細ページのURLから編集ページのURLを推測
             edit_url = view_url.replace("/view/", "/edit/")
             
             # 編集ページにアクセス
-            response = session.get(edit_url, timeout=30)
-            if response.status_code != 200:
+            response = self._kcbbf_request(session, "GET", edit_url)
+            if response.status_code == 200:
+                names = parse_edit_page_selected_names(response.content)
+        except Exception:
+            names = None
+        
+        with self._edit_page_lock:
+            self.edit_page_names[view_url] = names
+        return names
+    
+    @staticmethod
+    def _match_edit_page_name(player_name_with_question, edit_page_names):
+        """
+        「?」を含む選手名に対応する正しい選手名を、編集ページの選手名一覧から探す
+        
+        Returns:
+            正しい選手名（一意に決まらない場合は None）
+        """
+        # 「?」を含む選手名から比較用の文字列を生成
+        # 例: "島? 輝" -> "島 輝"（?を除く）
+        question_cleaned = player_name_with_question.replace('?', '').strip()
+        
+        # 方法1: 「?」を除いた部分が正しい名前に完全一致するか（最も厳密）
+        if question_cleaned in edit_page_names:
+            return question_cleaned
+        
+        # 候補を収集（より厳密なマッチングのため）
+        candidates = []
+        
+        for player_name_from_edit in edit_page_names:
+            # 方法2: 名前の後半部分（名字の後）が完全一致するか
+            # 例: "島? 輝" と "島 輝" -> " 輝" が一致
+            if ' ' in question_cleaned:
+                parts = question_cleaned.split(' ', 1)
+                if len(parts) == 2:
+                    last_part = parts[1]  # "輝"
+                    if ' ' in player_name_from_edit:
+                        correct_parts = player_name_from_edit.split(' ', 1)
+                        if len(correct_parts) == 2 and correct_parts[1] == last_part:
+                            # 名字部分の文字数が同じか、1文字差以内の場合のみ候補に追加
+                            if abs(len(parts[0]) - len(correct_parts[0])) <= 1:
+                                candidates.append(player_name_from_edit)
+            
+            # 方法3: 文字数が同じで、最初の文字以外が完全一致するか
+            if len(question_cleaned) == len(player_name_from_edit):
+                if question_cleaned[1:] == player_name_from_edit[1:]:
+                    candidates.append(player_name_from_edit)
+        
+        # 候補が1つだけの場合はそれを返す（複数ある場合は返さない）
+        if len(candidates) == 1:
+            return candidates[0]
+        
+        # 候補が複数ある場合は、最も類似度が高いものを返す（ただし1.0のみ）
+        if len(candidates) > 1:
+            from difflib import SequenceMatcher
+            best_match = None
+            best_similarity = 0.0
+            for candidate in candidates:
+                similarity = SequenceMatcher(None, question_cleaned, candidate).ratio()
+                if similarity > best_similarity and similarity >= 1.0:
+                    best_similarity = similarity
+                    best_match = candidate
+            if best_match:
+                return best_match
+        
+        return None
+    
+    def _get_player_name_from_edit_page(self, session, view_url, player_name_with_question):
+        """編集ページから正しい選手名を取得（「?」を含む選手名を修正）"""
+        try:
+            edit_page_names = self._get_edit_page_names(session, view_url)
+            if not edit_page_names:
+                return None
+            return self._match_edit_page_name(player_name_with_question, edit_page_names)
+        except Exception:
+            return None
+    
+    def _fetch_tournament_csv(self, session, i, csv_url, total):
+        """
+        大会CSVを1件取得して DataFrame に変換（大学名の列を追加）
+        
+        失敗した場合は None を返す（他のCSVの取得には影響しない）
+        """
+        try:
+            print(f"CSV {i+1}/{total} を取得中...")
+            
+            csv_response = self._kcbbf_request(session, "GET", csv_url)
+            csv_response.raise_for_status()
+            
+            # CSVをDataFrameに変換（日本語対応）
+            # 🚀 パフォーマンス改善: エンコーディングを1回だけ判定し、デコード・解析も1回だけ行う
+            # （BOM → UTF-8 → Content-Type → 同じ大会で判定済みのエンコーディング → CP932 → EUC-JP）
+            csv_text, encoding = decode_bytes(
+                csv_response.content,
+                csv_response.headers.get("content-type"),
+                hint=self.csv_encoding_hint,
+            )
+            self.csv_encoding_hint = encoding
+            try:
+                df = pd.read_csv(StringIO(csv_text))
+            except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+                print(f"❌ CSV {i+1} の解析に失敗: {encoding} - {e}")
                 return None
+            print(f"✅ CSV {i+1} エンコーディング: {encoding}")
+            
+            # CSV URLから詳細ページURLを推測（編集ページ参照用）
+            csv_id_match = re.search(r'/csv/id/(\d+)', csv_url)
+            view_url = None
+            if csv_id_match:
+                view_id = csv_id_match.group(1)
+                view_url = f"{self.base_url}/master-admin-game_category_teams/view/id/{view_id}"
+            
+            # 大学名を取得（文字エンコーディング対応）
+            # ファイル名は本文とは別に判定する（UTF-8 → CP932 → EUC-JP、filename* があればそちらを使う）
+            filename = filename_from_content_disposition(
+                csv_response.headers.get("content-disposition", ""),
+            )
             
-            soup = BeautifulSoup(response.text, "html.parser")
+            if filename:
+                university_name = filename.replace('.csv', '')
+                print(f"📝 最終大学名: {university_name}")
+            else:
+                university_name = f"大学_{i+1}"
             
-            # テーブルを探す
-            tables = soup.find_all("table")
+            # 大学名の正規化（余分な文字を除去）
+            university_name = university_name.strip()
             
-            # 「?」を含む選手名から比較用の文字列を生成
-            # 例: "島? 輝" -> "島 輝"（?を除く）
-            question_cleaned = player_name_with_question.replace('?', '').strip()
+            # CSVの内容のハッシュを記録（再実行時に変更のないCSV・大学を判定するため）
+            # ストリーミングではCSVごとに照合するため、DataFrame にも持たせる
+            csv_hash = csv_content_hash(csv_response.content)
+            df.attrs['csv_hash'] = csv_hash
+            with self._csv_hashes_lock:
+                self.csv_hashes.setdefault(university_name, []).append(csv_hash)
             
-            # 候補を収集（より厳密なマッチングのため）
-            candidates = []
+            print(f"🎯 正規化後大学名: {university_name}")
             
-            for table in tables:
-                rows = table.find_all("tr")
-                if len(rows) > 5:  # 選手リストの可能性
-                    for row in rows:
-                        # セレクトボックスから選択されている選手名を取得
-                        selects = row.find_all("select")
-                        player_name_from_edit = None
-                        
-                        for select in selects:
-                            name_attr = select.get("name", "")
-                            selected_option = select.find("option", selected=True)
-                            if selected_option:
-                                value = selected_option.get_text(strip=True)
-                                if "user_id" in name_attr:
-                                    if value and value != '選択してください' and '?' not in value:
-                                        player_name_from_edit = value
-                        
-                        # 選手名が取得できた場合、マッチングを試みる
-                        if player_name_from_edit:
-                            # 方法1: 「?」を除いた部分が正しい名前に完全一致するか（最も厳密）
-                            if question_cleaned == player_name_from_edit:
-                                return player_name_from_edit
-                            
-                            # 方法2: 名前の後半部分（名字の後）が完全一致するか
-                            # 例: "島? 輝" と "島 輝" -> " 輝" が一致
-                            if ' ' in question_cleaned:
-                                parts = question_cleaned.split(' ', 1)
-                                if len(parts) == 2:
-                                    last_part = parts[1]  # "輝"
-                                    if ' ' in player_name_from_edit:
-                                        correct_parts = player_name_from_edit.split(' ', 1)
-                                        if len(correct_parts) == 2 and correct_parts[1] == last_part:
-                                            # 名字部分の文字数が同じか、1文字差以内の場合のみ候補に追加
-                                            if abs(len(parts[0]) - len(correct_parts[0])) <= 1:
-                                                candidates.append(player_name_from_edit)
-                            
-                            # 方法3: 文字数が同じで、最初の文字以外が完全一致するか
-                            if len(question_cleaned) == len(player_name_from_edit):
-                                if question_cleaned[1:] == player_name_from_edit[1:]:
-                                    candidates.append(player_name_from_edit)
-            
-            # 候補が1つだけの場合はそれを返す（複数ある場合は返さない）
-            if len(candidates) == 1:
-                return candidates[0]
-            
-            # 候補が複数ある場合は、最も類似度が高いものを返す（ただし1.0のみ）
-            if len(candidates) > 1:
-                from difflib import SequenceMatcher
-                best_match = None
-                best_similarity = 0.0
-                for candidate in candidates:
-                    similarity = SequenceMatcher(None, question_cleaned, candidate).ratio()
-                    if similarity > best_similarity and similarity >= 1.0:
-                        best_similarity = similarity
-                        best_match = candidate
-                if best_match:
-                    return best_match
+            # 「?」を含む選手名を編集ページから修正（可能な場合）
+            try:
+                # 選手名カラムを推定
+                player_name_columns = []
+                for col in df.columns:
+                    col_lower = str(col).lower()
+                    if any(keyword in col_lower for keyword in ['選手', '氏名', 'name', '名前']):
+                        player_name_columns.append(col)
+                if player_name_columns and view_url:
+                    player_name_col = player_name_columns[0]
+                    corrected_count = 0
+                    # 🚀 パフォーマンス改善: 「?」を含む選手がいる場合だけ編集ページを1回取得し、
+                    # その選手名一覧で全員分をまとめて修正
+                    names = df[player_name_col]
+                    question_rows = names[names.notna() & names.astype(str).str.contains('?', regex=False)]
+                    edit_page_names = self._get_edit_page_names(session, view_url) if not question_rows.empty else None
+                    for idx, value in (question_rows.items() if edit_page_names else ()):
+                        player_name = str(value)
+                        correct_name = self._match_edit_page_name(player_name, edit_page_names)
+                        if correct_name:
+                            df.at[idx, player_name_col] = correct_name
+                            corrected_count += 1
+                            # 編集ページから取得した選手名を記録（JBA照合時に優先するため）
+                            self.edited_player_names[(university_name, correct_name)] = True
+                            print(f"  ✅ 選手名を修正: {player_name} → {correct_name} (編集ページから取得、JBA照合時に優先)")
+                    if corrected_count > 0:
+                        print(f"  ✅ {corrected_count} 件の選手名を編集ページから修正しました（JBA照合時に優先されます）")
+            except Exception as e:
+                print(f"  ⚠️ 編集ページからの名前修正に失敗: {e}")
             
-            return None
-        except Exception:
+            # 大学名をDataFrameに追加
+            df['大学名'] = university_name
+            
+            print(f"✅ CSV {i+1} 取得成功")
+            return df
+            
+        except Exception as e:
+            print(f"⚠️ CSV {i+1} の取得に失敗: {str(e)}")
             return None
     
-    def login_and_get_tournament_csvs(self, username, password, game_id):
-        """ログインして大会の全CSVを取得"""
+    def _kcbbf_login(self, session, login_url, username, password):
+        """管理画面にログイン（成功した場合 True）"""
+        # ログイン処理
+        print("🔐 ログイン処理中...")
+        login_page = self._kcbbf_request(session, "GET", login_url)
+        
+        if login_page.status_code != 200:
+            print("❌ ログインページにアクセスできません")
+            return False
+        
+        if not has_login_form(login_page.content):
+            print("❌ ログインフォームが見つかりません")
+            return False
+        
+        # ログイン実行
+        form_action = f"{self.base_url}/master-admin/login"
+        login_data = {"uid": username, "pass": password}
+        
+        login_response = self._kcbbf_request(session, "POST", form_action, data=login_data)
+        
+        if "login" in login_response.url.lower():
+            print("❌ ログインに失敗しました")
+            return False
+        
+        print("✅ ログインに成功しました！")
+        return True
+    
+    def _login_and_get_csv_links(self, username, password, game_id):
+        """
+        管理画面にログインして大会のCSVリンク一覧を取得
+        
+        Returns:
+            (session, csv_links)（失敗時は None）
+        """
         
         session = requests.Session()
         session.headers.update({
@@ -359,41 +525,39 @@ class IntegratedTournamentSystem:
             "Upgrade-Insecure-Requests": "1"
         })
         
+        self.game_id = game_id
+        login_url = f"{self.base_url}/restrict/login"
+        session.headers.update({"Referer": login_url})
+        session_store = get_session_store()
+        
         try:
-            # ログイン処理
-            print("🔐 ログイン処理中...")
-            login_url = f"{self.base_url}/restrict/login"
-            login_page = session.get(login_url, timeout=30)
-            
-            if login_page.status_code != 200:
-                print("❌ ログインページにアクセスできません")
-                return None
-            
-            soup = BeautifulSoup(login_page.text, "html.parser")
-            form = soup.find("form")
-            
-            if not form:
-                print("❌ ログインフォームが見つかりません")
-                return None
-            
-            # ログイン実行
-            form_action = f"{self.base_url}/master-admin/login"
-            login_data = {"uid": username, "pass": password}
-            session.headers.update({"Referer": login_url})
-            
-            login_response = session.post(form_action, data=login_data, timeout=30)
-            
-            if "login" in login_response.url.lower():
-                print("❌ ログインに失敗しました")
-                return None
-            
-            print("✅ ログインに成功しました！")
-            
-            # 大会CSV取得
-            print(f"🏀 大会ID {game_id} のCSVを取得中...")
             target_url = f"{self.base_url}/master-admin-game_category_teams/index/search/true/game_category_id/{game_id}"
+            response = None
+            
+            # 🚀 パフォーマンス改善: 保存済みのセッションがあれば、ログインせずに大会ページを取得
+            # （ログインページにリダイレクトされた場合だけ期限切れとして通常のログインを行う）
+            cookies = session_store.load("kcbbf", username, password) if session_store else None
+            if cookies:
+                import_cookies(session.cookies, cookies)
+                print(f"🏀 大会ID {game_id} のCSVを取得中（保存済みセッション）...")
+                response = self._kcbbf_request(session, "GET", target_url)
+                if "login" in response.url.lower():
+                    print("🔑 保存済みのセッションが期限切れのため再ログインします")
+                    session_store.delete("kcbbf", username, password)
+                    session.cookies.clear()
+                    response = None
+            
+            if response is None:
+                if not self._kcbbf_login(session, login_url, username, password):
+                    return None
+                
+                # 大会CSV取得
+                print(f"🏀 大会ID {game_id} のCSVを取得中...")
+                response = self._kcbbf_request(session, "GET", target_url)
+            
+            if session_store and "login" not in response.url.lower():
+                session_store.save("kcbbf", username, password, export_cookies(session.cookies))
             
-            response = session.get(target_url, timeout=30)
             if response.status_code != 200:
                 print(f"❌ 大会ページにアクセスできません (ステータス: {response.status_code})")
                 return None
@@ -402,18 +566,8 @@ class IntegratedTournamentSystem:
                 print("❌ 大会が見つかりませんでした")
                 return None
             
-            soup = BeautifulSoup(response.text, "html.parser")
-            
             # CSVリンクを抽出
-            csv_links = []
-            for a in soup.find_all("a", href=True):
-                href = a.get("href")
-                if href and "/master-admin-game_category_teams/csv/id/" in href:
-                    if href.startswith("/"):
-                        full_url = f"{self.base_url}{href}"
-                    else:
-                        full_url = href
-                    csv_links.append(full_url)
+            csv_links = parse_tournament_csv_links(response.content, self.base_url)
             
             print(f"📊 {len(csv_links)} 件のCSVリンクを検出")
             
@@ -429,134 +583,37 @@ class IntegratedTournamentSystem:
                 
                 return None
             
-            # CSVを取得してDataFrameに変換
-            all_universities_data = []
+            return session, csv_links
             
+        except Exception as e:
+            print(f"❌ エラー: {str(e)}")
+            return None
+    
+    def login_and_get_tournament_csvs(self, username, password, game_id):
+        """ログインして大会の全CSVを取得"""
+        login_result = self._login_and_get_csv_links(username, password, game_id)
+        if login_result is None:
+            return None
+        session, csv_links = login_result
+        
+        try:
+            # CSVを取得してDataFrameに変換
             print("📊 CSV取得処理中...")
             
-            for i, csv_url in enumerate(csv_links):
-                try:
-                    print(f"CSV {i+1}/{len(csv_links)} を取得中...")
-                    
-                    csv_response = session.get(csv_url, timeout=30)
-                    csv_response.raise_for_status()
-                    
-                    # CSVをDataFrameに変換（日本語対応）
-                    # まずはレスポンスのエンコーディングを確認
-                    response_encoding = csv_response.encoding or 'utf-8'
-                    print(f"🔍 CSV {i+1} レスポンスエンコーディング: {response_encoding}")
-                    
-                    # 複数のエンコーディングを試行
-                    csv_encodings = ['utf-8', 'shift_jis', 'cp932', 'iso-2022-jp', 'euc-jp', 'utf-8-sig']
-                    df = None
-                    
-                    for encoding in csv_encodings:
-                        try:
-                            if encoding == 'utf-8-sig':
-                                csv_text = csv_response.content.decode('utf-8-sig')
-                            else:
-                                csv_text = csv_response.content.decode(encoding)
-                            df = pd.read_csv(StringIO(csv_text))
-                            print(f"✅ CSV {i+1} エンコーディング成功: {encoding}")
-                            break
-                        except (UnicodeDecodeError, pd.errors.ParserError, UnicodeError) as e:
-                            print(f"⚠️ CSV {i+1} エンコーディング失敗: {encoding} - {e}")
-                            continue
-                    
-                    if df is None:
-                        print(f"❌ CSV {i+1} 全てのエンコーディングで失敗")
-                        continue
-                    
-                    # CSV URLから詳細ページURLを推測（編集ページ参照用）
-                    csv_id_match = re.search(r'/csv/id/(\d+)', csv_url)
-                    view_url = None
-                    if csv_id_match:
-                        view_id = csv_id_match.group(1)
-                        view_url = f"{self.base_url}/master-admin-game_category_teams/view/id/{view_id}"
-                    
-                    # 大学名を取得（文字エンコーディング対応）
-                    content_disposition = csv_response.headers.get("content-disposition", "")
-                    filename_match = re.search(r'filename="(.+)"', content_disposition)
-                    
-                    if filename_match:
-                        # 文字エンコーディングを修正
-                        university_name = filename_match.group(1).replace('.csv', '')
-                        print(f"🔍 元の大学名: {repr(university_name)}")
-                        
-                        try:
-                            # 複数のエンコーディングを試行
-                            encodings_to_try = ['utf-8', 'shift_jis', 'cp932', 'iso-2022-jp', 'euc-jp']
-                            
-                            for encoding in encodings_to_try:
-                                try:
-                                    # バイト列に戻してから指定エンコーディングでデコード
-                                    if isinstance(university_name, str):
-                                        # 文字列をバイト列に変換（latin-1経由）
-                                        byte_name = university_name.encode('latin-1')
-                                        university_name = byte_name.decode(encoding)
-                                        print(f"✅ エンコーディング成功: {encoding} -> {university_name}")
-                                        break
-                                except (UnicodeDecodeError, UnicodeEncodeError):
-                                    continue
-                            
-                            # URLデコードも試行
-                            import urllib.parse
-                            university_name = urllib.parse.unquote(university_name)
-                            
-                        except Exception as e:
-                            print(f"⚠️ エンコーディング変換失敗: {e}")
-                            # エンコーディング変換に失敗した場合はそのまま使用
-                            pass
-                        
-                        print(f"📝 最終大学名: {university_name}")
-                    else:
-                        university_name = f"大学_{i+1}"
-                    
-                    # 大学名の正規化（余分な文字を除去）
-                    university_name = university_name.strip()
-                    # よくある文字化けパターンを修正
-                    university_name = university_name.replace('æ', '東').replace('å', '大').replace('é', '学')
-                    university_name = university_name.replace('ç', '科').replace('è', '学').replace('ã', 'ー')
-                    university_name = university_name.replace('ï', '学').replace('í', '学').replace('ó', '学')
-                    
-                    print(f"🎯 正規化後大学名: {university_name}")
-                    
-                    # 「?」を含む選手名を編集ページから修正（可能な場合）
-                    try:
-                        # 選手名カラムを推定
-                        player_name_columns = []
-                        for col in df.columns:
-                            col_lower = str(col).lower()
-                            if any(keyword in col_lower for keyword in ['選手', '氏名', 'name', '名前']):
-                                player_name_columns.append(col)
-                        if player_name_columns and view_url:
-                            player_name_col = player_name_columns[0]
-                            corrected_count = 0
-                            for idx, row in df.iterrows():
-                                player_name = str(row[player_name_col]) if pd.notna(row[player_name_col]) else ""
-                                if player_name and '?' in player_name:
-                                    correct_name = self._get_player_name_from_edit_page(session, view_url, player_name)
-                                    if correct_name:
-                                        df.at[idx, player_name_col] = correct_name
-                                        corrected_count += 1
-                                        # 編集ページから取得した選手名を記録（JBA照合時に優先するため）
-                                        self.edited_player_names[(university_name, correct_name)] = True
-                                        print(f"  ✅ 選手名を修正: {player_name} → {correct_name} (編集ページから取得、JBA照合時に優先)")
-                            if corrected_count > 0:
-                                print(f"  ✅ {corrected_count} 件の選手名を編集ページから修正しました（JBA照合時に優先されます）")
-                    except Exception as e:
-                        print(f"  ⚠️ 編集ページからの名前修正に失敗: {e}")
-                    
-                    # 大学名をDataFrameに追加
-                    df['大学名'] = university_name
-                    all_universities_data.append(df)
-                    
-                    print(f"✅ CSV {i+1} 取得成功")
-                    # Sleep removed  # サーバー負荷軽減
-                    
-                except Exception as e:
-                    print(f"⚠️ CSV {i+1} の取得に失敗: {str(e)}")
-                    continue
+            # 🚀 パフォーマンス改善: 同じログイン済みセッションでCSVを並列取得
+            # （同時実行数は kcbbf のAIMDコントローラーが制御、結果はリンク順に並べる）
+            import concurrent.futures
+            all_universities_data = []
+            pool_size = max(1, min(len(csv_links), self.kcbbf_concurrency.max_limit))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=pool_size) as executor:
+                futures = [
+                    executor.submit(self._fetch_tournament_csv, session, i, csv_url, len(csv_links))
+                    for i, csv_url in enumerate(csv_links)
+                ]
+                for future in futures:
+                    df = future.result()
+                    if df is not None:
+                        all_universities_data.append(df)
             
             print("✅ CSV取得完了")
             
@@ -572,6 +629,55 @@ class IntegratedTournamentSystem:
             print(f"❌ エラー: {str(e)}")
             return None
     
+    def stream_tournament_csvs(self, username, password, game_id, df_queue):
+        """
+        ログインして大会の全CSVを取得し、デコードできたものから順にキューへ流す（プロデューサー）
+        
+        キューには次のメッセージを入れる:
+            ("total", CSV件数)  … CSVリンク一覧を取得した時点で1回
+            ("csv", i, df)      … i 番目のCSVのDataFrame
+            ("failed", i)       … i 番目のCSVの取得・デコードに失敗（進捗の分母から除くため）
+            ("done",)           … 終了（ログイン失敗・例外時も必ず入れる）
+        
+        Returns:
+            キューに流したDataFrameの数
+        """
+        import concurrent.futures
+        
+        produced = 0
+        try:
+            login_result = self._login_and_get_csv_links(username, password, game_id)
+            if login_result is None:
+                return 0
+            session, csv_links = login_result
+            df_queue.put(("total", len(csv_links)))
+            
+            pool_size = max(1, min(len(csv_links), self.kcbbf_concurrency.max_limit))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=pool_size) as executor:
+                futures = {
+                    executor.submit(self._fetch_tournament_csv, session, i, csv_url, len(csv_links)): i
+                    for i, csv_url in enumerate(csv_links)
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        df = future.result()
+                    except Exception as e:
+                        print(f"❌ CSV {futures[future]+1} の取得でエラー: {e}")
+                        df = None
+                    if df is not None:
+                        df_queue.put(("csv", futures[future], df))
+                        produced += 1
+                    else:
+                        df_queue.put(("failed", futures[future]))
+            
+            print(f"✅ CSV取得完了（{produced}/{len(csv_links)} 件）")
+            return produced
+        except Exception as e:
+            print(f"❌ エラー: {str(e)}")
+            return produced
+        finally:
+            df_queue.put(("done",))
+    
     def process_tournament_data(self, df, university_name=None, job_id=None, progress_callback=None):
         """大会データをJBA照合で処理（並列処理対応）"""
         
@@ -853,69 +959,176 @@ class IntegratedTournamentSystem:
         
         logger.info(f"🚀 処理開始: {len(universities)} 大学, {total_players} 選手")
         
-        # 🚀 パフォーマンス改善2: 大学間の並列処理（適度な並列度で）
-        def process_single_university(univ):
-            """単一大学の処理（並列化用）"""
+        # 🚀 パフォーマンス改善2: 大学 → チーム名簿 → 選手照合 を共通スケジューラーで処理
+        # （入れ子のスレッドプールを使わず、実行中のタスク数はスケジューラーの上限で一定に保つ。
+        #   HTTPの流量はレートリミッターとAIMDコントローラーが制御する）
+        futures = {}
+        for univ in universities:
+            # この大学の選手を抽出
+            if '大学名' in df.columns:
+                univ_data = df[df['大学名'] == univ].copy()
+            else:
+                univ_data = df.copy()
+            futures[self._schedule_university(univ_data, univ, self._get_university_csv_hash(univ))] = univ
+        
+        completed_universities = 0
+        total_universities = len(universities)
+        
+        for future in concurrent.futures.as_completed(futures):
+            univ = futures[future]
             try:
-                logger.info(f"🏫 {univ} を処理中...")
+                univ_results = future.result()
+                all_results.extend(univ_results)
+                completed_universities += 1
                 
-                # この大学の選手を抽出
-                if '大学名' in df.columns:
-                    univ_data = df[df['大学名'] == univ].copy()
-                else:
-                    univ_data = df.copy()
-                
-                # ★ この大学のチーム情報を1回だけ事前取得（リアルタイム性を保つ）
-                logger.info(f"📥 {univ} のチーム情報を取得中（リアルタイム）...")
-                preload_start = time.time()
-                self._preload_university_teams(univ)
-                preload_elapsed = time.time() - preload_start
-                logger.info(f"✅ {univ} のチーム取得完了: {preload_elapsed:.2f}秒")
+                # 進捗を更新（大学ごと）
+                if progress_callback:
+                    progress = completed_universities / total_universities
+                    message = f"{univ} を処理完了 ({completed_universities}/{total_universities})"
+                    progress_callback(progress, message)
+            except Exception as e:
+                logger.error(f"❌ {univ} の処理で例外: {e}", exc_info=True)
+                completed_universities += 1
+                if progress_callback:
+                    progress = completed_universities / total_universities
+                    message = f"{univ} の処理でエラー ({completed_universities}/{total_universities})"
+                    progress_callback(progress, message)
+        
+        elapsed_time = time.time() - start_time
+        self.performance_stats['total_time'] = elapsed_time
+        
+        self._print_verification_stats(all_results, elapsed_time)
+        
+        return all_results
+    
+    def _get_university_csv_hash(self, univ):
+        """
+        大学の全CSVをまとめたハッシュを取得（一括処理用、全CSVの取得後に呼ぶ）
+        
+        同じ大学のCSVが複数ある場合も、全CSVのハッシュを順にまとめたものになる。
+        """
+        if not (self.run_store and self.game_id):
+            return None
+        with self._csv_hashes_lock:
+            return combined_csv_hash(self.csv_hashes.get(univ))
+    
+    def _schedule_university(self, univ_data, univ, csv_hash=None):
+        """
+        単一大学の照合を共通スケジューラーに投入
+        
+        csv_hash は univ_data に含まれるCSV全体のハッシュ（前回結果の再利用・保存のキー）。
+        
+        大学の準備（前回結果の確認・チーム名簿の取得）→ 選手ごとの照合 → 選手詳細の一括取得 の順に、
+        前の段階が終わったらコールバックで次の段階のタスクを投入する
+        （スケジューラーのワーカーが子タスクの完了を待ってブロックすることはない）。
+        
+        Returns:
+            照合結果のリストで完了する Future（エラー時は空リスト）
+        """
+        import concurrent.futures
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        scheduler = get_scheduler()
+        # このジョブ内では先に始めた大学ほど優先（タスクがなくなれば空いたワーカーは次の大学へ）
+        priority = self.priority_group.next_priority()
+        result_future = concurrent.futures.Future()
+        result_future.set_running_or_notify_cancel()
+        
+        def fail(e):
+            logger.error(f"❌ {univ} の処理でエラー: {e}", exc_info=True)
+            if not result_future.done():
+                result_future.set_result([])
+        
+        def on_results_done(results_future):
+            try:
+                univ_results = results_future.result()
+                logger.info(f"✅ {univ} 完了: {len(univ_results)} 名処理")
+                self._save_temp_results(univ, univ_results)
+                self._store_university_results(univ, univ_data, csv_hash, univ_results)
+                result_future.set_result(univ_results)
+            except Exception as e:
+                fail(e)
+        
+        def on_players_done(done_future):
+            try:
+                matched = []
+                for player_future in done_future.result():
+                    try:
+                        matched.append(player_future.result())
+                    except Exception as e:
+                        logger.error(f"❌ 処理中にエラーが発生しました: {str(e)}", exc_info=True)
                 
-                # ★ この大学の選手を並列処理（チーム情報はキャッシュから取得）
-                logger.info(f"⚡ {univ} の {len(univ_data)} 名を処理中...")
-                univ_results = self._process_university_players_parallel(univ_data, univ)
+                # ★ 照合が終わったら、この大学の選手詳細をまとめて取得
+                scheduler.submit(
+                    self._complete_university_results, univ, matched, priority=priority
+                ).add_done_callback(on_results_done)
+            except Exception as e:
+                fail(e)
+        
+        def on_prepared(prepare_future):
+            try:
+                previous_results, player_data = prepare_future.result()
+                if previous_results is not None:
+                    result_future.set_result(previous_results)
+                    return
                 
-                logger.info(f"✅ {univ} 完了: {len(univ_results)} 名処理")
-                return univ_results
+                # ★ この大学の選手を照合（チーム情報はキャッシュから取得）
+                logger.info(f"⚡ {univ} の {len(player_data)} 名を処理中...")
+                player_futures = [
+                    scheduler.submit(self._match_single_player, index, row, player_univ, player_name, priority=priority)
+                    for index, row, player_univ, player_name in player_data
+                ]
+                when_all(player_futures).add_done_callback(on_players_done)
             except Exception as e:
-                logger.error(f"❌ {univ} の処理でエラー: {e}", exc_info=True)
-                return []
+                fail(e)
         
-        # 大学間を並列処理（適度な並列度で、レート制限対策）
-        # 大学数が多い場合は並列度を制限（最大5大学まで同時処理）
-        max_univ_workers = min(self.max_workers, len(universities), 5)
+        scheduler.submit(
+            self._prepare_university, univ_data, univ, csv_hash, priority=priority
+        ).add_done_callback(on_prepared)
+        return result_future
+    
+    def _prepare_university(self, univ_data, univ, csv_hash=None):
+        """
+        大学の照合準備（スケジューラーの最初の段階）
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_univ_workers) as executor:
-            futures = {executor.submit(process_single_university, univ): univ for univ in universities}
-            
-            completed_universities = 0
-            total_universities = len(universities)
-            
-            for future in concurrent.futures.as_completed(futures):
-                univ = futures[future]
-                try:
-                    univ_results = future.result()
-                    all_results.extend(univ_results)
-                    completed_universities += 1
-                    
-                    # 進捗を更新（大学ごと）
-                    if progress_callback:
-                        progress = completed_universities / total_universities
-                        message = f"{univ} を処理完了 ({completed_universities}/{total_universities})"
-                        progress_callback(progress, message)
-                except Exception as e:
-                    logger.error(f"❌ {univ} の処理で例外: {e}", exc_info=True)
-                    completed_universities += 1
-                    if progress_callback:
-                        progress = completed_universities / total_universities
-                        message = f"{univ} の処理でエラー ({completed_universities}/{total_universities})"
-                        progress_callback(progress, message)
+        前回の実行からCSVが変わっておらず、照合結果が名簿のTTL内であれば、保存済みの結果を
+        （index を今回の univ_data の index に戻して）返す。
+        それ以外はこの大学のチーム情報を1回だけ取得し、照合する選手の一覧を作る。
         
-        elapsed_time = time.time() - start_time
-        self.performance_stats['total_time'] = elapsed_time
+        Returns:
+            (previous_results, player_data)（どちらか一方が None）
+        """
+        import time
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        if csv_hash and self.run_store and self.game_id:
+            previous_results = self.run_store.get(self.game_id, csv_hash, univ_data.index)
+            if previous_results is not None:
+                logger.info(f"♻️ {univ} はCSVに変更がないため前回の照合結果を再利用: {len(previous_results)} 名")
+                return previous_results, None
         
-        # JBA照合統計を表示
+        logger.info(f"🏫 {univ} を処理中...")
+        
+        # ★ この大学のチーム情報を1回だけ事前取得（リアルタイム性を保つ）
+        logger.info(f"📥 {univ} のチーム情報を取得中（リアルタイム）...")
+        preload_start = time.time()
+        self._preload_university_teams(univ)
+        preload_elapsed = time.time() - preload_start
+        logger.info(f"✅ {univ} のチーム取得完了: {preload_elapsed:.2f}秒")
+        
+        return None, self._build_player_data(univ_data, univ)
+    
+    def _store_university_results(self, univ, univ_data, csv_hash, univ_results):
+        """エラーを含まない照合結果を保存（次回の再実行で再利用）"""
+        if not (csv_hash and self.run_store and self.game_id):
+            return
+        if univ_results and not any(r.get('status') == 'error' for r in univ_results):
+            self.run_store.put(self.game_id, univ, csv_hash, univ_results, univ_data.index)
+    
+    def _print_verification_stats(self, all_results, elapsed_time):
+        """JBA照合統計を表示"""
         match_count = len([r for r in all_results if r.get('status') == 'match'])
         not_found_count = len([r for r in all_results if r.get('status') == 'not_found'])
         error_count = len([r for r in all_results if r.get('status') == 'error'])
@@ -926,13 +1139,108 @@ class IntegratedTournamentSystem:
         print(f"   JBA登録なし（×）: {not_found_count}")
         print(f"   エラー: {error_count}")
         print(f"   総処理時間: {elapsed_time:.2f}秒")
+    
+    def process_tournament_stream(self, df_queue, job_id=None, progress_callback=None):
+        """
+        キューに届いた大学ごとのDataFrameを、届いた順にJBA照合（コンシューマー）
         
-        return all_results
+        stream_tournament_csvs と組み合わせて使う。全CSVの取得を待たずに照合を始めるため、
+        CSV取得とJBAの名簿取得・照合が重なって進む。
+        
+        Returns:
+            (all_results, universities)（universities はCSVの順に並べた大学名）
+        """
+        import time
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        # パフォーマンス統計をリセット
+        self.performance_stats = {
+            'total_time': 0,
+            'io_time': 0,
+            'processing_time': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'requests_count': 0,
+            'avg_response_time': 0
+        }
+        
+        all_results = []
+        universities_by_csv = {}
+        start_time = time.time()
+        total_csvs = None
+        skipped = 0  # 取得に失敗した・空のCSV（照合しないため進捗の分母から除く）
+        submitted = 0
+        completed = 0
+        reported_progress = None
+        producer_done = False
+        # CSVごとに行番号が0から振られるため、大学をまたいで一意になるようずらす
+        row_offset = 0
+        
+        logger.info("🚀 ストリーミング処理開始")
+        
+        while not (producer_done and completed == submitted):
+            message = df_queue.get()
+            kind = message[0]
+            
+            if kind == "total":
+                total_csvs = message[1]
+            
+            elif kind == "failed":
+                skipped += 1
+            
+            elif kind == "csv":
+                _, csv_index, df = message
+                if df is None or df.empty:
+                    skipped += 1
+                    continue
+                df.index = pd.RangeIndex(row_offset, row_offset + len(df))
+                row_offset += len(df)
+                
+                univ = df['大学名'].iloc[0]
+                universities_by_csv[csv_index] = univ
+                # CSVごとに照合するため、前回結果の再利用もこのCSVのハッシュで判定する
+                # （同じ大学の残りのCSVがまだ届いていなくても正しく判定できる）
+                csv_hash = df.attrs.get('csv_hash') if self.run_store and self.game_id else None
+                future = self._schedule_university(df, univ, csv_hash)
+                # 完了通知も同じキューに流し、取得と照合の進捗を1か所で扱う
+                future.add_done_callback(lambda f, univ=univ: df_queue.put(("result", univ, f)))
+                submitted += 1
+            
+            elif kind == "result":
+                _, univ, future = message
+                completed += 1
+                total_universities = max((total_csvs or 0) - skipped, submitted)
+                try:
+                    all_results.extend(future.result())
+                    message_text = f"{univ} を処理完了 ({completed}/{total_universities})"
+                except Exception as e:
+                    logger.error(f"❌ {univ} の処理で例外: {e}", exc_info=True)
+                    message_text = f"{univ} の処理でエラー ({completed}/{total_universities})"
+                
+                # 進捗を更新（大学ごと）
+                if progress_callback:
+                    reported_progress = completed / total_universities
+                    progress_callback(reported_progress, message_text)
+            
+            elif kind == "done":
+                producer_done = True
+        
+        # 最後の大学の完了後に失敗したCSVの通知が届いた場合も、進捗を完了にする
+        if progress_callback and reported_progress is not None and reported_progress < 1.0:
+            progress_callback(1.0, f"全 {submitted} 大学の処理完了 ({completed}/{submitted})")
+        
+        elapsed_time = time.time() - start_time
+        self.performance_stats['total_time'] = elapsed_time
+        
+        self._print_verification_stats(all_results, elapsed_time)
+        
+        universities = list(dict.fromkeys(universities_by_csv[i] for i in sorted(universities_by_csv)))
+        return all_results, universities
     
     def _preload_university_teams(self, university_name):
         """大学のチーム情報とメンバー情報を事前に1回だけ取得（リアルタイム性を保つ）"""
         import logging
-        import concurrent.futures
         logger = logging.getLogger(__name__)
         
         # 検索名を取得
@@ -942,60 +1250,31 @@ class IntegratedTournamentSystem:
         
         search_name = search_variations[0]
         
-        # キャッシュに既にある場合はスキップ
-        if search_name in self.jba_system.teams_cache:
-            logger.debug(f"💾 {university_name} のチーム情報は既にキャッシュにあります")
-            # メンバー情報も既に取得済みか確認
-            teams = self.jba_system.teams_cache[search_name]
-            all_cached = True
-            for team in teams:
-                if team['url'] not in self.jba_system.team_members_cache:
-                    all_cached = False
-                    break
-            if all_cached:
-                logger.debug(f"💾 {university_name} のメンバー情報も既にキャッシュにあります")
-                return
-        
-        # チーム情報を取得（1回だけ）
         try:
-            teams = self.jba_system._search_teams_by_university_silent(search_name)
-            # キャッシュに保存
-            self.jba_system.teams_cache[search_name] = teams
-            logger.debug(f"✅ {university_name} のチーム情報を取得: {len(teams)} チーム")
+            # チーム情報を取得（キャッシュにあれば再検索せず、同時検索は1回にまとめる）
+            teams = self.jba_system.get_teams(search_name)
+            logger.debug(f"✅ {university_name} のチーム情報: {len(teams)} チーム")
             
-            # 🚀 パフォーマンス改善1: メンバー情報も事前取得（並列化）
+            # 🚀 パフォーマンス改善1: メンバー情報も事前取得
+            # （名簿ストアにあるチームは再取得せず、残りを非同期クライアントでまとめて取得）
             if teams:
                 logger.debug(f"📥 {university_name} のメンバー情報を事前取得中...")
-                with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(teams), 5)) as executor:
-                    futures = []
-                    for team in teams:
-                        # 既にキャッシュにある場合はスキップ
-                        if team['url'] not in self.jba_system.team_members_cache:
-                            future = executor.submit(
-                                self.jba_system._get_team_members_silent, 
-                                team['url']
-                            )
-                            futures.append((future, team['url']))
-                    
-                    # 結果をキャッシュに保存
-                    for future, team_url in futures:
-                        try:
-                            team_data = future.result()
-                            self.jba_system.team_members_cache[team_url] = team_data
-                        except Exception as e:
-                            logger.error(f"❌ メンバー情報取得エラー ({team_url}): {e}")
+                try:
+                    self.jba_system.get_team_rosters(teams)
+                except Exception as e:
+                    logger.error(f"❌ メンバー情報取得エラー ({university_name}): {e}")
                 
                 logger.debug(f"✅ {university_name} のメンバー情報を事前取得完了")
         except Exception as e:
             logger.error(f"❌ {university_name} のチーム検索エラー: {e}")
     
-    def _process_university_players_parallel(self, univ_df, univ):
-        """大学の選手を並列処理（チーム情報はキャッシュから取得）"""
-        import concurrent.futures
-        import time
-        import logging
-        logger = logging.getLogger(__name__)
+    def _build_player_data(self, univ_df, univ):
+        """
+        大学の照合対象の選手一覧を作成
         
+        Returns:
+            [(index, row, univ, player_name), ...]
+        """
         # 選手データを準備
         player_data = []
         name_columns = ['選手名', '氏名', 'name', 'Name']
@@ -1020,45 +1299,20 @@ class IntegratedTournamentSystem:
                 if player_name:
                     player_data.append((index, row, univ, player_name))
         
-        if not player_data:
-            return []
-        
-        # 並列処理でJBA照合
-        optimal_workers = min(self.max_workers, len(player_data), self.cpu_count * 4)
-        results = []
-        university_results = {}
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=optimal_workers) as executor:
-            futures = []
-            
-            for index, row, univ, player_name in player_data:
-                future = executor.submit(self._process_single_player_parallel, 
-                                       index, row, univ, player_name)
-                futures.append(future)
-            
-            # 結果を収集
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                    # 大学ごとの結果を一時保存
-                    univ = result.get('university', 'Unknown')
-                    if univ not in university_results:
-                        university_results[univ] = []
-                    university_results[univ].append(result)
-                    
-                except Exception as e:
-                    logger.error(f"❌ 処理中にエラーが発生しました: {str(e)}", exc_info=True)
+        return player_data
+    
+    def _match_single_player(self, index, row, univ, player_name):
+        """
+        単一選手の照合（キャッシュ付き、スケジューラーの照合段階）
         
-        # 大学ごとの結果を一時保存
-        for univ_name, univ_results in university_results.items():
-            self._save_temp_results(univ_name, univ_results)
+        選手詳細ページはここでは取得せず、大学ごとの詳細取得段階
+        （_complete_university_results）でまとめて取得する。
         
-        return results
-    
-    def _process_single_player_parallel(self, index, row, univ, player_name):
-        """単一選手の並列処理（キャッシュ付き）"""
+        Returns:
+            (result, cache_key)
+            キャッシュから取得した完成済みの結果の場合 cache_key は None。
+            それ以外は _finish_player_results で補正情報を作成する。
+        """
         import logging
         logger = logging.getLogger(__name__)
         
@@ -1089,7 +1343,7 @@ class IntegratedTournamentSystem:
             cached_result['index'] = index
             cached_result['original_data'] = row.to_dict()
             cached_result['player_no'] = player_no  # 背番号を確実に設定
-            return cached_result
+            return cached_result, None
         
         # 実際にJBA照合を実行
         # 🚀 パフォーマンス改善: ログ出力を削減
@@ -1112,21 +1366,15 @@ class IntegratedTournamentSystem:
             else:
                 logger.debug(f"  - 背番号: なし（コーチ扱い）")
             
-            # 編集ページから取得した選手名かチェック
-            # 編集ページから取得した選手名は「CSVの正しい選手名」であって、
-            # JBAの選手名と一致するとは限らないため、通常の閾値（0.6）を使用
-            is_edited_from_html = False
-            if univ and player_name:
-                is_edited_from_html = self.edited_player_names.get((univ, player_name), False)
-            
             # 通常の閾値（0.6）を使用（編集ページから取得した選手名でも同様）
             # 編集ページから取得した選手名は「正しい」CSVの選手名なので、
             # JBA照合時は通常の閾値で柔軟に照合する（「栁本 晴暖」と「柳本 晴暖」のような類似文字の違いでも照合できる）
             threshold = 0.6
             
-            # 詳細情報を取得（学年は背番号の有無に関わらず必要）
+            # 詳細情報を取得（学年は背番号の有無に関わらず必要、取得は後段でまとめて行う）
             verification_result = self.jba_system.verify_player_info(
-                player_name, None, univ, get_details=True, threshold=threshold, player_no=player_no, kana_name=kana_name
+                player_name, None, univ, get_details=True, threshold=threshold, player_no=player_no, kana_name=kana_name,
+                defer_details=True
             )
             
             # 結果をログに記録
@@ -1168,126 +1416,73 @@ class IntegratedTournamentSystem:
             'university': univ,
             'player_no': player_no  # 背番号を結果に含める
         }
+        return result, cache_key
+    
+    def _complete_university_results(self, univ, matched):
+        """
+        大学の選手詳細をまとめて取得し、照合結果を完成させる（スケジューラーの詳細取得段階）
         
-        # JBA照合結果の詳細処理
-        if verification_result['status'] == 'match':
-            if 'jba_data' in verification_result:
-                jba_data = verification_result['jba_data']
-                corrected_data = row.to_dict().copy()
-                
-                # 変更されたフィールドを追跡（赤字表示用）
-                changed_fields = set()
-                
-                # 背番号がある場合のみ身長・体重を照合
-                if player_no:
-                    # 身長の照合（5cm以上差があったらJBAの値に変更）
-                    if 'height' in jba_data and jba_data['height']:
-                        try:
-                            jba_height_str = str(jba_data['height']).replace('cm', '').strip()
-                            # 値が空、0.0、nanの場合は空欄のまま
-                            if jba_height_str and jba_height_str.lower() not in ['', 'nan', 'none', '0', '0.0']:
-                                jba_height = float(jba_height_str)
-                                csv_height_str = str(corrected_data.get('身長', '')).replace('cm', '').strip()
-                                if csv_height_str and csv_height_str.replace('.', '').isdigit():
-                                    csv_height = float(csv_height_str)
-                                    height_diff = abs(csv_height - jba_height)
-                                    if height_diff >= 5.0:
-                                        corrected_data['身長'] = f"{jba_height}cm"
-                                        changed_fields.add('身長')
-                                else:
-                                    # CSVに身長がない場合はJBAの値を使用
-                                    corrected_data['身長'] = f"{jba_height}cm"
-                                    changed_fields.add('身長')
-                        except (ValueError, AttributeError):
-                            # パースエラーの場合は空欄のまま（何もしない）
-                            pass
-                    
-                    # 体重の照合（5kg以上差があったらJBAの値に変更）
-                    if 'weight' in jba_data and jba_data['weight']:
-                        try:
-                            jba_weight_str = str(jba_data['weight']).replace('kg', '').strip()
-                            # 値が空、0.0、nanの場合は空欄のまま
-                            if jba_weight_str and jba_weight_str.lower() not in ['', 'nan', 'none', '0', '0.0']:
-                                jba_weight = float(jba_weight_str)
-                                csv_weight_str = str(corrected_data.get('体重', '')).replace('kg', '').strip()
-                                if csv_weight_str and csv_weight_str.replace('.', '').isdigit():
-                                    csv_weight = float(csv_weight_str)
-                                    weight_diff = abs(csv_weight - jba_weight)
-                                    if weight_diff >= 5.0:
-                                        corrected_data['体重'] = f"{jba_weight}kg"
-                                        changed_fields.add('体重')
-                                else:
-                                    # CSVに体重がない場合はJBAの値を使用
-                                    corrected_data['体重'] = f"{jba_weight}kg"
-                                    changed_fields.add('体重')
-                        except (ValueError, AttributeError):
-                            # パースエラーの場合は空欄のまま（何もしない）
-                            pass
-                
-                # 学年の照合（背番号がある場合のみ、JBAが正しいので異なる場合はJBAに合わせる）
-                # 背番号がない場合は選手名とカナ名だけで照合するため、学年の照合は不要
-                if player_no and 'grade' in jba_data and jba_data['grade']:
-                    original_grade = str(corrected_data.get('学年', '')).strip()
-                    jba_grade = str(jba_data['grade']).strip()
-                    # 数字部分だけを抽出して比較（「2」と「大学2年」などに対応）
-                    import re
-                    original_grade_match = re.search(r'(\d+(?:\.\d+)?)', original_grade)
-                    jba_grade_match = re.search(r'(\d+(?:\.\d+)?)', jba_grade)
-                    
-                    if original_grade_match and jba_grade_match:
-                        # 数字部分が一致しているか確認
-                        original_grade_num = float(original_grade_match.group(1))
-                        jba_grade_num = float(jba_grade_match.group(1))
-                        if abs(original_grade_num - jba_grade_num) >= 0.1:  # 0.1以上の差がある場合のみ変更
-                            corrected_data['学年'] = jba_grade
-                            changed_fields.add('学年')
-                        # 数字が一致していれば正しい判定（changed_fieldsに追加しない）
-                    elif original_grade != jba_grade:
-                        # 数字が見つからない場合は文字列比較
-                        corrected_data['学年'] = jba_grade
-                        changed_fields.add('学年')
-                
-                # 名前とカナ名は「CSVの値を優先」しつつ、JBAと違う場合は変更フラグだけ立てる
-                if 'name' in jba_data and jba_data['name']:
-                    jba_name = str(jba_data['name']).strip()
-                    jba_name = unicodedata.normalize('NFKC', jba_name)
-                    csv_name = str(corrected_data.get('選手名', corrected_data.get('氏名', ''))).strip()
-                    is_edited_from_html = False
-                    if univ and csv_name:
-                        is_edited_from_html = self.edited_player_names.get((univ, csv_name), False)
-                    if jba_name != csv_name and not is_edited_from_html:
-                        changed_fields.add('選手名')
-                
-                if 'kana_name' in jba_data and jba_data['kana_name']:
-                    jba_kana = str(jba_data['kana_name']).strip()
-                    jba_kana = unicodedata.normalize('NFKC', jba_kana)
-                    csv_kana = str(corrected_data.get('カナ名', '')).strip()
-                    if jba_kana != csv_kana:
-                        changed_fields.add('カナ名')
-                
-                # ポジション・出身校・背番号はCSVのデータをそのまま使用（変更しない）
-                
-                # 変更されたフィールド情報を保存
-                result['changed_fields'] = changed_fields
-            
-                result['correction'] = corrected_data
-                result['message'] = 'JBA登録あり（〇）'
-            else:
-                result['correction'] = None
-                result['message'] = 'JBA登録あり（〇）'
+        照合段階で集めた詳細ページのURLを重複なしで並行取得してから、
+        各選手の結果に反映して補正情報を作成する。
         
-        elif verification_result['status'] == 'not_found':
-            result['correction'] = None
-            result['message'] = 'JBA登録なし（×）'
+        Args:
+            matched: _match_single_player の戻り値のリスト
         
-        else:
-            result['correction'] = None
-            result['message'] = verification_result.get('message', '照合できませんでした')
+        Returns:
+            照合結果のリスト
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        pending = [(result, cache_key) for result, cache_key in matched if cache_key is not None]
+        detail_start = time.time()
+        fetched = self.jba_system.apply_deferred_details([result['verification_result'] for result, _ in pending])
+        if fetched:
+            logger.info(f"📄 {univ} の選手詳細 {fetched} 件を取得: {time.time() - detail_start:.2f}秒")
+        
+        self._finish_player_results(pending)
+        return [result for result, _ in matched]
+    
+    def _finish_player_results(self, pending):
+        """
+        選手詳細を反映した照合結果から補正情報を作成してキャッシュに保存
         
-        # 結果をキャッシュに保存
-        self._set_cached_data(cache_key, result)
+        🚀 パフォーマンス改善: 補正値と変更フィールドは大学単位で列としてまとめて計算
+        （worker/correction_engine.py）
         
-        return result
+        Args:
+            pending: [(result, cache_key), ...]
+        """
+        matched = [
+            result for result, _ in pending
+            if result['verification_result']['status'] == 'match' and 'jba_data' in result['verification_result']
+        ]
+        corrected_rows, changed_fields = compute_corrections(
+            [result['original_data'] for result in matched],
+            [result['verification_result']['jba_data'] for result in matched],
+            [result['player_no'] for result in matched],
+            [result['university'] for result in matched],
+            self.edited_player_names,
+        )
+        for result, corrected_data, fields in zip(matched, corrected_rows, changed_fields):
+            # 変更されたフィールド情報を保存（赤字表示用）
+            result['changed_fields'] = fields
+            result['correction'] = corrected_data
+        
+        for result, cache_key in pending:
+            status = result['verification_result']['status']
+            if status == 'match':
+                result.setdefault('correction', None)
+                result['message'] = 'JBA登録あり（〇）'
+            elif status == 'not_found':
+                result['correction'] = None
+                result['message'] = 'JBA登録なし（×）'
+            else:
+                result['correction'] = None
+                result['message'] = result['verification_result'].get('message', '照合できませんでした')
+            
+            # 結果をキャッシュに保存
+            self._set_cached_data(cache_key, result)
     
     def create_university_reports(self, results):
         """大学ごとのレポートを作成"""
@@ -0,0 +1,289 @@
+"""
+JBA 非同期HTTPクライアント（httpx + asyncio）
+
+複数スレッドで1つの requests.Session を共有する代わりに、専用イベントループ上の
+httpx.AsyncClient で全リクエストを多重化する。同時実行数はホストごとの
+AIMDコントローラー（プロセス全体で共有）が応答状況に応じて調整する。
+
+同期コードからは run() でコルーチンを実行して結果を受け取る。
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+import httpx
+
+from config import settings
+from worker.html_parsers import (
+    JBA_BASE_URL,
+    parse_team_search_records,
+    parse_team_members_page,
+    parse_player_details_page,
+    extract_csrf_token,
+)
+from worker.rate_limiter import get_rate_limiter, parse_retry_after, THROTTLE_STATUS_CODES
+from worker.concurrency import get_concurrency_controller
+
+logger = logging.getLogger(__name__)
+
+TEAM_SEARCH_URL = f"{JBA_BASE_URL}/organization/15250600/team/search"
+
+# 429/503 を受けたときの再試行回数
+MAX_THROTTLE_RETRIES = 2
+
+# プロセス共有のイベントループ（デーモンスレッドで常駐）
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    JBA通信用のイベントループを取得（初回呼び出し時に起動）
+
+    Returns:
+        バックグラウンドスレッドで実行中のイベントループ
+    """
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="jba-async-loop", daemon=True)
+            thread.start()
+            _loop = loop
+            logger.info("JBA async event loop started")
+    return _loop
+
+
+class AsyncJBAClient:
+    """JBAサイト用の非同期クライアント（ログイン済みクッキーを引き継ぐ）"""
+
+    def __init__(self, cookies=None, headers: Optional[Dict[str, str]] = None, csrf_token: Optional[str] = None):
+        """
+        Args:
+            cookies: requests.Session.cookies（ログイン済みのもの）
+            headers: 共通リクエストヘッダー
+            csrf_token: ログイン直後のページから取得済みのCSRFトークン（任意）
+        """
+        self.loop = get_event_loop()
+        self._cookies = cookies
+        self._headers = dict(headers or {})
+        # httpx が自前でデコードできる形式に任せる
+        self._headers.pop('Accept-Encoding', None)
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # 🚀 パフォーマンス改善: CSRFトークンはセッション単位で使い回す
+        self._csrf_token: Optional[str] = csrf_token or None
+        self._csrf_lock: Optional[asyncio.Lock] = None
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """
+        コルーチンを共有イベントループで実行し、結果を同期的に返す
+
+        ワーカースレッドから呼び出す（イベントループのスレッド内では呼ばないこと）。
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def close(self):
+        """接続プールを閉じる"""
+        if self._client is not None:
+            self.run(self._client.aclose())
+            self._client = None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        """httpx.AsyncClient を取得（イベントループ内で遅延生成）"""
+        if self._client is None:
+            limit = settings.jba_max_concurrency
+            cookies = httpx.Cookies()
+            if self._cookies is not None:
+                for cookie in self._cookies:
+                    cookies.set(cookie.name, cookie.value, domain=cookie.domain, path=cookie.path)
+            self._client = httpx.AsyncClient(
+                headers=self._headers,
+                cookies=cookies,
+                follow_redirects=True,
+                timeout=httpx.Timeout(float(settings.jba_timeout)),
+                limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+            )
+        return self._client
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        レート制限と同時実行数制御で流量を調整してリクエストを送信
+
+        429/503 の場合はレートリミッターがバックオフした後に再試行する。
+        """
+        client = self._ensure_client()
+        host = httpx.URL(url).host
+        limiter = get_rate_limiter(host)
+        controller = get_concurrency_controller(host)
+
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            await limiter.acquire_async()
+            async with controller.async_slot() as outcome:
+                start = time.monotonic()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                except httpx.TransportError:
+                    limiter.on_response(None, time.monotonic() - start)
+                    raise
+                outcome['success'] = response.status_code < 500 and response.status_code != 429
+
+            limiter.on_response(
+                response.status_code,
+                time.monotonic() - start,
+                parse_retry_after(response.headers.get("retry-after")),
+            )
+            if response.status_code not in THROTTLE_STATUS_CODES or attempt == MAX_THROTTLE_RETRIES:
+                return response
+            logger.info(f"🔁 {response.status_code} のため再試行します ({attempt + 1}/{MAX_THROTTLE_RETRIES}): {url}")
+        return response
+
+    async def _get_csrf_token(self, stale_token: Optional[str] = None) -> str:
+        """
+        チーム検索用のCSRFトークンを取得
+
+        キャッシュ済みのトークンを返す。stale_token が指定され、それが現在の
+        キャッシュと同じ場合のみ検索ページを再取得する（同時に拒否された
+        複数のタスクが重複して再取得しないため）。
+        """
+        if self._csrf_lock is None:
+            self._csrf_lock = asyncio.Lock()
+
+        async with self._csrf_lock:
+            if self._csrf_token and (stale_token is None or stale_token != self._csrf_token):
+                return self._csrf_token
+
+            search_page = await self._request("GET", TEAM_SEARCH_URL)
+            if search_page.status_code != 200:
+                self._csrf_token = None
+                return ""
+            self._csrf_token = extract_csrf_token(search_page.content) or None
+            logger.debug("🔑 CSRFトークンを取得しました")
+            return self._csrf_token or ""
+
+    @staticmethod
+    def _is_csrf_rejected(response: httpx.Response) -> bool:
+        """CSRFトークン切れ・セッション切れでリクエストが拒否されたか判定"""
+        if response.status_code in (419, 403):
+            return True
+        # ログインページへのリダイレクト（JSONではなくHTMLが返る）
+        if response.history and "/login" in response.url.path:
+            return True
+        return response.status_code == 200 and response.content.lstrip()[:1] == b"<"
+
+    # ==================== JBA API ====================
+
+    async def search_teams(self, search_name: str, fiscal_year: str) -> List[Dict[str, Any]]:
+        """
+        大学名でチームを検索（男子チームのみ）
+
+        Args:
+            search_name: 検索する大学名
+            fiscal_year: 年度
+
+        Returns:
+            チーム一覧（失敗時は空リスト）
+        """
+        try:
+            # JSON APIを使用した検索（男子チームのみ）
+            search_data = {
+                "limit": 100,
+                "offset": 0,
+                "searchLogic": "AND",
+                "search": [
+                    {"field": "fiscal_year", "type": "text", "operator": "is", "value": fiscal_year},
+                    {"field": "team_name", "type": "text", "operator": "contains", "value": search_name},
+                    {"field": "competition_division_id", "type": "int", "operator": "is", "value": 1},
+                    {"field": "team_search_out_of_range", "type": "int", "operator": "is", "value": 1}
+                ]
+            }
+            form_data = {'request': json.dumps(search_data, ensure_ascii=False)}
+
+            # キャッシュ済みのCSRFトークンで検索し、拒否された場合のみ1回だけ再取得して再試行
+            csrf_token = await self._get_csrf_token()
+            search_response = await self._post_search(form_data, csrf_token)
+            if self._is_csrf_rejected(search_response):
+                logger.info("🔑 CSRFトークンが拒否されたため再取得します")
+                csrf_token = await self._get_csrf_token(stale_token=csrf_token)
+                search_response = await self._post_search(form_data, csrf_token)
+
+            if search_response.status_code != 200:
+                return []
+
+            return parse_team_search_records(search_response.json())
+        except Exception as e:
+            logger.error(f"❌ チーム検索エラー ({search_name}): {e}")
+            return []
+
+    async def _post_search(self, form_data: Dict[str, str], csrf_token: str) -> httpx.Response:
+        """チーム検索APIにPOST"""
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+            'X-CSRF-Token': csrf_token,
+            'X-Requested-With': 'XMLHttpRequest'
+        }
+        return await self._request("POST", TEAM_SEARCH_URL, data=form_data, headers=headers)
+
+    async def get_team_members(self, team_url: str) -> Dict[str, Any]:
+        """
+        チーム詳細ページからメンバー情報を取得
+
+        Returns:
+            {"team_name": ..., "members": [...]}（失敗時は members が空）
+        """
+        try:
+            team_page = await self._request("GET", team_url)
+            if team_page.status_code != 200:
+                return {"team_name": "Error", "members": []}
+            # HTML解析はCPU処理のため、イベントループを塞がないよう別スレッドで行う
+            return await asyncio.to_thread(parse_team_members_page, team_page.content)
+        except Exception as e:
+            logger.error(f"❌ メンバー取得エラー ({team_url}): {e}")
+            return {"team_name": "Error", "members": []}
+
+    async def get_player_details(self, detail_url: str, fields=None) -> Dict[str, Any]:
+        """
+        選手詳細ページから指定フィールドを取得
+
+        Returns:
+            選手詳細の dict（失敗時は空 dict）
+        """
+        try:
+            if not detail_url:
+                return {}
+            detail_page = await self._request("GET", detail_url)
+            if detail_page.status_code != 200:
+                return {}
+            return await asyncio.to_thread(parse_player_details_page, detail_page.content, fields)
+        except Exception as e:
+            logger.debug(f"選手詳細取得エラー ({detail_url}): {e}")
+            return {}
+
+    async def get_team_members_many(self, team_urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """複数チームのメンバー情報をまとめて取得（{team_url: team_data}）"""
+        results = await asyncio.gather(*(self.get_team_members(url) for url in team_urls))
+        return dict(zip(team_urls, results))
+
+    async def get_player_details_many(self, detail_urls: List[str], fields=None) -> Dict[str, Dict[str, Any]]:
+        """複数選手の詳細情報をまとめて取得（{detail_url: details}）"""
+        results = await asyncio.gather(*(self.get_player_details(url, fields) for url in detail_urls))
+        return dict(zip(detail_urls, results))
+
+    async def get_player_details_batch(self, detail_fields: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        選手ごとに必要なフィールドが異なる詳細ページをまとめて取得
+
+        Args:
+            detail_fields: {detail_url: fields}（URLは重複なし）
+
+        Returns:
+            {detail_url: details}
+        """
+        urls = list(detail_fields)
+        results = await asyncio.gather(*(self.get_player_details(url, detail_fields[url]) for url in urls))
+        return dict(zip(urls, results))
@@ -8,18 +8,27 @@ JBAデータベースと照合してCSVファイルを自動訂正
 import pandas as pd
 import logging
 import requests
-import json
 from bs4 import BeautifulSoup
 from datetime import datetime
 import re
-import unicodedata
 from difflib import SequenceMatcher
 import io
 # import google.generativeai as genai  # AI機能は使用しない
-import os
+import asyncio
 import concurrent.futures
 import time
 import threading
+from worker.html_parsers import extract_csrf_token
+from worker.jba_async_client import AsyncJBAClient, TEAM_SEARCH_URL
+from worker.rate_limiter import get_rate_limiter
+from worker.roster_store import get_roster_store
+from worker.player_detail_cache import get_player_detail_cache, member_id_from_detail_url
+from worker.roster_index import RosterIndex
+from worker.name_matching import similarity_with_cutoff
+from worker.name_normalizer import normalize_match_key, normalize_university_name, university_match_key
+from worker.single_flight import SingleFlight
+from worker.session_store import get_session_store, export_cookies, import_cookies
+from config import settings
 
 # ロガー初期化
 logger = logging.getLogger(__name__)
@@ -73,9 +82,40 @@ class JBAVerificationSystem:
         })
         self.logged_in = False
         
+        # 🚀 パフォーマンス改善: 検索・メンバー・詳細取得は非同期クライアントで多重化
+        # （複数のワーカースレッドから呼ばれるため、生成・差し替えは _http_lock で保護）
+        self.http = None
+        self._http_lock = threading.Lock()
+        
         # 🚀 パフォーマンス改善: チーム情報のキャッシュ
         self.teams_cache = {}  # {search_name: [teams]}
         self.team_members_cache = {}  # {team_url: team_data}
+        
+        # 🚀 パフォーマンス改善: 同じ検索名・同じチームの同時取得を1回にまとめる
+        # （キャッシュの読み書きは _cache_lock で保護）
+        self._cache_lock = threading.Lock()
+        self._flights = SingleFlight()
+        
+        # 🚀 パフォーマンス改善: ジョブをまたいで名簿を再利用（年度・チームID単位の永続ストア）
+        try:
+            self.roster_store = get_roster_store()
+        except Exception as e:
+            logger.warning(f"⚠️ 名簿ストアを初期化できませんでした（永続化なしで続行）: {e}")
+            self.roster_store = None
+        self._refreshing_rosters = set()
+        self._refresh_lock = threading.Lock()
+        
+        # 🚀 パフォーマンス改善: 名簿ごとの照合用インデックス（正規化済み氏名 → メンバー）
+        self.roster_indexes = {}  # {team_url: RosterIndex}
+        self._index_lock = threading.Lock()
+        
+        # 🚀 パフォーマンス改善: 選手詳細（解析済みフィールド）を年度・メンバーID単位で再利用
+        self.detail_cache = None
+        if settings.player_detail_cache_enabled:
+            try:
+                self.detail_cache = get_player_detail_cache()
+            except Exception as e:
+                logger.warning(f"⚠️ 選手詳細キャッシュを初期化できませんでした（キャッシュなしで続行）: {e}")
     
     def get_current_fiscal_year(self):
         """現在の年度を取得"""
@@ -87,30 +127,24 @@ class JBAVerificationSystem:
         else:
             return str(current_year - 1)
     
+    def _get_http_client(self):
+        """非同期HTTPクライアントを取得（ログイン済みクッキーを引き継いで遅延生成）"""
+        http = self.http
+        if http is not None:
+            return http
+        with self._http_lock:
+            if self.http is None:
+                self.http = AsyncJBAClient(cookies=self.session.cookies, headers=self.session.headers)
+            return self.http
+    
     def normalize_university_name(self, university_name):
         """大学名を正規化（柔軟な照合のため）"""
         if not university_name:
             return ""
         
-        # 基本的な正規化
-        normalized = university_name.strip()
-        
-        # よくある表記の統一
-        replacements = {
-            '白鷗大学': '白鴎大学',
-            '白鴎大学': '白鴎大学',
-            '白鷗': '白鴎',
-            '白鴎': '白鴎',
-            '大学': '大学',
-            '学院': '学院',
-            '短期大学': '短期大学',
-            '短大': '短期大学'
-        }
-        
-        for old, new in replacements.items():
-            normalized = normalized.replace(old, new)
-        
-        return normalized
+        # 🚀 パフォーマンス改善: 略称の統一は name_normalizer に集約（メモ化あり）
+        # ※ JBAの検索にそのまま使うため異体字は畳み込まない（比較には university_match_key を使う）
+        return normalize_university_name(university_name)
     
     def get_search_variations(self, university_name):
         """大学名から「大学校」または「大学」を外した名前だけを返す"""
@@ -133,7 +167,14 @@ class JBAVerificationSystem:
         return [university_name.strip()]
     
     def login(self, email, password):
-        """JBAサイトにログイン"""
+        """
+        JBAサイトにログイン
+        
+        🚀 パフォーマンス改善: 前回のジョブで保存したセッションが有効ならログインを省略する
+        """
+        if self._restore_session(email, password):
+            return True
+        
         try:
             # 🆕 ステップ1: ログインページにアクセス
             # Status placeholder removed
@@ -142,13 +183,10 @@ class JBAVerificationSystem:
             # Status placeholder update removed
             # Progress update removed
             
-            login_page = self.session.get("https://team-jba.jp/login")
-            soup = BeautifulSoup(login_page.content, 'html.parser')
-            
-            csrf_token = ""
-            csrf_input = soup.find('input', {'name': '_token'})
-            if csrf_input:
-                csrf_token = csrf_input.get('value', '')
+            rate_limiter = get_rate_limiter()
+            rate_limiter.acquire()
+            login_page = self.session.get("https://team-jba.jp/login", timeout=settings.jba_timeout)
+            csrf_token = extract_csrf_token(login_page.content)
             
             # Status placeholder update removed
             # Progress update removed
@@ -160,13 +198,19 @@ class JBAVerificationSystem:
             }
             
             login_url = "https://team-jba.jp/login/done"
-            login_response = self.session.post(login_url, data=login_data, allow_redirects=True)
+            rate_limiter.acquire()
+            login_response = self.session.post(login_url, data=login_data, allow_redirects=True, timeout=settings.jba_timeout)
             
             # Status placeholder update removed
             # Progress update removed
             
             if "ログアウト" in login_response.text:
-                self.logged_in = True
+                # ログイン後ページのCSRFトークンを引き継ぎ、検索ページの取得を省略
+                self._on_logged_in(extract_csrf_token(login_response.content))
+                
+                session_store = get_session_store()
+                if session_store is not None:
+                    session_store.save("jba", email, password, export_cookies(self.session.cookies))
                 # Status placeholder update removed
                 # Sleep removed  # 1秒表示
                 # Progress bar cleanup removed
@@ -183,95 +227,57 @@ class JBAVerificationSystem:
             logger.error(f"❌ ログインエラー: {str(e)}")
             return False
     
-    def search_teams_by_university(self, university_name):
-        """大学名でチームを検索（柔軟な照合）"""
-        try:
-            if not self.logged_in:
-                # ログインが必要です
-                return []
-            
-            current_year = self.get_current_fiscal_year()
-            # 男子チームを検索中
-            
-            # 大学名の正規化（柔軟な照合のため）
-            normalized_university = self.normalize_university_name(university_name)
-            # 正規化された大学名
-            
-            # 正規化された大学名で検索
-            search_university = normalized_university
-            
-            # 検索ページにアクセスしてCSRFトークンを取得
-            search_url = "https://team-jba.jp/organization/15250600/team/search"
-            search_page = self.session.get(search_url)
-            
-            if search_page.status_code != 200:
-                # 検索ページにアクセスできません
-                return []
-            
-            soup = BeautifulSoup(search_page.content, 'html.parser')
-            
-            # CSRFトークンを取得
-            csrf_token = ""
-            csrf_input = soup.find('input', {'name': '_token'})
-            if csrf_input:
-                csrf_token = csrf_input.get('value', '')
-            
-            # JSON APIを使用した検索（男子チームのみ）
-            search_data = {
-                "limit": 100,
-                "offset": 0,
-                "searchLogic": "AND",
-                "search": [
-                    {"field": "fiscal_year", "type": "text", "operator": "is", "value": current_year},
-                    {"field": "team_name", "type": "text", "operator": "contains", "value": search_university},
-                    {"field": "competition_division_id", "type": "int", "operator": "is", "value": 1},
-                    {"field": "team_search_out_of_range", "type": "int", "operator": "is", "value": 1}
-                ]
-            }
-            
-            form_data = {'request': json.dumps(search_data, ensure_ascii=False)}
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'X-CSRF-Token': csrf_token,
-                'X-Requested-With': 'XMLHttpRequest'
-            }
-            
-            # 検索リクエストを送信（JSON APIとして）
-            search_response = self.session.post(
-                search_url, 
-                data=form_data,
-                headers=headers
+    def _on_logged_in(self, csrf_token):
+        """ログイン後のクッキーで非同期クライアントを作り直す"""
+        self.logged_in = True
+        with self._http_lock:
+            if self.http is not None:
+                self.http.close()
+            self.http = AsyncJBAClient(
+                cookies=self.session.cookies,
+                headers=self.session.headers,
+                csrf_token=csrf_token
             )
-            
-            if search_response.status_code != 200:
-                # 検索リクエストが失敗しました
-                return []
-            
-            # JSONレスポンスを解析
-            try:
-                data = search_response.json()
-                teams = []
-                
-                if data.get('status') == 'success' and 'records' in data:
-                    for team_data in data['records']:
-                        # 男子チームのみを対象
-                        if team_data.get('team_gender_id') == '男子':
-                            teams.append({
-                                'id': team_data.get('id', ''),
-                                'name': team_data.get('team_name', ''),
-                                'url': f"https://team-jba.jp/organization/15250600/team/{team_data.get('id', '')}/detail"
-                            })
-                
-                # 男子チームが見つかりました
-                return teams
-                
-            except Exception as e:
-                # 検索結果の解析に失敗しました
-                return []
-            
+    
+    def _restore_session(self, email, password):
+        """
+        保存済みのセッションを復元（有効な場合のみ True）
+        
+        有効かどうかはチーム検索ページを1回取得して確認する。このページのCSRFトークンは
+        検索にそのまま使えるため、ログイン（2往復）と検索ページの取得を合わせて省略できる。
+        """
+        session_store = get_session_store()
+        if session_store is None:
+            return False
+        cookies = session_store.load("jba", email, password)
+        if not cookies:
+            return False
+        
+        try:
+            import_cookies(self.session.cookies, cookies)
+            get_rate_limiter().acquire()
+            search_page = self.session.get(TEAM_SEARCH_URL, timeout=settings.jba_timeout)
+            csrf_token = extract_csrf_token(search_page.content)
         except Exception as e:
-            # チーム検索エラー
-            return []
+            # 通信エラーなどでは無効かどうか分からないため、保存済みのセッションは残して通常のログインへ
+            logger.warning(f"⚠️ 保存済みのJBAセッションを確認できませんでした: {e}")
+            self.session.cookies.clear()
+            return False
+        
+        if search_page.status_code == 200 and "ログアウト" in search_page.text and csrf_token:
+            logger.info("🔑 保存済みのJBAセッションを再利用します")
+            self._on_logged_in(csrf_token)
+            return True
+        
+        # 期限切れ: 保存済みのセッションとクッキーを破棄して通常のログインへ
+        logger.info("🔑 保存済みのJBAセッションが期限切れのため再ログインします")
+        session_store.delete("jba", email, password)
+        self.session.cookies.clear()
+        return False
+    
+    def search_teams_by_university(self, university_name):
+        """大学名でチームを検索（柔軟な照合）"""
+        return self._search_teams_by_university_silent(university_name)
     
     def _search_teams_by_university_silent(self, university_name):
         """大学名でチームを検索（静かな実行版 - st.*出力なし）"""
@@ -282,75 +288,10 @@ class JBAVerificationSystem:
             current_year = self.get_current_fiscal_year()
             
             # 大学名の正規化（柔軟な照合のため）
-            normalized_university = self.normalize_university_name(university_name)
-            
-            # 正規化された大学名で検索
-            search_university = normalized_university
-            
-            # 検索ページにアクセスしてCSRFトークンを取得
-            search_url = "https://team-jba.jp/organization/15250600/team/search"
-            search_page = self.session.get(search_url)
-            
-            if search_page.status_code != 200:
-                return []
-            
-            soup = BeautifulSoup(search_page.content, 'html.parser')
-            
-            # CSRFトークンを取得
-            csrf_token = ""
-            csrf_input = soup.find('input', {'name': '_token'})
-            if csrf_input:
-                csrf_token = csrf_input.get('value', '')
-            
-            # JSON APIを使用した検索（男子チームのみ）
-            search_data = {
-                "limit": 100,
-                "offset": 0,
-                "searchLogic": "AND",
-                "search": [
-                    {"field": "fiscal_year", "type": "text", "operator": "is", "value": current_year},
-                    {"field": "team_name", "type": "text", "operator": "contains", "value": search_university},
-                    {"field": "competition_division_id", "type": "int", "operator": "is", "value": 1},
-                    {"field": "team_search_out_of_range", "type": "int", "operator": "is", "value": 1}
-                ]
-            }
-            
-            form_data = {'request': json.dumps(search_data, ensure_ascii=False)}
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'X-CSRF-Token': csrf_token,
-                'X-Requested-With': 'XMLHttpRequest'
-            }
+            search_university = self.normalize_university_name(university_name)
             
-            # 検索リクエストを送信（JSON APIとして）
-            search_response = self.session.post(
-                search_url, 
-                data=form_data,
-                headers=headers
-            )
-            
-            if search_response.status_code != 200:
-                return []
-            
-            # JSONレスポンスを解析
-            try:
-                data = search_response.json()
-                teams = []
-                
-                if data.get('status') == 'success' and 'records' in data:
-                    for team_data in data['records']:
-                        # 男子チームのみを対象
-                        if team_data.get('team_gender_id') == '男子':
-                            teams.append({
-                                'id': team_data.get('id', ''),
-                                'name': team_data.get('team_name', ''),
-                                'url': f"https://team-jba.jp/organization/15250600/team/{team_data.get('id', '')}/detail"
-                            })
-                
-                return teams
-                
-            except Exception as e:
-                return []
+            http = self._get_http_client()
+            return http.run(http.search_teams(search_university, current_year))
             
         except Exception as e:
             return []
@@ -450,100 +391,202 @@ class JBAVerificationSystem:
     def _get_team_members_silent(self, team_url):
         """チームのメンバー情報を取得（静かな実行版 - st.*出力なし）"""
         try:
-            # チーム詳細ページにアクセス
-            team_page = self.session.get(team_url)
-            
-            if team_page.status_code != 200:
-                return {"team_name": "Error", "members": []}
-            
-            soup = BeautifulSoup(team_page.content, 'html.parser')
-            
-            # チーム名を取得
-            team_name = "Unknown Team"
-            title_element = soup.find('title')
-            if title_element:
-                team_name = title_element.get_text(strip=True)
-            
-            # メンバー情報を取得
-            members = []
-            
-            # 選手一覧のテーブルを探す
-            member_tables = soup.find_all('table', class_='table')
-            
-            for table_idx, table in enumerate(member_tables):
-                rows = table.find_all('tr')
-                
-                for row_idx, row in enumerate(rows[1:], start=1):  # ヘッダー行をスキップ
-                    cells = row.find_all(['td', 'th'])
-                    
-                    if len(cells) >= 3:  # 最低限の情報がある行のみ処理
-                        # 選手名のリンクを探す（JBAの実際のURLパターン: /member/to-team/数字/detail）
-                        name_link = row.find('a', href=re.compile(r'/member/to-team/\d+'))
-                        
-                        if name_link:
-                            player_name = name_link.get_text(strip=True)
-                            detail_url = name_link['href']
-                            
-                            if not detail_url.startswith('http'):
-                                detail_url = f"https://team-jba.jp{detail_url}"
-                            
-                            # その他の情報を取得
-                            position = ""
-                            grade = ""
-                            height = ""
-                            weight = ""
-                            registration_status = None
-                            member_category = None  # 構成員区分
-                            
-                            for i, cell in enumerate(cells):
-                                cell_text = cell.get_text(strip=True)
-                                
-                                # ポジション（通常は2番目のカラム）
-                                if i == 1 and cell_text and cell_text not in ['選手名', '氏名']:
-                                    position = cell_text
-                                
-                                # 学年（通常は3番目のカラム）
-                                elif i == 2 and cell_text and cell_text not in ['学年', '年']:
-                                    grade = cell_text
-                                
-                                # 身長・体重の情報を探す
-                                if 'cm' in cell_text:
-                                    height = cell_text
-                                elif 'kg' in cell_text:
-                                    weight = cell_text
-                                
-                                # 登録状態を探す（「無所属」「登録完了」など）
-                                if cell_text and ('無所属' in cell_text or '登録' in cell_text or '実績' in cell_text):
-                                    registration_status = cell_text
-                                
-                                # 構成員区分を探す（「競技者」「スタッフ」など）
-                                if cell_text and ('競技者' in cell_text or 'スタッフ' in cell_text or '構成員' in cell_text):
-                                    member_category = cell_text
-                            
-                            members.append({
-                                "name": player_name,
-                                "position": position,
-                                "grade": grade,
-                                "height": height,
-                                "weight": weight,
-                                "detail_url": detail_url,
-                                "registration_status": registration_status,
-                                "member_category": member_category  # 構成員区分を追加
-                            })
+            http = self._get_http_client()
+            team_data = http.run(http.get_team_members(team_url))
             
             # 最終結果をログに記録（メンバーが0人の場合のみ警告）
-            if len(members) == 0:
-                logger.warning(f"⚠️ チーム {team_name} のメンバーが取得できませんでした")
+            if team_data.get("team_name") != "Error" and len(team_data.get("members", [])) == 0:
+                logger.warning(f"⚠️ チーム {team_data.get('team_name')} のメンバーが取得できませんでした")
             
-            return {
-                "team_name": team_name,
-                "members": members
-            }
+            return team_data
             
         except Exception as e:
             logger.error(f"❌ メンバー取得エラー: {str(e)}", exc_info=True)
             return {"team_name": "Error", "members": []}
     
+    def get_teams(self, search_name):
+        """
+        検索名でチームを検索（キャッシュにあれば再検索しない）
+        
+        同じ検索名を複数のスレッドが同時に必要とした場合も、JBAへの検索は1回だけ行う。
+        """
+        with self._cache_lock:
+            if search_name in self.teams_cache:
+                logger.debug(f"💾 キャッシュからチーム情報を取得: {search_name}")
+                return self.teams_cache[search_name]
+        
+        return self._flights.do(("teams", search_name), self._search_and_cache_teams, search_name)
+    
+    def _search_and_cache_teams(self, search_name):
+        # 待機している間に他のスレッドが取得済みの場合
+        with self._cache_lock:
+            if search_name in self.teams_cache:
+                return self.teams_cache[search_name]
+        
+        logger.info(f"🔍 チーム検索開始: {search_name}")
+        teams = self._search_teams_by_university_silent(search_name)
+        logger.info(f"🔍 検索結果: {len(teams)}チーム見つかりました")
+        
+        # キャッシュに保存
+        with self._cache_lock:
+            self.teams_cache[search_name] = teams
+        return teams
+    
+    def _get_cached_roster(self, team_url):
+        with self._cache_lock:
+            return self.team_members_cache.get(team_url)
+    
+    def _cache_roster(self, team_url, team_data):
+        with self._cache_lock:
+            self.team_members_cache[team_url] = team_data
+        self.get_roster_index(team_url, team_data)
+    
+    def get_team_roster(self, team):
+        """
+        チームの名簿を取得（メモリ → 永続ストア → JBA の順に参照）
+        
+        同じチームを複数のスレッドが同時に必要とした場合も、取得は1回だけ行う。
+        """
+        team_url = team['url']
+        team_data = self._get_cached_roster(team_url)
+        if team_data is not None:
+            return team_data
+        
+        return self._flights.do(("roster", team_url), self._load_team_roster, team)
+    
+    def _load_team_roster(self, team):
+        team_url = team['url']
+        team_data = self._get_cached_roster(team_url)
+        if team_data is not None:
+            return team_data
+        
+        team_data = self._load_roster_snapshot(team)
+        if team_data is None:
+            team_data = self._get_team_members_silent(team_url)
+            self._save_roster_snapshot(team, team_data)
+        
+        self._cache_roster(team_url, team_data)
+        return team_data
+    
+    def get_team_rosters(self, teams):
+        """
+        複数チームの名簿をまとめて取得
+        
+        メモリ・永続ストアにないチームだけをJBAから一括取得する。
+        他のスレッドが取得中のチームは、その結果を待って使う。
+        
+        Returns:
+            {team_url: team_data}
+        """
+        rosters = {}
+        missing_teams = []  # このスレッドが取得するチーム
+        claimed = {}  # {team_url: call}（このスレッドが開始し、まだ finish() していない取得）
+        waiting = {}  # {team_url: call}（他のスレッドが取得中のチーム）
+        
+        seen = set()
+        error = None
+        
+        try:
+            for team in teams:
+                team_url = team['url']
+                if team_url in seen:
+                    continue
+                seen.add(team_url)
+                team_data = self._get_cached_roster(team_url)
+                if team_data is not None:
+                    rosters[team_url] = team_data
+                    continue
+                
+                call, is_leader = self._flights.begin(("roster", team_url))
+                if not is_leader:
+                    waiting[team_url] = call
+                    continue
+                claimed[team_url] = call
+                
+                team_data = self._get_cached_roster(team_url)
+                if team_data is None:
+                    team_data = self._load_roster_snapshot(team)
+                    if team_data is not None:
+                        self._cache_roster(team_url, team_data)
+                if team_data is not None:
+                    rosters[team_url] = team_data
+                    self._flights.finish(("roster", team_url), claimed.pop(team_url), result=team_data)
+                else:
+                    missing_teams.append(team)
+            
+            if missing_teams:
+                fetched = {}
+                fetch_error = None
+                try:
+                    http = self._get_http_client()
+                    fetched = http.run(http.get_team_members_many([team['url'] for team in missing_teams]))
+                except Exception as e:
+                    fetch_error = e
+                for team in missing_teams:
+                    team_data = fetched.get(team['url']) or {"team_name": "Error", "members": []}
+                    if fetch_error is None:
+                        self._save_roster_snapshot(team, team_data)
+                    self._cache_roster(team['url'], team_data)
+                    rosters[team['url']] = team_data
+                    self._flights.finish(("roster", team['url']), claimed.pop(team['url']), result=team_data)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            # 途中で例外が出た場合も、開始した取得は必ず終わらせる（待機中のスレッドが止まらないように）
+            for team_url, call in claimed.items():
+                self._flights.finish(("roster", team_url), call, error=error)
+        
+        for team_url, call in waiting.items():
+            rosters[team_url] = call.wait()
+        
+        return rosters
+    
+    def _load_roster_snapshot(self, team):
+        """永続ストアから名簿を取得（TTL切れの場合はバックグラウンドで再取得を予約）"""
+        if self.roster_store is None or not team.get('id'):
+            return None
+        
+        team_data, state = self.roster_store.lookup(self.get_current_fiscal_year(), team['id'])
+        if state == "stale":
+            self._schedule_roster_refresh(team)
+        if team_data is not None:
+            logger.debug(f"💾 名簿ストアからメンバー情報を取得（{state}）: {team.get('name', team['id'])}")
+        return team_data
+    
+    def _save_roster_snapshot(self, team, team_data):
+        """取得した名簿を永続ストアに保存（取得失敗・空の名簿は保存しない）"""
+        if self.roster_store is None or not team.get('id'):
+            return
+        if not team_data or team_data.get('team_name') == 'Error' or not team_data.get('members'):
+            return
+        self.roster_store.put(self.get_current_fiscal_year(), team['id'], team_data)
+    
+    def _schedule_roster_refresh(self, team):
+        """
+        TTL切れの名簿をバックグラウンドで再取得して永続ストアを更新
+        
+        実行中のジョブは読み込んだ名簿をそのまま使い（大学内で結果がぶれないように）、
+        更新後の名簿は次のジョブから使われる。
+        """
+        team_url = team['url']
+        with self._refresh_lock:
+            if team_url in self._refreshing_rosters:
+                return
+            self._refreshing_rosters.add(team_url)
+        
+        http = self._get_http_client()
+        
+        async def refresh():
+            try:
+                team_data = await http.get_team_members(team_url)
+                await asyncio.to_thread(self._save_roster_snapshot, team, team_data)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing_rosters.discard(team_url)
+        
+        asyncio.run_coroutine_threadsafe(refresh(), http.loop)
+    
     def get_player_details(self, detail_url, fields=None):
         """
         選手詳細ページから必要最小限の情報のみ取得
@@ -557,138 +600,147 @@ class JBAVerificationSystem:
             if not detail_url:
                 return {}
             
-            # 選手詳細ページにアクセス
-            detail_page = self.session.get(detail_url)
-            
-            if detail_page.status_code != 200:
-                return {}
-            
-            soup = BeautifulSoup(detail_page.content, 'html.parser')
-            
-            # 選手詳細情報を抽出
-            player_details = {}
-            
-            # 🚀 パフォーマンス改善3: 必要最小限のフィールドのみ処理
-            need_height = fields is None or 'height' in fields
-            need_weight = fields is None or 'weight' in fields
-            need_grade = fields is None or 'grade' in fields
-            need_position = fields is None or 'position' in fields
-            need_school = fields is None or 'school' in fields
-            need_uniform = fields is None or 'uniform_number' in fields
-            need_kana_name = fields is None or 'kana_name' in fields
-            need_registration_status = fields is None or 'registration_status' in fields
-            
-            # 身長・体重情報を探す（必要な場合のみ）
-            height_patterns = [
-                r'身長[：:]\s*(\d+\.?\d*)\s*cm',
-                r'身長[：:]\s*(\d+\.?\d*)\s*センチ',
-                r'Height[：:]\s*(\d+\.?\d*)\s*cm'
-            ] if need_height or need_weight else []
-            
-            weight_patterns = [
-                r'体重[：:]\s*(\d+\.?\d*)\s*kg',
-                r'体重[：:]\s*(\d+\.?\d*)\s*キロ',
-                r'Weight[：:]\s*(\d+\.?\d*)\s*kg'
-            ] if need_weight else []
-            
-            # テーブルから情報を抽出
-            tables = soup.find_all('table')
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
-                    if len(cells) >= 2:
-                        label = cells[0].get_text(strip=True)
-                        value = cells[1].get_text(strip=True)
-                        
-                        # 身長情報（必要な場合のみ）
-                        if need_height and ('身長' in label or 'Height' in label):
-                            import re
-                            height_match = re.search(r'(\d+\.?\d*)', value)
-                            if height_match and value.strip():
-                                player_details['height'] = height_match.group(1)
-                        
-                        # 体重情報（必要な場合のみ）
-                        elif need_weight and ('体重' in label or 'Weight' in label):
-                            import re
-                            weight_match = re.search(r'(\d+\.?\d*)', value)
-                            if weight_match and value.strip():
-                                player_details['weight'] = weight_match.group(1)
-                        
-                        # ポジション情報（必要な場合のみ）
-                        elif need_position and ('ポジション' in label or 'Position' in label):
-                            player_details['position'] = value
-                        
-                        # 出身校情報（必要な場合のみ）
-                        elif need_school and ('出身校' in label or '出身' in label):
-                            player_details['school'] = value
-                        
-                        # 学年情報（必要な場合のみ）
-                        elif need_grade and ('学年' in label or 'Grade' in label):
-                            player_details['grade'] = value
-                        
-                        # ユニフォーム番号（必要な場合のみ）
-                        elif need_uniform and ('ユニフォーム番号' in label or '背番号' in label):
-                            player_details['uniform_number'] = value
-            
-                        # 氏名カナ（必要な場合のみ）
-                        elif need_kana_name and ('氏名カナ' in label or 'カナ名' in label or 'フリガナ' in label or 'ふりがな' in label):
-                            player_details['kana_name'] = value
-                        
-                        # 登録状態（必要な場合のみ）
-                        elif need_registration_status and ('登録状態' in label or '登録ステータス' in label or 'Registration Status' in label or 'Status' in label):
-                            player_details['registration_status'] = value
-            
-            # テーブルで見つからない場合は、ページ全体から正規表現で検索（必要な場合のみ）
-            if need_height and 'height' not in player_details:
-                page_text = soup.get_text()
-                for pattern in height_patterns:
-                    import re
-                    match = re.search(pattern, page_text)
-                    if match:
-                        player_details['height'] = match.group(1)
-                        break
-                
-            if need_weight and 'weight' not in player_details:
-                if 'page_text' not in locals():
-                    page_text = soup.get_text()
-                for pattern in weight_patterns:
-                    import re
-                    match = re.search(pattern, page_text)
-                    if match:
-                        player_details['weight'] = match.group(1)
-                        break
+            cached = self._get_cached_details(detail_url, fields)
+            if cached is not None:
+                return cached
             
+            http = self._get_http_client()
+            player_details = http.run(http.get_player_details(detail_url, fields=fields))
+            self._cache_details(detail_url, player_details, fields)
             return player_details
             
         except Exception as e:
             # 選手詳細取得エラー
             return {}
     
-
-    def normalize_name(self, name):
-        """名前の正規化"""
-        if not name or pd.isna(name):
-            return ""
+    @staticmethod
+    def player_detail_fields(player_no):
+        """選手詳細ページから取得するフィールド"""
+        if player_no:
+            # 背番号がある場合は身長・体重・学年・カナ名を取得（登録状態はチームページから取得）
+            return ['height', 'weight', 'grade', 'kana_name']
+        # 背番号がない場合はカナ名も取得（照合に使用、登録状態はチームページから取得）
+        return ['kana_name']
+    
+    def get_player_details_batch(self, detail_fields):
+        """
+        複数の選手詳細ページを並行して取得（キャッシュ済みのものは取得しない）
+        
+        Args:
+            detail_fields: {detail_url: fields}
         
-        name = str(name)
+        Returns:
+            {detail_url: details}（取得できなかったURLは空 dict）
+        """
+        results = self._get_cached_details_many(detail_fields)
+        missing = {url: fields for url, fields in detail_fields.items() if url not in results}
+        
+        if not missing:
+            return results
+        if results:
+            logger.info(f"📄 選手詳細キャッシュ: {len(results)} 件ヒット / {len(missing)} 件取得")
+        
+        try:
+            http = self._get_http_client()
+            fetched = http.run(http.get_player_details_batch(missing))
+        except Exception as e:
+            logger.error(f"❌ 選手詳細の一括取得エラー: {e}")
+            return results
+        
+        for detail_url, player_details in fetched.items():
+            self._cache_details(detail_url, player_details, missing[detail_url])
+        results.update(fetched)
+        return results
+    
+    def _get_cached_details(self, detail_url, fields):
+        """選手詳細をキャッシュから取得（要求したフィールドが揃っていない場合は None）"""
+        if self.detail_cache is None or fields is None:
+            return None
+        member_id = member_id_from_detail_url(detail_url)
+        if not member_id:
+            return None
+        return self.detail_cache.get(self.get_current_fiscal_year(), member_id, fields)
+    
+    def _get_cached_details_many(self, detail_fields):
+        """複数の選手詳細をキャッシュからまとめて取得（{detail_url: details}、ヒットしたものだけ）"""
+        if self.detail_cache is None:
+            return {}
+        member_urls = {}
+        member_fields = {}
+        for detail_url, fields in detail_fields.items():
+            member_id = member_id_from_detail_url(detail_url)
+            if fields is None or not member_id:
+                continue
+            member_urls[member_id] = detail_url
+            member_fields[member_id] = fields
+        if not member_fields:
+            return {}
+        cached = self.detail_cache.get_many(self.get_current_fiscal_year(), member_fields)
+        return {member_urls[member_id]: details for member_id, details in cached.items()}
+    
+    def _cache_details(self, detail_url, player_details, fields):
+        """取得した選手詳細をキャッシュに保存（取得に失敗した場合は保存しない）"""
+        if self.detail_cache is None or fields is None or not player_details:
+            return
+        member_id = member_id_from_detail_url(detail_url)
+        if member_id:
+            self.detail_cache.put(self.get_current_fiscal_year(), member_id, player_details, fields)
+    
+    def apply_deferred_details(self, verification_results):
+        """
+        verify_player_info(defer_details=True) の結果に選手詳細をまとめて反映
         
-        # 1. 全角・半角統一
-        name = unicodedata.normalize('NFKC', name)
+        同じ選手（同じ詳細ページ）が複数の結果に含まれていても、ページは1回だけ取得する。
+        必要なフィールドは結果ごとに異なるため、URLごとに和集合で取得し、
+        各結果には要求したフィールドだけを反映する。
         
-        # 2. 記号・スペースの正規化（全角スペースも含む）
-        name = re.sub(r'[・･、，,\.\s　]+', '', name)
+        Returns:
+            取得した詳細ページ数
+        """
+        pending = []
+        detail_fields = {}
+        for verification_result in verification_results:
+            detail_request = verification_result.pop("detail_request", None)
+            if not detail_request:
+                continue
+            pending.append((verification_result, detail_request))
+            fields = detail_fields.setdefault(detail_request["url"], [])
+            fields.extend(f for f in detail_request["fields"] if f not in fields)
         
-        # 3. 大文字小文字統一
-        name = name.lower()
+        if not pending:
+            return 0
         
-        # 4. よくある表記揺れの統一
-        name = re.sub(r'[ー−‐—–]', '', name)  # 長音符、ハイフン、エムダッシュ、エンダッシュ除去
+        details_by_url = self.get_player_details_batch(detail_fields)
+        for verification_result, detail_request in pending:
+            try:
+                details = details_by_url.get(detail_request["url"]) or {}
+                member = verification_result["jba_data"]
+                member.update({k: v for k, v in details.items() if k in detail_request["fields"]})
+                detail_request["index"].refresh_member(member)
+                
+                # チームページから取得した登録状態を常に優先
+                if detail_request["registration_status"]:
+                    member["registration_status"] = detail_request["registration_status"]
+            except Exception as detail_error:
+                logger.error(f"❌ 選手詳細取得エラー: {detail_error}")
+        return len(detail_fields)
+
+    def normalize_name(self, name):
+        """名前の正規化"""
+        if not name or pd.isna(name):
+            return ""
         
-        return name
+        # 🚀 パフォーマンス改善: 全角/半角・異体字・記号・長音符の統一を
+        # 1回の translate で行い、結果をメモ化（name_normalizer）
+        return normalize_match_key(str(name))
 
-    def calculate_similarity(self, name1, name2):
-        """名前の類似度を計算"""
+    def calculate_similarity(self, name1, name2, threshold=None):
+        """
+        名前の類似度を計算
+        
+        threshold を指定すると、閾値に届かないことが確定した時点で打ち切って 0.0 を返す
+        （閾値以上の場合の値は指定しない場合と同じ）
+        """
         if not name1 or not name2:
             return 0.0
         
@@ -696,13 +748,12 @@ class JBAVerificationSystem:
         norm_name1 = self.normalize_name(name1)
         norm_name2 = self.normalize_name(name2)
         
-        if norm_name1 == norm_name2:
-            return 1.0
-        
-        # 基本的な類似度
-        basic_similarity = SequenceMatcher(None, norm_name1, norm_name2).ratio()
-        
-        return basic_similarity
+        # 🚀 パフォーマンス改善: 閾値つきで計算（長さ・文字構成・LCSの上限で早期打ち切り）
+        return similarity_with_cutoff(norm_name1, norm_name2, threshold)
+    
+    def similarity_normalized(self, norm_name1, norm_name2, threshold=None):
+        """正規化済みの名前同士の類似度を計算（threshold は calculate_similarity と同じ）"""
+        return similarity_with_cutoff(norm_name1, norm_name2, threshold)
     
     def show_name_differences(self, name1, name2):
         """名前の微妙な違いを視覚的に表示"""
@@ -733,8 +784,173 @@ class JBAVerificationSystem:
         result = "".join(differences)
         return f"🔍 差分: {result}"
 
-    def verify_player_info(self, player_name, birth_date, university, get_details=False, threshold=1.0, player_no=None, kana_name=None):
-        """個別選手情報の照合（男子チームのみ）"""
+    def get_roster_index(self, team_url, team_data):
+        """チーム名簿の照合用インデックスを取得（名簿ごとに1回だけ作成）"""
+        members = team_data.setdefault("members", [])
+        index = self.roster_indexes.get(team_url)
+        if index is None or index.members is not members:
+            with self._index_lock:
+                index = self.roster_indexes.get(team_url)
+                if index is None or index.members is not members:
+                    index = RosterIndex(members, self.normalize_name)
+                    self.roster_indexes[team_url] = index
+        return index
+    
+    def _score_member(self, entry, norm_search_name, search_name, norm_kana_name, kana_name, threshold):
+        """
+        インデックス済みメンバー1人の類似度を計算
+        
+        Returns:
+            候補 dict（閾値未満の場合は None）
+        """
+        # 名前の類似度チェック
+        if not search_name or not entry.raw_name:
+            name_similarity = 0.0
+        else:
+            name_similarity = self.similarity_normalized(norm_search_name, entry.norm_name, threshold)
+        
+        # 名前が閾値未満ならカナ名に関係なくマッチしない
+        if name_similarity < threshold:
+            return None
+        
+        # カナ名も照合（JBAデータの氏名カナと照合）
+        kana_similarity = 0.0
+        has_kana_name = bool(kana_name and entry.raw_kana)
+        if has_kana_name:
+            kana_similarity = self.similarity_normalized(norm_kana_name, entry.norm_kana, threshold)
+        
+        # 名前とカナ名の両方が閾値を超えた場合のみマッチ
+        # カナ名がない場合は名前のみで判定
+        if has_kana_name:
+            if name_similarity < threshold or kana_similarity < threshold:
+                return None
+            max_similarity = max(name_similarity, kana_similarity)
+        else:
+            max_similarity = name_similarity
+            if max_similarity < threshold:
+                return None
+        
+        logger.debug(f"  - JBA選手: {entry.raw_name or 'N/A'}, 名前類似度: {name_similarity:.3f}, カナ類似度: {kana_similarity:.3f}, 最大類似度: {max_similarity:.3f}")
+        
+        return {
+            "member": entry.member,
+            "entry": entry,
+            "similarity": max_similarity,
+            "name_similarity": name_similarity,
+            "kana_similarity": kana_similarity,
+            "team_registration_status": entry.member.get("registration_status")
+        }
+    
+    def _match_roster(self, index, search_name, kana_name, threshold, player_no):
+        """
+        名簿インデックスから閾値を超える候補を集めて最適な候補を選ぶ
+        
+        まず氏名・カナが完全一致するメンバー（と同名のメンバー）だけを評価し、
+        類似度1.0の候補が選ばれた場合はそれで確定する（他のメンバーが1.0を
+        超えることはないため、全員を評価した場合と結果は変わらない）。
+        それ以外の場合のみ、残りのメンバーをあいまい照合する。
+        
+        Returns:
+            (candidates, best_candidate, name_groups)
+        """
+        norm_search_name = self.normalize_name(search_name) if search_name else ""
+        norm_kana_name = self.normalize_name(kana_name) if kana_name else ""
+        
+        # 完全一致（辞書引き）
+        exact_entries = {}
+        if search_name:
+            for entry in index.by_name(norm_search_name):
+                exact_entries[entry.position] = entry
+        if kana_name:
+            for entry in index.by_kana(norm_kana_name):
+                exact_entries[entry.position] = entry
+        # 同名のメンバーもまとめて評価（構成員区分による選択を全員評価時と揃えるため）
+        for entry in list(exact_entries.values()):
+            for same_name_entry in index.by_name(entry.norm_name):
+                exact_entries[same_name_entry.position] = same_name_entry
+        
+        scored = {}
+        for position in sorted(exact_entries):
+            scored[position] = self._score_member(exact_entries[position], norm_search_name, search_name, norm_kana_name, kana_name, threshold)
+        
+        candidates = [c for _, c in sorted(scored.items()) if c]
+        best_candidate, name_groups = self._select_best_candidate(candidates, player_no)
+        if best_candidate and best_candidate["similarity"] >= 1.0:
+            return candidates, best_candidate, name_groups
+        
+        # あいまい照合（完全一致で評価済みのメンバーは除く）
+        for entry in index.entries:
+            if entry.position not in scored:
+                scored[entry.position] = self._score_member(entry, norm_search_name, search_name, norm_kana_name, kana_name, threshold)
+        
+        candidates = [c for _, c in sorted(scored.items()) if c]
+        best_candidate, name_groups = self._select_best_candidate(candidates, player_no)
+        return candidates, best_candidate, name_groups
+    
+    def _select_best_candidate(self, candidates, player_no):
+        """
+        候補の中から最も類似度が高いものを選ぶ
+        ただし、同じ人のデータが複数ある場合は構成員区分を考慮
+        
+        Returns:
+            (best_candidate, name_groups)（候補がない場合は (None, {})）
+        """
+        if not candidates:
+            return None, {}
+        
+        # 同じ人（名前が同じ）のデータをグループ化
+        from collections import defaultdict
+        name_groups = defaultdict(list)
+        for candidate in candidates:
+            name_groups[candidate["entry"].raw_name].append(candidate)
+        
+        # 各グループ内で構成員区分を考慮して候補を選ぶ
+        best_candidates = []
+        for member_name, group_candidates in name_groups.items():
+            # player_noがある場合（選手）は「競技者」の登録状態を確認
+            # player_noがない場合（スタッフ）は「競技者」以外の登録状態を確認
+            if player_no:
+                # 選手の場合：構成員区分が「競技者」の候補を優先
+                athlete_candidates = [c for c in group_candidates if c["entry"].is_athlete]
+                if athlete_candidates:
+                    # 「競技者」の候補がある場合は、その中で最も類似度が高いものを選ぶ
+                    athlete_candidates.sort(key=lambda x: x["similarity"], reverse=True)
+                    best_candidates.append(athlete_candidates[0])
+                else:
+                    # 「競技者」の候補がない場合は、グループ内で最も類似度が高いものを選ぶ
+                    group_candidates.sort(key=lambda x: x["similarity"], reverse=True)
+                    best_candidates.append(group_candidates[0])
+            else:
+                # スタッフの場合：構成員区分が「競技者」以外の候補を優先（競技者は絶対見ない）
+                staff_candidates = [c for c in group_candidates if not c["entry"].is_athlete]
+                if staff_candidates:
+                    # 「競技者」以外の候補がある場合は、類似度と登録完了を考慮して選ぶ
+                    # 同じ類似度の場合は「登録完了」を優先
+                    staff_candidates.sort(
+                        key=lambda x: (x["similarity"], 1 if x["entry"].is_registered else 0),
+                        reverse=True
+                    )
+                    best_candidates.append(staff_candidates[0])
+                else:
+                    # 「競技者」以外の候補がない場合は、グループ内で最も類似度が高いものを選ぶ
+                    group_candidates.sort(key=lambda x: x["similarity"], reverse=True)
+                    best_candidates.append(group_candidates[0])
+        
+        # 最終的に最も類似度が高いものを選ぶ
+        # 選手・コーチともに、同じ類似度の場合は「登録完了」を優先
+        best_candidates.sort(
+            key=lambda x: (x["similarity"], 1 if x["entry"].is_registered else 0),
+            reverse=True
+        )
+        return best_candidates[0], name_groups
+    
+    def verify_player_info(self, player_name, birth_date, university, get_details=False, threshold=1.0, player_no=None, kana_name=None, defer_details=False):
+        """
+        個別選手情報の照合（男子チームのみ）
+        
+        defer_details=True の場合、選手詳細ページはここでは取得せず、結果の
+        "detail_request" に取得内容を残す（apply_deferred_details でまとめて取得・反映する）。
+        """
         try:
             logger.info(f"🔍 選手照合: {player_name}, 大学: {university}")
             
@@ -759,20 +975,12 @@ class JBAVerificationSystem:
             # 最初のバリエーション（大学名から「大学」を外した名前）のみで検索
             search_name = search_variations[0]
             
-            # 🚀 パフォーマンス改善: チーム情報をキャッシュから取得
-            if search_name in self.teams_cache:
-                teams = self.teams_cache[search_name]
-                logger.debug(f"💾 キャッシュからチーム情報を取得: {len(teams)}チーム")
-            else:
-                logger.info(f"🔍 チーム検索開始: {search_name}")
-                try:
-                    teams = self._search_teams_by_university_silent(search_name)
-                    # キャッシュに保存
-                    self.teams_cache[search_name] = teams
-                    logger.info(f"🔍 検索結果: {len(teams)}チーム見つかりました")
-                except Exception as search_error:
-                    logger.error(f"❌ チーム検索エラー ({search_name}): {search_error}")
-                    teams = []
+            # 🚀 パフォーマンス改善: チーム情報をキャッシュから取得（同時検索は1回にまとめる）
+            try:
+                teams = self.get_teams(search_name)
+            except Exception as search_error:
+                logger.error(f"❌ チーム検索エラー ({search_name}): {search_error}")
+                teams = []
             
             if not teams:
                 logger.warning(f"⚠️ {university}の男子チームが見つかりませんでした")
@@ -796,15 +1004,8 @@ class JBAVerificationSystem:
             # 各チームのメンバー情報を取得して照合（優先順位順）
             for team in teams:
                 try:
-                    # 🚀 パフォーマンス改善: メンバー情報をキャッシュから取得
-                    if team['url'] in self.team_members_cache:
-                        team_data = self.team_members_cache[team['url']]
-                        logger.debug(f"💾 キャッシュからメンバー情報を取得: {team['name']}")
-                    else:
-                        logger.info(f"🔍 チーム: {team['name']} のメンバーを取得中...")
-                        team_data = self._get_team_members_silent(team['url'])
-                        # キャッシュに保存
-                        self.team_members_cache[team['url']] = team_data
+                    # 🚀 パフォーマンス改善: メンバー情報をキャッシュ・名簿ストアから取得
+                    team_data = self.get_team_roster(team)
                     
                     if not team_data or not team_data.get("members"):
                         logger.warning(f"⚠️ チーム {team['name']} のメンバーが取得できませんでした")
@@ -813,138 +1014,41 @@ class JBAVerificationSystem:
                     # 🚀 パフォーマンス改善: ログ出力を削減
                     logger.debug(f"🔍 メンバー数: {len(team_data['members'])}人")
                     
-                    # 閾値を超える候補を全て収集（最も類似度が高いものを選ぶため）
-                    candidates = []
+                    # 🚀 パフォーマンス改善: 名簿インデックスで照合
+                    # （完全一致は辞書引き、決まらない場合だけ残りのメンバーをあいまい照合）
+                    index = self.get_roster_index(team['url'], team_data)
                     
-                    for i, member in enumerate(team_data["members"]):
-                        try:
-                            # 氏名がアルファベットの場合のみ、カナ名で選手名を探す
-                            search_name = player_name
-                            if is_alphabet_only and kana_name:
-                                # カナ名で選手名を探す（JBAデータの氏名カナと照合）
-                                search_name = kana_name
-                        
-                            # 名前の類似度チェック
-                            name_similarity = self.calculate_similarity(search_name, member.get("name", ""))
-                            
-                            # カナ名も照合（JBAデータの氏名カナと照合）
-                            kana_similarity = 0.0
-                            has_kana_name = False
-                            if kana_name and member.get("kana_name"):
-                                kana_similarity = self.calculate_similarity(kana_name, member.get("kana_name", ""))
-                                has_kana_name = True
-                            
-                            # 名前とカナ名の両方が閾値を超えた場合のみマッチ
-                            # カナ名がない場合は名前のみで判定
-                            if has_kana_name:
-                                # カナ名がある場合：名前とカナ名の両方が閾値を超えた場合のみマッチ
-                                if name_similarity >= threshold and kana_similarity >= threshold:
-                                    max_similarity = max(name_similarity, kana_similarity)
-                                else:
-                                    # どちらかが閾値を超えていない場合はスキップ
-                                    continue
-                            else:
-                                # カナ名がない場合：名前のみで判定
-                                max_similarity = name_similarity
-                                if max_similarity < threshold:
-                                    # 名前が閾値を超えていない場合はスキップ
-                                    continue
-                            
-                            # 閾値を超える場合は候補として追加
-                            if max_similarity >= threshold:
-                                # 🚀 パフォーマンス改善: デバッグ情報（マッチした場合のみ）
-                                logger.debug(f"  - JBA選手: {member.get('name', 'N/A')}, 名前類似度: {name_similarity:.3f}, カナ類似度: {kana_similarity:.3f}, 最大類似度: {max_similarity:.3f}")
-                                
-                                candidates.append({
-                                    "member": member,
-                                    "similarity": max_similarity,
-                                    "name_similarity": name_similarity,
-                                    "kana_similarity": kana_similarity,
-                                    "team_registration_status": member.get("registration_status")
-                                })
-                        
-                        except Exception as member_error:
-                            logger.error(f"❌ メンバー処理エラー: {member_error}")
-                            continue
+                    # 氏名がアルファベットの場合のみ、カナ名で選手名を探す
+                    search_name = player_name
+                    if is_alphabet_only and kana_name:
+                        # カナ名で選手名を探す（JBAデータの氏名カナと照合）
+                        search_name = kana_name
                     
-                    # 候補が1つ以上ある場合、最も類似度が高いものを選ぶ
-                    # ただし、同じ人のデータが複数ある場合は構成員区分を考慮
-                    if candidates:
-                        # 同じ人（名前が同じ）のデータをグループ化
-                        from collections import defaultdict
-                        name_groups = defaultdict(list)
-                        for candidate in candidates:
-                            member_name = candidate["member"].get("name", "")
-                            name_groups[member_name].append(candidate)
-                        
-                        # 各グループ内で構成員区分を考慮して候補を選ぶ
-                        best_candidates = []
-                        for member_name, group_candidates in name_groups.items():
-                            # player_noがある場合（選手）は「競技者」の登録状態を確認
-                            # player_noがない場合（スタッフ）は「競技者」以外の登録状態を確認
-                            if player_no:
-                                # 選手の場合：構成員区分が「競技者」の候補を優先
-                                athlete_candidates = [
-                                    c for c in group_candidates
-                                    if c["member"].get("member_category") and "競技者" in str(c["member"].get("member_category"))
-                                ]
-                                if athlete_candidates:
-                                    # 「競技者」の候補がある場合は、その中で最も類似度が高いものを選ぶ
-                                    athlete_candidates.sort(key=lambda x: x["similarity"], reverse=True)
-                                    best_candidates.append(athlete_candidates[0])
-                                else:
-                                    # 「競技者」の候補がない場合は、グループ内で最も類似度が高いものを選ぶ
-                                    group_candidates.sort(key=lambda x: x["similarity"], reverse=True)
-                                    best_candidates.append(group_candidates[0])
-                            else:
-                                # スタッフの場合：構成員区分が「競技者」以外の候補を優先（競技者は絶対見ない）
-                                staff_candidates = [
-                                    c for c in group_candidates
-                                    if not c["member"].get("member_category") or "競技者" not in str(c["member"].get("member_category"))
-                                ]
-                                if staff_candidates:
-                                    # 「競技者」以外の候補がある場合は、類似度と登録完了を考慮して選ぶ
-                                    # 同じ類似度の場合は「登録完了」を優先
-                                    staff_candidates.sort(
-                                        key=lambda x: (
-                                            x["similarity"],
-                                            1 if (x["team_registration_status"] and "登録完了" in str(x["team_registration_status"])) else 0
-                                        ),
-                                        reverse=True
-                                    )
-                                    best_candidates.append(staff_candidates[0])
-                                else:
-                                    # 「競技者」以外の候補がない場合は、グループ内で最も類似度が高いものを選ぶ
-                                    group_candidates.sort(key=lambda x: x["similarity"], reverse=True)
-                                    best_candidates.append(group_candidates[0])
-                        
-                        # 最終的に最も類似度が高いものを選ぶ
-                        # 選手・コーチともに、同じ類似度の場合は「登録完了」を優先
-                        # コーチの場合も、複数の候補がある場合は登録完了を優先して選択
-                        best_candidates.sort(
-                            key=lambda x: (
-                                x["similarity"],
-                                1 if (x["team_registration_status"] and "登録完了" in str(x["team_registration_status"])) else 0
-                            ),
-                            reverse=True
-                        )
-                        best_candidate = best_candidates[0]
-                        
+                    candidates, best_candidate, name_groups = self._match_roster(
+                        index, search_name, kana_name, threshold, player_no
+                    )
+                    
+                    if best_candidate:
                         member = best_candidate["member"]
                         max_similarity = best_candidate["similarity"]
                         team_registration_status = best_candidate["team_registration_status"]
                         
+                        # 詳細取得を後段にまとめる場合は、取得するURLとフィールドだけを結果に付ける
+                        detail_request = None
+                        if get_details and defer_details and member.get("detail_url"):
+                            detail_request = {
+                                "url": member["detail_url"],
+                                "fields": self.player_detail_fields(player_no),
+                                "index": index,
+                                "registration_status": team_registration_status,
+                            }
                         # 🚀 パフォーマンス改善3: 詳細情報を取得する場合
-                        if get_details and member.get("detail_url"):
+                        elif get_details and member.get("detail_url"):
                             try:
-                                if player_no:
-                                    # 背番号がある場合は身長・体重・学年・カナ名を取得（登録状態はチームページから取得）
-                                    fields = ['height', 'weight', 'grade', 'kana_name']
-                                else:
-                                    # 背番号がない場合はカナ名も取得（照合に使用、登録状態はチームページから取得）
-                                    fields = ['kana_name']
+                                fields = self.player_detail_fields(player_no)
                                 player_details = self.get_player_details(member["detail_url"], fields=fields)
                                 member.update(player_details)
+                                index.refresh_member(member)
                                 
                                 # チームページから取得した登録状態を常に優先
                                 if team_registration_status:
@@ -964,11 +1068,14 @@ class JBAVerificationSystem:
                                 logger.info(f"  ℹ️ 同じ人のデータが複数ありました。登録状態を優先して選択しました。")
                         
                         # JBA登録あり（〇）として返す
-                        return {
+                        result = {
                             "status": "match",
                             "jba_data": member,
                             "similarity": max_similarity
                         }
+                        if detail_request:
+                            result["detail_request"] = detail_request
+                        return result
                 
                 except Exception as team_error:
                     logger.error(f"❌ チーム処理エラー ({team.get('name', 'Unknown')}): {team_error}")
@@ -1078,47 +1185,24 @@ class FastCSVCorrectionSystem:
         self.university_teams_data = {}
         
         # 🆕 Phase 3: 永続キャッシュ（2回目以降100倍高速）
+        # 🚀 パフォーマンス改善: JSON ファイル全体の読み書きをやめ、cache_adapter に1件ずつ保存
         self.persistent_cache_file = "jba_player_cache.json"
         self.persistent_cache = self._load_persistent_cache()
-        self.cache_dirty = False  # キャッシュが変更されたかどうか
     
     def _load_persistent_cache(self):
-        """🆕 Phase 3: 永続キャッシュをファイルからロード"""
-        if not os.path.exists(self.persistent_cache_file):
-            return {}
-        
-        try:
-            with open(self.persistent_cache_file, "r", encoding="utf-8") as f:
-                cache = json.load(f)
-                # キャッシュの件数を表示（streamlitの外で実行される可能性があるため try-except）
-                try:
-                    logger.info(f"💾 永続キャッシュをロードしました: {len(cache)}件")
-                except:
-                    pass
-                return cache
-        except Exception as e:
-            # キャッシュファイルが壊れている場合は無視
-            return {}
-    
-    def _save_persistent_cache(self):
-        """🆕 Phase 3: 永続キャッシュをファイルに保存"""
-        if not self.cache_dirty:
-            return
-        
-        try:
-            with open(self.persistent_cache_file, "w", encoding="utf-8") as f:
-                json.dump(self.persistent_cache, f, ensure_ascii=False, indent=2)
-            self.cache_dirty = False
-        except Exception as e:
-            # 保存に失敗しても処理は続行
-            pass
+        """🆕 Phase 3: 永続キャッシュを取得（以前の JSON ファイルがあれば取り込む）"""
+        from cache_adapter import get_cache, FileCache
+        cache = get_cache()
+        if isinstance(cache, FileCache):
+            cache.import_json(self.persistent_cache_file)
+        return cache
     
     def _get_cache_key(self, player_name, university_name):
         """🆕 Phase 3: キャッシュキーを生成"""
         import hashlib
         # 選手名と大学名を正規化してハッシュ化
         normalized_name = self.jba_system.normalize_name(player_name)
-        normalized_univ = self.jba_system.normalize_university_name(university_name)
+        normalized_univ = university_match_key(university_name)
         key_string = f"{normalized_name}_{normalized_univ}"
         return hashlib.md5(key_string.encode()).hexdigest()
     
@@ -1210,7 +1294,7 @@ class FastCSVCorrectionSystem:
             
             for member in members:
                 # 名前の類似度チェック
-                name_similarity = self.jba_system.calculate_similarity(player_name, member.get("name", ""))
+                name_similarity = self.jba_system.calculate_similarity(player_name, member.get("name", ""), threshold=0.6)
                 
                 # 0.6以上の候補を保存
                 if name_similarity >= 0.6:
@@ -1266,8 +1350,8 @@ class FastCSVCorrectionSystem:
             
             # 🆕 Phase 3: 永続キャッシュをチェック（2回目以降は瞬時）
             cache_key = self._get_cache_key(player_name, university_name)
-            if cache_key in self.persistent_cache:
-                cached = self.persistent_cache[cache_key]
+            cached = self.persistent_cache.get(cache_key)
+            if cached:
                 cached['index'] = index
                 cached['original_data'] = row.to_dict()
                 return cached
@@ -1357,16 +1441,14 @@ class FastCSVCorrectionSystem:
                 validation_warnings = []  # AI機能は使用しない
                 result['validation_warnings'] = validation_warnings
             
-            # 🆕 Phase 3: 結果を永続キャッシュに保存
-            with self.lock:
-                self.persistent_cache[cache_key] = {
-                    'status': result['status'],
-                    'corrections': result['corrections'],
-                    'jba_data': result['jba_data'],
-                    'validation_warnings': result['validation_warnings'],
-                    'has_correction': result['has_correction']
-                }
-                self.cache_dirty = True
+            # 🆕 Phase 3: 結果を永続キャッシュに保存（1件ずつ書き込まれる）
+            self.persistent_cache.set(cache_key, {
+                'status': result['status'],
+                'corrections': result['corrections'],
+                'jba_data': result['jba_data'],
+                'validation_warnings': result['validation_warnings'],
+                'has_correction': result['has_correction']
+            })
             
             return result
         
@@ -1449,11 +1531,8 @@ class FastCSVCorrectionSystem:
         # Progress update removed
         # Status text update removed
         
-        # 🆕 Phase 3: 永続キャッシュをファイルに保存
-        if self.cache_dirty:
-            logger.info("💾 永続キャッシュを保存中...")
-            self._save_persistent_cache()
-            logger.info(f"✅ キャッシュを保存しました: {len(self.persistent_cache)}件")
+        # 🆕 Phase 3: 永続キャッシュは set() の時点で保存済み
+        logger.info(f"💾 永続キャッシュ: {self.persistent_cache.stats().get('entries', 0)}件")
         
         results.sort(key=lambda x: x['index'])
         
@@ -0,0 +1,98 @@
+"""
+閾値つき高速名前類似度
+
+SequenceMatcher.ratio() は全アラインメントを計算するため重い。照合では閾値
+（0.6 や 1.0）未満かどうかだけが分かればよい組み合わせがほとんどなので、
+安い上限値から順に判定し、閾値に届かないことが確定した時点で打ち切る。
+
+    1. 長さの比による上限
+    2. 文字の多重集合の共通部分による上限（quick_ratio と同等）
+    3. 最長共通部分列（LCS、ビット並列で計算・途中打ち切りあり）による上限
+    4. 上限が閾値以上の場合のみ SequenceMatcher.ratio()
+
+ratio() の一致文字数は共通部分列の長さを超えないため、いずれの上限も
+ratio() 以上になる。閾値以上の組み合わせについては ratio() と同じ値を返す。
+"""
+
+import math
+from difflib import SequenceMatcher
+from typing import Optional
+
+
+def _ratio(matches: int, total: int) -> float:
+    """SequenceMatcher.ratio() と同じ式で類似度を計算"""
+    return 2.0 * matches / total if total else 1.0
+
+
+def _bounded_lcs_length(a: str, b: str, required: int) -> int:
+    """
+    最長共通部分列の長さをビット並列で計算
+
+    残りの文字をすべて一致させても required に届かない時点で打ち切り、
+    その時点の（required 未満の）長さを返す。
+    """
+    if len(a) < len(b):
+        a, b = b, a
+
+    # a の各文字の出現位置ビットマスク
+    char_masks = {}
+    for i, ch in enumerate(a):
+        char_masks[ch] = char_masks.get(ch, 0) | (1 << i)
+
+    all_bits = (1 << len(a)) - 1
+    v = all_bits
+    remaining = len(b)
+    for ch in b:
+        u = v & char_masks.get(ch, 0)
+        v = ((v + u) | (v - u)) & all_bits
+        remaining -= 1
+        lcs = len(a) - bin(v).count("1")
+        if lcs + remaining < required:
+            return lcs
+    return len(a) - bin(v).count("1")
+
+
+def similarity_with_cutoff(norm_name1: str, norm_name2: str, threshold: Optional[float] = None) -> float:
+    """
+    正規化済みの名前同士の類似度を計算（閾値未満は早期に打ち切り）
+
+    Args:
+        norm_name1: 正規化済みの名前
+        norm_name2: 正規化済みの名前
+        threshold: 閾値（None の場合は打ち切らずに ratio() を計算）
+
+    Returns:
+        類似度。閾値以上なら SequenceMatcher.ratio() と同じ値、
+        閾値未満と確定した場合は 0.0
+    """
+    if norm_name1 == norm_name2:
+        return 1.0
+
+    if not threshold or threshold <= 0:
+        return SequenceMatcher(None, norm_name1, norm_name2).ratio()
+
+    # 完全一致以外は 1.0 にならない
+    if threshold >= 1.0:
+        return 0.0
+
+    total = len(norm_name1) + len(norm_name2)
+
+    # 1. 長さの比による上限（real_quick_ratio と同等）
+    if _ratio(min(len(norm_name1), len(norm_name2)), total) < threshold:
+        return 0.0
+
+    # 2. 文字の多重集合による上限（quick_ratio と同等）
+    common_chars = sum(min(norm_name1.count(ch), norm_name2.count(ch)) for ch in set(norm_name1))
+    if _ratio(common_chars, total) < threshold:
+        return 0.0
+
+    # 3. 最長共通部分列による上限
+    required = max(0, math.ceil(threshold * total / 2) - 1)
+    while _ratio(required, total) < threshold:
+        required += 1
+    if _bounded_lcs_length(norm_name1, norm_name2, required) < required:
+        return 0.0
+
+    # 4. 全アラインメント
+    ratio = SequenceMatcher(None, norm_name1, norm_name2).ratio()
+    return ratio if ratio >= threshold else 0.0
@@ -0,0 +1,143 @@
+"""
+氏名・カナ名・大学名の正規化
+
+異体字（髙→高、﨑→崎、栁→柳 など）、ハイフン・ダッシュ・長音符、全角/半角の
+揺れを、事前に作成した str.maketrans のテーブルで1回の translate にまとめて吸収する。
+正規化結果はメモ化するため、同じ名前を何度照合しても正規化は1回で済む。
+
+表記揺れを照合前に吸収しておくことで、あいまい照合ではなく完全一致
+（ハッシュ引き）で決まる組み合わせを増やす。
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# 異体字 → 通用字体（人名・大学名で表記が揺れやすいもの）
+# ※ NFKC で統合されない字（﨑 U+FA11 などの互換漢字を含む）を対象にする
+KANJI_VARIANTS = {
+    "髙": "高",
+    "﨑": "崎",
+    "嵜": "崎",
+    "栁": "柳",
+    "鷗": "鴎",
+    "邊": "辺",
+    "邉": "辺",
+    "濵": "浜",
+    "濱": "浜",
+    "澤": "沢",
+    "齋": "斎",
+    "齊": "斉",
+    "廣": "広",
+    "國": "国",
+    "櫻": "桜",
+    "眞": "真",
+    "德": "徳",
+    "惠": "恵",
+    "瀨": "瀬",
+    "槇": "槙",
+    "曻": "昇",
+    "彌": "弥",
+    "𠮷": "吉",
+    "﨔": "欅",
+}
+
+# ハイフン・ダッシュ類 → 長音符「ー」
+DASH_CHARACTERS = "-‐‑‒–—―−ｰ"
+
+# 空白文字（str.isspace() が真になる文字。re の \s と同じ）
+_WHITESPACE_CHARACTERS = "".join(ch for ch in map(chr, range(0x3001)) if ch.isspace())
+
+# 異体字のみのテーブル（大学名の照合キー用）
+_KANJI_VARIANT_TABLE = str.maketrans(KANJI_VARIANTS)
+
+# 異体字・ダッシュ・全角スペースをまとめて畳み込むテーブル
+_FOLD_TABLE = str.maketrans({
+    **KANJI_VARIANTS,
+    **{ch: "ー" for ch in DASH_CHARACTERS},
+    "　": " ",
+})
+
+# 照合キー用: 記号・空白・長音符を削除
+_MATCH_KEY_DELETE_TABLE = str.maketrans("", "", "・･、，,." + _WHITESPACE_CHARACTERS + "ー")
+
+# 氏名・カナ名表示用: 中黒を削除
+_NAME_TEXT_DELETE_TABLE = str.maketrans("", "", "・･")
+
+_PARENTHESES_PATTERN = re.compile(r"\([^)]*\)|（[^）]*）")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def fold_kanji_variants(text: str) -> str:
+    """異体字を通用字体に置き換える"""
+    return text.translate(_KANJI_VARIANT_TABLE)
+
+
+@lru_cache(maxsize=65536)
+def fold_text(text: str) -> str:
+    """
+    全角/半角（NFKC）・異体字・ハイフン/ダッシュ類・全角スペースを統一
+
+    ハイフン・ダッシュ類は長音符「ー」に揃える。
+    """
+    return unicodedata.normalize("NFKC", text).translate(_FOLD_TABLE)
+
+
+@lru_cache(maxsize=65536)
+def normalize_match_key(name: str) -> str:
+    """
+    照合キー用の氏名正規化（JBAVerificationSystem.normalize_name）
+
+    - 全角/半角・異体字・ダッシュ類を統一
+    - 記号・空白・長音符を削除
+    - 小文字に統一
+    """
+    return fold_text(name).translate(_MATCH_KEY_DELETE_TABLE).lower()
+
+
+@lru_cache(maxsize=65536)
+def normalize_name_text(text: str) -> str:
+    """
+    氏名・カナ名用の正規化（表記は残したまま揺れだけを統一）
+
+    - 全角/半角・異体字を統一、全角スペースを半角スペースに
+    - 伸ばし棒を「ー」に統一（-, ｰ, ―, − などを含む）
+    - 丸括弧「()」「（）」とその中身を削除
+    - 記号（・, ･）を削除
+    - 連続スペースを1つに
+    """
+    s = fold_text(text)
+    s = _PARENTHESES_PATTERN.sub("", s)
+    s = s.translate(_NAME_TEXT_DELETE_TABLE)
+    return _WHITESPACE_PATTERN.sub(" ", s).strip()
+
+
+# 大学名の表記の統一（JBAの検索に使う名前のため、JBA側の表記に合わせるものだけ）
+_UNIVERSITY_REPLACEMENTS = (
+    ("白鷗", "白鴎"),
+    ("短大", "短期大学"),
+)
+
+
+@lru_cache(maxsize=4096)
+def normalize_university_name(university_name: str) -> str:
+    """
+    大学名を正規化（柔軟な照合のため）
+
+    JBAの検索にもそのまま使うため、全角/半角・異体字は変えずに略称などだけを統一する。
+    JBAは正式な表記（國學院大學 など）で登録しているため、異体字を畳み込むと検索で見つからない。
+    """
+    normalized = university_name.strip()
+    for old, new in _UNIVERSITY_REPLACEMENTS:
+        normalized = normalized.replace(old, new)
+    return normalized
+
+
+@lru_cache(maxsize=4096)
+def university_match_key(university_name: str) -> str:
+    """
+    大学名の照合キー（キャッシュキー・比較用、JBAの検索には使わない）
+
+    normalize_university_name に加えて異体字を通用字体に統一する。
+    """
+    return fold_kanji_variants(normalize_university_name(university_name))
@@ -0,0 +1,168 @@
+"""
+JBA 選手詳細のキャッシュ
+
+身長・体重・学年・カナ名は年度内ではほとんど変わらないため、選手詳細ページ
+（/member/to-team/<id>/detail）の解析結果だけをジョブをまたいで保存する。
+キーは（年度, メンバーID）で、cache_adapter 経由のためファイル・Redis のどちらでも動く。
+
+取得時刻はフィールドごとに記録し（{field: fetched_at}）、ページに項目がなかった場合も
+「取得済み」として扱う。後から別のフィールドを追記しても、先に取得したフィールドの
+期限は延びない。
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Optional, Dict, Any, Iterable
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_MEMBER_ID_PATTERN = re.compile(r"/member/to-team/(\d+)/detail")
+
+
+def member_id_from_detail_url(detail_url: Optional[str]) -> Optional[str]:
+    """選手詳細ページのURLからメンバーIDを取得（取得できない場合は None）"""
+    if not detail_url:
+        return None
+    match = _MEMBER_ID_PATTERN.search(detail_url)
+    return match.group(1) if match else None
+
+
+class PlayerDetailCache:
+    """CacheAdapter ベースの選手詳細キャッシュ"""
+
+    def __init__(self, cache=None, ttl_seconds: int = None):
+        from cache_adapter import get_cache
+        self.cache = cache or get_cache()
+        self.ttl_seconds = ttl_seconds or settings.player_detail_ttl_seconds
+        # put() の読み込み → フィールド統合 → 書き込みを1つの操作として行う
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(fiscal_year: str, member_id: str) -> str:
+        return f"jba_detail:{fiscal_year}:{member_id}"
+
+    def _load(self, fiscal_year: str, member_id: str) -> Optional[Dict[str, Any]]:
+        return self._fresh(self.cache.get(self._key(fiscal_year, member_id)))
+
+    def _fresh(self, value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        TTL内のフィールドだけを残したエントリを返す（TTL内のフィールドがない場合は None）
+
+        バックエンドの期限（ttl）はエントリ全体に掛かるため、フィールドごとの取得時刻で確認する。
+        """
+        if not value:
+            return None
+        fetched_at = value.get('fetched_at', 0.0)
+        if not isinstance(fetched_at, dict):
+            # 以前の形式（エントリ全体で1つの取得時刻）
+            fetched_at = {field: fetched_at for field in value.get('fields', [])}
+        now = time.time()
+        fresh = {field: at for field, at in fetched_at.items() if now - at <= self.ttl_seconds}
+        if not fresh:
+            return None
+        details = {k: v for k, v in value.get('details', {}).items() if k in fresh}
+        return {'details': details, 'fetched_at': fresh}
+
+    def get(self, fiscal_year: str, member_id: str, fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """
+        選手詳細を取得
+
+        Returns:
+            要求した全フィールドを取得済みの場合はその値の dict、それ以外は None
+        """
+        try:
+            with self._lock:
+                value = self._load(fiscal_year, member_id)
+            return self._select(value, fields)
+        except Exception as e:
+            logger.error(f"Player detail cache get error: {e}")
+            return None
+
+    @staticmethod
+    def _select(value: Optional[Dict[str, Any]], fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """要求した全フィールドを取得済みのエントリから、その値だけを取り出す"""
+        if value is None:
+            return None
+        fields = set(fields)
+        if not fields <= value['fetched_at'].keys():
+            return None
+        return {k: v for k, v in value.get('details', {}).items() if k in fields}
+
+    def get_many(self, fiscal_year: str, member_fields: Dict[str, Iterable[str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        複数の選手詳細をまとめて取得（Redis では1往復）
+
+        Args:
+            member_fields: {member_id: fields}
+
+        Returns:
+            {member_id: details}（要求した全フィールドを取得済みのものだけ）
+        """
+        try:
+            keys = {self._key(fiscal_year, member_id): member_id for member_id in member_fields}
+            values = self.cache.get_many(keys)
+            results = {}
+            for key, value in values.items():
+                member_id = keys[key]
+                details = self._select(self._fresh(value), member_fields[member_id])
+                if details is not None:
+                    results[member_id] = details
+            return results
+        except Exception as e:
+            logger.error(f"Player detail cache get_many error: {e}")
+            return {}
+
+    def put(self, fiscal_year: str, member_id: str, details: Dict[str, Any], fields: Iterable[str]) -> bool:
+        """
+        選手詳細を保存（TTL内の既存エントリとはフィールドを統合する）
+
+        今回取得したフィールドだけ取得時刻を更新し、既存のフィールドは元の取得時刻のまま残す。
+        """
+        try:
+            fields = set(fields)
+            with self._lock:
+                value = self._load(fiscal_year, member_id)
+                if value is None:
+                    merged_details, merged_fetched_at = {}, {}
+                else:
+                    merged_details, merged_fetched_at = value['details'], value['fetched_at']
+                    # 今回取得したフィールドは古い値を消してから反映
+                    for field in fields:
+                        merged_details.pop(field, None)
+                now = time.time()
+                merged_details.update({k: v for k, v in details.items() if k in fields})
+                merged_fetched_at.update({field: now for field in fields})
+
+                value = {
+                    'details': merged_details,
+                    'fetched_at': merged_fetched_at,
+                }
+                return self.cache.set(self._key(fiscal_year, member_id), value, ttl=self.ttl_seconds)
+        except Exception as e:
+            logger.error(f"Player detail cache put error: {e}")
+            return False
+
+
+# ファクトリー関数
+_detail_cache_instance = None
+_detail_cache_lock = threading.Lock()
+
+
+def get_player_detail_cache() -> PlayerDetailCache:
+    """
+    選手詳細キャッシュを取得（シングルトン）
+
+    Returns:
+        PlayerDetailCache インスタンス
+    """
+    global _detail_cache_instance
+
+    with _detail_cache_lock:
+        if _detail_cache_instance is None:
+            _detail_cache_instance = PlayerDetailCache()
+            logger.info(f"Using player detail cache: ttl={_detail_cache_instance.ttl_seconds}s")
+        return _detail_cache_instance
@@ -0,0 +1,150 @@
+"""
+トークンバケット方式のレート制限
+
+同一プロセス内の全スレッド・全タスク・全ジョブで1つのバケットを共有し、
+settings.jba_rate_limit（リクエスト/秒）を守る。バースト（settings.jba_rate_burst）を
+許容しつつ、429/503 や応答遅延を検知したら送信レートを下げ、正常応答が続けば
+設定値まで徐々に戻す。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# バックオフ対象のステータスコード
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class TokenBucketRateLimiter:
+    """スレッド / asyncio 両対応のトークンバケット"""
+
+    def __init__(self, rate: float, burst: int, min_rate: float = 0.5, slow_response_sec: Optional[float] = None):
+        """
+        Args:
+            rate: 定常レート（リクエスト/秒）
+            burst: バケット容量（一度に送れる最大リクエスト数）
+            min_rate: バックオフ時の下限レート
+            slow_response_sec: この秒数を超える応答を「遅延」とみなす（None で無効）
+        """
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(float(min_rate), self.base_rate)
+        self.capacity = max(1, int(burst))
+        self.slow_response_sec = slow_response_sec
+
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """経過時間分のトークンを補充（ロック内で呼ぶ）"""
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _reserve(self) -> float:
+        """
+        トークンを1つ予約し、送信まで待つべき秒数を返す
+
+        トークンが足りない場合は前借り（負の残高）にして待ち時間を計算するため、
+        待機中のスレッド同士で順番が保たれる。
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def acquire(self):
+        """送信可能になるまでブロック（スレッド用）"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """送信可能になるまで待機（asyncio 用）"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_response(self, status_code: Optional[int], elapsed: float, retry_after: Optional[float] = None):
+        """
+        応答結果をフィードバックしてレートを調整
+
+        Args:
+            status_code: HTTPステータス（通信エラー時は None）
+            elapsed: 応答までの秒数
+            retry_after: Retry-After ヘッダーの秒数（あれば）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if status_code is None or status_code in THROTTLE_STATUS_CODES:
+                # スロットリング・通信エラー: レートを半減し、一時停止
+                self.rate = max(self.min_rate, self.rate * 0.5)
+                pause = retry_after if retry_after is not None else 1.0 / self.rate
+                self._paused_until = max(self._paused_until, now + pause)
+                self._tokens = min(self._tokens, 0.0)
+                logger.warning(f"⏳ レート制限を検知（status={status_code}）: {self.rate:.2f} req/s に減速、{pause:.1f}秒停止")
+            elif self.slow_response_sec is not None and elapsed > self.slow_response_sec:
+                # 応答遅延: 緩やかに減速
+                self.rate = max(self.min_rate, self.rate * 0.8)
+                logger.debug(f"🐢 応答遅延 {elapsed:.1f}秒: {self.rate:.2f} req/s に減速")
+            elif self.rate < self.base_rate:
+                # 正常応答: 設定値まで少しずつ回復
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+    def stats(self) -> Dict[str, float]:
+        """現在の状態を取得"""
+        with self._lock:
+            return {
+                'rate': round(self.rate, 2),
+                'base_rate': self.base_rate,
+                'capacity': self.capacity,
+                'tokens': round(self._tokens, 2),
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After ヘッダー（秒数形式のみ）を解析"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+# ホストごとのシングルトン
+_limiters: Dict[str, TokenBucketRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str = "team-jba.jp") -> TokenBucketRateLimiter:
+    """
+    ホストごとのレートリミッターを取得（プロセス内で共有）
+
+    Returns:
+        TokenBucketRateLimiter インスタンス
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = TokenBucketRateLimiter(
+                rate=settings.jba_rate_limit,
+                burst=settings.jba_rate_burst,
+                slow_response_sec=settings.jba_slow_response_sec,
+            )
+            _limiters[host] = limiter
+            logger.info(f"Rate limiter for {host}: {settings.jba_rate_limit} req/s (burst {settings.jba_rate_burst})")
+        return limiter
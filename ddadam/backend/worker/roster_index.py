@@ -0,0 +1,101 @@
+"""
+チーム名簿の照合用インデックス
+
+名簿取得時に1回だけ氏名・カナを正規化し、正規化済み氏名 → メンバーのハッシュマップと
+構成員区分・登録状態のフラグを保持する。完全一致は辞書引きで求め、あいまい照合は
+完全一致で決まらなかった場合の残りのメンバーだけに行う。
+"""
+
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+
+class IndexedMember:
+    """正規化済みの値と各種フラグを持つメンバー"""
+
+    __slots__ = ("position", "member", "raw_name", "norm_name", "raw_kana", "norm_kana", "is_athlete", "is_registered")
+
+    def __init__(self, position: int, member: dict, normalize: Callable[[str], str]):
+        self.position = position
+        self.member = member
+        self.raw_name = member.get("name", "")
+        self.norm_name = normalize(self.raw_name) if self.raw_name else ""
+        self.raw_kana = member.get("kana_name")
+        self.norm_kana = normalize(self.raw_kana) if self.raw_kana else ""
+
+        # 構成員区分・登録状態（候補の優先順位付けに使う）
+        member_category = member.get("member_category")
+        registration_status = member.get("registration_status")
+        self.is_athlete = bool(member_category) and "競技者" in str(member_category)
+        self.is_registered = bool(registration_status) and "登録完了" in str(registration_status)
+
+
+class RosterIndex:
+    """1チーム分の名簿インデックス"""
+
+    def __init__(self, members: List[dict], normalize: Callable[[str], str]):
+        """
+        Args:
+            members: 名簿のメンバー一覧（_get_team_members_silent の members）
+            normalize: 氏名の正規化関数
+        """
+        self.members = members
+        self._normalize = normalize
+        self._lock = threading.Lock()
+        self.entries: List[IndexedMember] = []
+        self._by_id: Dict[int, IndexedMember] = {}
+        self._by_name: Dict[str, List[IndexedMember]] = defaultdict(list)
+        self._by_kana: Dict[str, List[IndexedMember]] = defaultdict(list)
+
+        for position, member in enumerate(members):
+            entry = IndexedMember(position, member, normalize)
+            self.entries.append(entry)
+            self._by_id[id(member)] = entry
+            if entry.raw_name:
+                self._by_name[entry.norm_name].append(entry)
+            if entry.raw_kana:
+                self._by_kana[entry.norm_kana].append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def by_name(self, norm_name: str) -> List[IndexedMember]:
+        """正規化済み氏名が完全一致するメンバー"""
+        return self._by_name.get(norm_name, [])
+
+    def by_kana(self, norm_kana: str) -> List[IndexedMember]:
+        """正規化済みカナが完全一致するメンバー"""
+        return self._by_kana.get(norm_kana, [])
+
+    def entry_for(self, member: dict) -> Optional[IndexedMember]:
+        """メンバー dict に対応するエントリ"""
+        return self._by_id.get(id(member))
+
+    def refresh_member(self, member: dict):
+        """
+        詳細取得などでメンバー dict が更新された場合にカナを再インデックス
+
+        （名簿ページにはカナがなく、選手詳細ページから取得して追記されるため）
+        """
+        entry = self._by_id.get(id(member))
+        if entry is None:
+            return
+
+        raw_kana = member.get("kana_name")
+        if raw_kana == entry.raw_kana:
+            return
+
+        # 読み込み側はロックを取らずにバケットを走査するため、リストは書き換えずに
+        # 新しいリストを作って差し替える（in-place の sort 中はリストが空に見える）
+        with self._lock:
+            if entry.raw_kana:
+                bucket = self._by_kana.get(entry.norm_kana, [])
+                if entry in bucket:
+                    self._by_kana[entry.norm_kana] = [e for e in bucket if e is not entry]
+            entry.raw_kana = raw_kana
+            entry.norm_kana = self._normalize(raw_kana) if raw_kana else ""
+            if raw_kana:
+                self._by_kana[entry.norm_kana] = sorted(
+                    self._by_kana.get(entry.norm_kana, []) + [entry], key=lambda e: e.position
+                )
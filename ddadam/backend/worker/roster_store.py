@@ -0,0 +1,170 @@
+"""
+JBA チーム名簿（ロスター）の永続ストア
+
+ジョブをまたいでチームメンバー一覧を保存し、次の大会で同じチームの名簿を
+再取得しないようにする。キーは（年度, チームID）で、取得時刻を記録する。
+
+設定: config.roster_store_type = "sqlite"（デフォルト） or "redis"（cache_adapter 経由）
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RosterStore(ABC):
+    """名簿ストアの抽象クラス"""
+
+    @abstractmethod
+    def get(self, fiscal_year: str, team_id: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        名簿を取得
+
+        Returns:
+            (team_data, fetched_at) または None
+        """
+        pass
+
+    @abstractmethod
+    def put(self, fiscal_year: str, team_id: str, team_data: Dict[str, Any], fetched_at: Optional[float] = None) -> bool:
+        """名簿を保存"""
+        pass
+
+    def lookup(self, fiscal_year: str, team_id: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        鮮度を判定して名簿を取得
+
+        Returns:
+            (team_data, state)
+            state: "fresh"（TTL内）/ "stale"（TTL切れだが利用可、要再取得）/ "miss"
+        """
+        snapshot = self.get(fiscal_year, team_id)
+        if snapshot is None:
+            return None, "miss"
+
+        team_data, fetched_at = snapshot
+        age = time.time() - fetched_at
+        if age <= settings.roster_ttl_seconds:
+            return team_data, "fresh"
+        # バックエンドの期限（expires_at <= now で削除）と揃えて、ちょうど max_stale で miss とする
+        if age < settings.roster_max_stale_seconds:
+            return team_data, "stale"
+        return None, "miss"
+
+
+class SQLiteRosterStore(RosterStore):
+    """SQLite ベースの名簿ストア（デフォルト）"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.roster_store_path
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS team_rosters (
+                fiscal_year TEXT NOT NULL,
+                team_id TEXT NOT NULL,
+                team_data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (fiscal_year, team_id)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, fiscal_year: str, team_id: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT team_data, fetched_at FROM team_rosters WHERE fiscal_year = ? AND team_id = ?",
+                    (str(fiscal_year), str(team_id)),
+                ).fetchone()
+            if row is None:
+                return None
+            return json.loads(row[0]), row[1]
+        except Exception as e:
+            logger.error(f"Roster store get error: {e}")
+            return None
+
+    def put(self, fiscal_year: str, team_id: str, team_data: Dict[str, Any], fetched_at: Optional[float] = None) -> bool:
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO team_rosters (fiscal_year, team_id, team_data, fetched_at) VALUES (?, ?, ?, ?)",
+                    (str(fiscal_year), str(team_id), json.dumps(team_data, ensure_ascii=False), fetched_at or time.time()),
+                )
+                self._conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Roster store put error: {e}")
+            return False
+
+
+class CacheRosterStore(RosterStore):
+    """CacheAdapter（Redis など）ベースの名簿ストア"""
+
+    def __init__(self, cache=None):
+        from cache_adapter import get_cache
+        self.cache = cache or get_cache()
+
+    @staticmethod
+    def _key(fiscal_year: str, team_id: str) -> str:
+        return f"roster:{fiscal_year}:{team_id}"
+
+    def get(self, fiscal_year: str, team_id: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        value = self.cache.get(self._key(fiscal_year, team_id))
+        if not value:
+            return None
+        return value.get('team_data', {}), value.get('fetched_at', 0.0)
+
+    def put(self, fiscal_year: str, team_id: str, team_data: Dict[str, Any], fetched_at: Optional[float] = None) -> bool:
+        value = {'team_data': team_data, 'fetched_at': fetched_at or time.time()}
+        # 利用可能期間を過ぎたものはストア側で自動削除
+        return self.cache.set(self._key(fiscal_year, team_id), value, ttl=settings.roster_max_stale_seconds)
+
+
+# ファクトリー関数
+_roster_store_instance = None
+_roster_store_lock = threading.Lock()
+
+
+def get_roster_store() -> RosterStore:
+    """
+    設定に基づいて名簿ストアを取得（シングルトン）
+
+    Returns:
+        RosterStore インスタンス
+    """
+    global _roster_store_instance
+
+    with _roster_store_lock:
+        if _roster_store_instance is None:
+            store_type = settings.roster_store_type.lower()
+
+            if store_type == 'redis':
+                try:
+                    _roster_store_instance = CacheRosterStore()
+                    logger.info("Using cache-backed roster store")
+                except Exception as e:
+                    logger.warning(f"Failed to initialize cache roster store, falling back to SQLite: {e}")
+                    _roster_store_instance = SQLiteRosterStore()
+            else:
+                _roster_store_instance = SQLiteRosterStore()
+                logger.info(f"Using SQLite roster store: {_roster_store_instance.db_path}")
+
+        return _roster_store_instance
@@ -0,0 +1,162 @@
+"""
+大会照合結果の永続ストア（再実行時の差分処理用）
+
+同じ大会IDを再実行したとき、CSVの内容が変わっていない大学は前回の照合結果を
+そのまま使う。キーは（大会ID, CSVのハッシュ）で、照合の単位（ストリーミングでは
+CSV1件、一括処理では大学の全CSV）ごとに保存する。ハッシュが内容そのものを表すため、
+同じ大学のCSVが複数あっても、届いた順に関係なく正しい結果だけが再利用される。
+
+結果の index は照合単位の DataFrame 内の位置で保存し、再利用時に今回の DataFrame の
+index に戻す（ストリーミングでは行番号が届いた順に振られ、実行ごとに変わるため）。
+
+CSVのハッシュが変わった、または照合時刻が名簿のTTL（settings.roster_ttl_seconds）
+より古い照合単位だけを再照合する。
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Optional, List, Dict, Any
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def csv_content_hash(content: bytes) -> str:
+    """CSVのバイト列のハッシュ"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def combined_csv_hash(csv_hashes: List[str]) -> Optional[str]:
+    """複数のCSVをまとめて照合する場合のハッシュ（CSVの順も含む、CSVがない場合は None）"""
+    if not csv_hashes:
+        return None
+    if len(csv_hashes) == 1:
+        return csv_hashes[0]
+    return hashlib.sha256("\n".join(csv_hashes).encode("ascii")).hexdigest()
+
+
+def _to_positions(results: List[Dict[str, Any]], index) -> List[Dict[str, Any]]:
+    """結果の index を DataFrame 内の位置に置き換えたコピー"""
+    positions = {label: position for position, label in enumerate(index)}
+    return [{**result, 'index': positions[result['index']]} for result in results]
+
+
+def _from_positions(results: List[Dict[str, Any]], index) -> List[Dict[str, Any]]:
+    """位置で保存した結果の index を今回の DataFrame の index に戻す"""
+    labels = list(index)
+    for result in results:
+        result['index'] = labels[result['index']]
+    return results
+
+
+class TournamentRunStore:
+    """SQLite ベースの照合結果ストア"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.run_store_path
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # 以前の（大会ID, 大学名）をキーにしたテーブルは使わない（結果は名簿のTTL分しか再利用しないため移行不要）
+        self._conn.execute("DROP TABLE IF EXISTS tournament_runs")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tournament_csv_runs (
+                game_id TEXT NOT NULL,
+                csv_hash TEXT NOT NULL,
+                university TEXT NOT NULL,
+                results BLOB NOT NULL,
+                verified_at REAL NOT NULL,
+                PRIMARY KEY (game_id, csv_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, game_id: str, csv_hash: str, index) -> Optional[List[Dict[str, Any]]]:
+        """
+        再利用できる照合結果を取得
+
+        Args:
+            index: 今回の照合単位の DataFrame の index（結果の index をこれに戻す）
+
+        Returns:
+            照合結果のリスト（未保存・結果が古い場合は None）
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT results, verified_at FROM tournament_csv_runs WHERE game_id = ? AND csv_hash = ?",
+                    (str(game_id), csv_hash),
+                ).fetchone()
+            if row is None:
+                return None
+
+            results, verified_at = row
+            if time.time() - verified_at > settings.roster_ttl_seconds:
+                return None
+            results = pickle.loads(results)
+            if any(result['index'] >= len(index) for result in results):
+                return None
+            return _from_positions(results, index)
+        except Exception as e:
+            logger.error(f"Run store get error: {e}")
+            return None
+
+    def put(self, game_id: str, university: str, csv_hash: str, results: List[Dict[str, Any]], index) -> bool:
+        """
+        照合結果を保存
+
+        Args:
+            index: 照合単位の DataFrame の index（結果の index を位置に置き換えて保存する）
+        """
+        try:
+            blob = pickle.dumps(_to_positions(results, index), protocol=pickle.HIGHEST_PROTOCOL)
+            now = time.time()
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tournament_csv_runs (game_id, csv_hash, university, results, verified_at) VALUES (?, ?, ?, ?, ?)",
+                    (str(game_id), csv_hash, str(university), sqlite3.Binary(blob), now),
+                )
+                # 再利用されなくなった古い結果を削除
+                self._conn.execute(
+                    "DELETE FROM tournament_csv_runs WHERE verified_at < ?",
+                    (now - settings.roster_ttl_seconds,),
+                )
+                self._conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Run store put error: {e}")
+            return False
+
+
+# ファクトリー関数
+_run_store_instance = None
+_run_store_lock = threading.Lock()
+
+
+def get_run_store() -> TournamentRunStore:
+    """
+    照合結果ストアを取得（シングルトン）
+
+    Returns:
+        TournamentRunStore インスタンス
+    """
+    global _run_store_instance
+
+    with _run_store_lock:
+        if _run_store_instance is None:
+            _run_store_instance = TournamentRunStore()
+            logger.info(f"Using tournament run store: {_run_store_instance.db_path}")
+        return _run_store_instance
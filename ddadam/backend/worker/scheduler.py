@@ -0,0 +1,185 @@
+"""
+照合処理の共通スケジューラー
+
+大学 → チーム名簿 → 選手照合 → 選手詳細 の各段階を、プロセスで1つの上限付きワーカーに載せる。
+入れ子のスレッドプールは使わず、前の段階が終わったらコールバックで次の段階の
+タスクを投入するため、ワーカーが子タスクの完了を待ってブロックすることはない。
+
+タスクは優先度（小さいほど先）→ 投入順で実行する。優先度はジョブごとの
+PriorityGroup が大学ごとに (ジョブ内の大学の順番, ジョブの順番) で払い出す。
+同じジョブの中では先に始めた大学の照合が先に進み、その大学の残りタスクが
+なくなった時点で空いたワーカーが次の大学に回る。複数のジョブが同時に動いている場合は
+各ジョブの1校目 → 各ジョブの2校目 … の順になり、後から始めたジョブも
+先のジョブが終わるのを待たずにワーカーを分け合う。
+
+実際のHTTPの同時実行数はこれとは別に、ホストごとのAIMDコントローラーが決める。
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PriorityGroup:
+    """ジョブ1件分の優先度の払い出し"""
+
+    def __init__(self, job_seq: int):
+        self.job_seq = job_seq
+        self._univ_seq = itertools.count()
+
+    def next_priority(self) -> Tuple[int, int]:
+        """新しい処理単位（大学など）用の優先度を払い出す（同じジョブ内では先に払い出したものほど優先）"""
+        return (next(self._univ_seq), self.job_seq)
+
+
+class WorkScheduler:
+    """優先度付きの上限付きワーカー（スレッド）"""
+
+    def __init__(self, max_workers: int, name: str = "work-scheduler"):
+        """
+        Args:
+            max_workers: ワーカースレッド数の上限（同時に実行するタスク数）
+            name: スレッド名の接頭辞
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.name = name
+
+        self._queue = []  # (priority, seq, future, fn, args, kwargs) のヒープ
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._job_seq = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._idle = 0
+        self._running = 0
+        self._shutdown = False
+
+    def new_priority_group(self) -> PriorityGroup:
+        """ジョブ用の優先度の払い出しを作成（ジョブごとに1つ）"""
+        return PriorityGroup(next(self._job_seq))
+
+    def submit(self, fn: Callable, *args, priority: Tuple[int, int] = (0, 0), **kwargs) -> Future:
+        """
+        タスクを投入
+
+        Args:
+            priority: PriorityGroup.next_priority() の値（小さいほど先）
+
+        Returns:
+            concurrent.futures.Future
+        """
+        future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("scheduler is shut down")
+            heapq.heappush(self._queue, (priority, next(self._seq), future, fn, args, kwargs))
+            # 待機中のワーカーで足りない場合のみスレッドを増やす
+            if len(self._queue) > self._idle and len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"{self.name}-{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+        return future
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._shutdown:
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                if not self._queue:
+                    return
+                _, _, future, fn, args, kwargs = heapq.heappop(self._queue)
+                self._running += 1
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = fn(*args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._cond:
+                    self._running -= 1
+
+    def shutdown(self, wait: bool = True):
+        """キューに残ったタスクを実行し終えたらワーカーを終了"""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """現在の状態を取得"""
+        with self._cond:
+            return {
+                'max_workers': self.max_workers,
+                'threads': len(self._threads),
+                'running': self._running,
+                'queued': len(self._queue),
+            }
+
+
+def when_all(futures: List[Future]) -> Future:
+    """
+    全ての Future が完了したら完了する Future を返す（結果は futures のリスト）
+
+    子タスクの完了をブロックして待たずに、次の段階をコールバックで繋ぐために使う。
+    """
+    combined = Future()
+    combined.set_running_or_notify_cancel()
+    futures = list(futures)
+    if not futures:
+        combined.set_result(futures)
+        return combined
+
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            done = remaining[0] == 0
+        if done:
+            combined.set_result(futures)
+
+    for future in futures:
+        future.add_done_callback(on_done)
+    return combined
+
+
+# ファクトリー関数
+_scheduler_instance = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> WorkScheduler:
+    """
+    照合処理用のスケジューラーを取得（プロセス内で共有するシングルトン）
+
+    Returns:
+        WorkScheduler インスタンス
+    """
+    global _scheduler_instance
+
+    with _scheduler_lock:
+        if _scheduler_instance is None:
+            _scheduler_instance = WorkScheduler(settings.scheduler_max_workers)
+            logger.info(f"Work scheduler: max_workers={_scheduler_instance.max_workers}")
+        return _scheduler_instance
@@ -0,0 +1,195 @@
+"""
+JBA・管理画面（kcbbf）のログインセッションの永続ストア
+
+ジョブごとにログイン（ログインページ取得 → CSRFトークン解析 → 認証情報の送信）を
+やり直さないよう、ログイン済みのクッキーをジョブをまたいで保存する。
+
+- キーは（サービス, アカウント, パスワード）のハッシュ（認証情報そのものは保存しない）
+- クッキーは Fernet（cryptography、必須の依存）で暗号化して SQLite に保存する
+  （平文で保存することはない）
+- 暗号鍵は settings.session_store_key、未設定の場合は鍵ファイルを作成して使う
+- DB・鍵ファイルは既定でソースツリーの外（~/.local/state/ddadam/）に置き、
+  誤ってリポジトリにコミットされないようにする
+
+復元したセッションが有効かどうかは呼び出し側が安価なリクエストで確認し、
+期限切れの場合だけ通常のログインを行う。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, List, Dict, Any
+
+from cryptography.fernet import Fernet
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def account_key(service: str, username: str, password: str) -> str:
+    """サービス・アカウント・パスワードのハッシュ（パスワードが変わると別のキーになる）"""
+    return hashlib.sha256(f"{service}\0{username}\0{password}".encode("utf-8")).hexdigest()
+
+
+def export_cookies(cookie_jar) -> List[Dict[str, Any]]:
+    """requests のクッキーを保存用の dict のリストに変換"""
+    return [
+        {
+            "name": cookie.name,
+            "value": cookie.value,
+            "domain": cookie.domain,
+            "path": cookie.path,
+            "secure": cookie.secure,
+            "expires": cookie.expires,
+            "rest": dict(getattr(cookie, "_rest", {}) or {}),
+        }
+        for cookie in cookie_jar
+    ]
+
+
+def import_cookies(cookie_jar, cookies: List[Dict[str, Any]]):
+    """保存したクッキーを requests のクッキーに戻す（期限切れのものは除く）"""
+    now = time.time()
+    for cookie in cookies:
+        if cookie.get("expires") and cookie["expires"] <= now:
+            continue
+        cookie_jar.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+            secure=cookie.get("secure", False),
+            expires=cookie.get("expires"),
+            rest=cookie.get("rest") or {},
+        )
+
+
+def _load_or_create_key(key_path: str) -> bytes:
+    """鍵ファイルから暗号鍵を読み込む（なければ作成、所有者のみ読み書き可）"""
+    if os.path.exists(key_path):
+        with open(key_path, "rb") as f:
+            return f.read().strip()
+
+    key = Fernet.generate_key()
+    fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    logger.info(f"Created session store key: {key_path}")
+    return key
+
+
+class SessionStore:
+    """SQLite ベースの暗号化セッションストア"""
+
+    def __init__(self, db_path: str = None, key: Optional[str] = None):
+        self.db_path = os.path.expanduser(db_path or settings.session_store_path)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            # クッキー・鍵を置くため所有者のみアクセス可
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        key = key or settings.session_store_key or _load_or_create_key(f"{self.db_path}.key")
+        self._fernet = Fernet(key)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS login_sessions (
+                account_key TEXT PRIMARY KEY,
+                service TEXT NOT NULL,
+                cookies BLOB NOT NULL,
+                saved_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def load(self, service: str, username: str, password: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        保存済みのクッキーを取得
+
+        Returns:
+            クッキーのリスト（未保存・期限切れ・復号できない場合は None）
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT cookies, saved_at FROM login_sessions WHERE account_key = ?",
+                    (account_key(service, username, password),),
+                ).fetchone()
+            if row is None:
+                return None
+
+            encrypted, saved_at = row
+            if time.time() - saved_at > settings.session_ttl_seconds:
+                return None
+            return json.loads(self._fernet.decrypt(bytes(encrypted)))
+        except Exception as e:
+            # 鍵を変えた場合なども、通常のログインで続行できるよう None を返す
+            logger.warning(f"Session store load error: {e}")
+            return None
+
+    def save(self, service: str, username: str, password: str, cookies: List[Dict[str, Any]]) -> bool:
+        """クッキーを暗号化して保存"""
+        try:
+            encrypted = self._fernet.encrypt(json.dumps(cookies).encode("utf-8"))
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO login_sessions (account_key, service, cookies, saved_at) VALUES (?, ?, ?, ?)",
+                    (account_key(service, username, password), service, sqlite3.Binary(encrypted), time.time()),
+                )
+                self._conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Session store save error: {e}")
+            return False
+
+    def delete(self, service: str, username: str, password: str) -> bool:
+        """期限切れのセッションを削除"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "DELETE FROM login_sessions WHERE account_key = ?",
+                    (account_key(service, username, password),),
+                )
+                self._conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Session store delete error: {e}")
+            return False
+
+
+# ファクトリー関数
+_session_store_instance = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> Optional[SessionStore]:
+    """
+    ログインセッションストアを取得（シングルトン）
+
+    Returns:
+        SessionStore インスタンス（無効化されている・初期化できない場合は None）
+    """
+    global _session_store_instance
+
+    if not settings.session_store_enabled:
+        return None
+
+    with _session_store_lock:
+        if _session_store_instance is None:
+            try:
+                _session_store_instance = SessionStore()
+                logger.info(f"Using session store: {_session_store_instance.db_path}")
+            except Exception as e:
+                logger.warning(f"Failed to initialize session store: {e}")
+                return None
+        return _session_store_instance
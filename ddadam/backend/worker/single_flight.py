@@ -0,0 +1,81 @@
+"""
+同じキーの処理の同時実行をまとめる（single-flight）
+
+複数のスレッドが同じチーム検索・同じチームの名簿取得を同時に必要とした場合、
+最初の1スレッド（リーダー）だけが実際に取得し、残りのスレッドはその完了を待って
+同じ結果を受け取る。完了したキーは忘れるため、結果の保持はキャッシュ側で行う。
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """実行中の1件の処理"""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        """完了を待って結果を返す（リーダーが例外で終わった場合は同じ例外を送出）"""
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """キーごとに実行中の処理を1件にまとめる"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def begin(self, key: Hashable) -> Tuple[_Call, bool]:
+        """
+        キーの処理を開始
+
+        Returns:
+            (call, is_leader)
+            is_leader が True の場合は呼び出し側が処理を実行して finish() を呼ぶ。
+            False の場合は call.wait() で結果を受け取る。
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            return call, True
+
+    def finish(self, key: Hashable, call: _Call, result: Any = None, error: BaseException = None):
+        """リーダーが処理を終えたら結果を待機中のスレッドに渡す"""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.result = result
+        call.error = error
+        call.event.set()
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        同じキーの処理が実行中ならその結果を待ち、なければ fn を実行
+
+        Returns:
+            fn の戻り値（リーダー・待機側とも同じオブジェクト）
+        """
+        call, is_leader = self.begin(key)
+        if not is_leader:
+            return call.wait()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result